@@ -0,0 +1,224 @@
+"""Benchmark do AC Filter Reminder sem uma instância do Home Assistant.
+
+Roda `async_setup_entry` (e as quatro plataformas), os dias simulados com o
+`_daily_check` e as viradas de dia, a leitura das propriedades das entidades
+e `MarkCleanedButton.async_press` para 1, 100 e 1000 unidades, nos modos
+"uma entrada por unidade" e "frota".
+
+Uso (na raiz do repositório, com o pacote `homeassistant` instalado):
+
+    python benchmarks/bench.py
+    python benchmarks/bench.py --units 1000 --days 90 --mode fleet
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+from datetime import timedelta
+import logging
+from pathlib import Path
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from fake_hass import FakeConfigEntry, FakeHass, FakeStore, SimClock, install  # noqa: E402
+
+from custom_components import ac_filter_reminder as integration  # noqa: E402
+from custom_components.ac_filter_reminder.button import MarkCleanedButton  # noqa: E402
+from custom_components.ac_filter_reminder.const import (  # noqa: E402
+    CONF_DIGEST, CONF_ENTRY_TYPE, CONF_NAME, CONF_NOTIFY_SERVICE, CONF_REMINDER_HOUR,
+    CONF_REMINDER_MINUTE, CONF_UNITS, DATA_HISTORY, DATA_STATE, DOMAIN,
+    ENTRY_TYPE_FLEET, ENTRY_TYPE_UNIT, HISTORY_STORAGE_KEY, STATE_STORAGE_KEY,
+)
+from custom_components.ac_filter_reminder.delivery import async_get_delivery_queue  # noqa: E402
+
+DAY = 86400
+
+
+@dataclass
+class Result:
+    """Números de um cenário."""
+
+    mode: str
+    units: int
+    entities: int = 0
+    setup_ms: float = 0.0
+    setup_writes: int = 0
+    props_us: float = 0.0
+    day_ms: list[float] = field(default_factory=list)
+    day_writes: list[int] = field(default_factory=list)
+    day_calls: list[int] = field(default_factory=list)
+    dropped: int = 0
+    press_us: float = 0.0
+    press_writes: int = 0
+    save_ms: float = 0.0
+    peak_kib: float | None = None
+
+
+def make_entries(mode: str, count: int) -> tuple[list[FakeConfigEntry], list[str]]:
+    """Criar as entradas do cenário e as chaves das unidades."""
+    common = {
+        CONF_REMINDER_HOUR: 9,
+        CONF_REMINDER_MINUTE: 0,
+        CONF_NOTIFY_SERVICE: "notify.bench",
+    }
+    if mode == "fleet":
+        units = [{"id": f"unidade_{i:04d}", "name": f"Unidade {i:04d}"} for i in range(count)]
+        entry = FakeConfigEntry("Frota", {
+            **common, CONF_NAME: "Frota", CONF_ENTRY_TYPE: ENTRY_TYPE_FLEET,
+            CONF_UNITS: units, CONF_DIGEST: True,
+        })
+        return [entry], [f"{entry.entry_id}_{unit['id']}" for unit in units]
+
+    entries = [
+        FakeConfigEntry(f"AC {i:04d}", {
+            **common, CONF_NAME: f"AC {i:04d}", CONF_ENTRY_TYPE: ENTRY_TYPE_UNIT,
+            CONF_DIGEST: False,
+        })
+        for i in range(count)
+    ]
+    return entries, [entry.entry_id for entry in entries]
+
+
+def seed_stores(unit_keys: list[str], now_ts: float) -> None:
+    """Preencher os stores: limpezas espalhadas em 90 dias, ~1/3 vencidas."""
+    state, history = {}, {}
+    for i, unit_key in enumerate(unit_keys):
+        last = int(now_ts - (i * 7 % 90) * DAY - (i % 24) * 3600)
+        state[unit_key] = [last, 60]
+        history[unit_key] = [last - 120 * DAY, last - 60 * DAY, last]
+    FakeStore.contents = {
+        STATE_STORAGE_KEY: {"units": state},
+        HISTORY_STORAGE_KEY: {"units": history},
+    }
+
+
+async def _run(mode: str, count: int, days: int) -> Result:
+    """Executar um cenário completo."""
+    result = Result(mode, count)
+    clock = SimClock(dt_util.utcnow())
+    hass = FakeHass()
+    uninstall = install(hass, clock)
+    try:
+        entries, unit_keys = make_entries(mode, count)
+        for entry in entries:
+            hass.config_entries.async_add(entry)
+        seed_stores(unit_keys, clock.now.timestamp())
+
+        start = time.perf_counter()
+        await integration.async_setup(hass, {})
+        for entry in entries:
+            await integration.async_setup_entry(hass, entry)
+        await hass.async_block_till_done()
+        result.setup_ms = (time.perf_counter() - start) * 1000
+        result.setup_writes = hass.state_writes
+
+        entities = [
+            entity
+            for entry_entities in hass.config_entries.entities.values()
+            for entity in entry_entities
+        ]
+        result.entities = len(entities)
+
+        start = time.perf_counter()
+        for entity in entities:
+            entity.state  # noqa: B018
+            entity.extra_state_attributes  # noqa: B018
+        result.props_us = (time.perf_counter() - start) * 1e6 / len(entities)
+
+        for _ in range(days):
+            writes, calls = hass.state_writes, hass.services.calls.total()
+            start = time.perf_counter()
+            clock.advance(clock.now + timedelta(days=1))
+            await hass.async_block_till_done()
+            result.day_ms.append((time.perf_counter() - start) * 1000)
+            result.day_writes.append(hass.state_writes - writes)
+            result.day_calls.append(hass.services.calls.total() - calls)
+
+        buttons = [entity for entity in entities if isinstance(entity, MarkCleanedButton)]
+        writes = hass.state_writes
+        start = time.perf_counter()
+        for button in buttons:
+            await button.async_press()
+        await hass.async_block_till_done()
+        result.press_us = (time.perf_counter() - start) * 1e6 / len(buttons)
+        result.press_writes = hass.state_writes - writes
+
+        start = time.perf_counter()
+        hass.data[DOMAIN][DATA_STATE]._store.flush()
+        hass.data[DOMAIN][DATA_HISTORY]._store.flush()
+        result.save_ms = (time.perf_counter() - start) * 1000
+        result.dropped = async_get_delivery_queue(hass).stats.dropped
+
+        for entry in entries:
+            await integration.async_unload_entry(hass, entry)
+    finally:
+        uninstall()
+    return result
+
+
+async def _peak_memory(mode: str, count: int, days: int) -> float:
+    """Pico de memória alocada (KiB) durante um cenário completo."""
+    tracemalloc.start()
+    try:
+        await _run(mode, count, days)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def _report(results: list[Result]) -> None:
+    """Imprimir a tabela de resultados."""
+    header = (
+        f"{'modo':<6}{'unid.':>7}{'entid.':>8}{'setup ms':>10}{'escr.setup':>11}"
+        f"{'prop µs':>9}{'dia ms':>9}{'dia p95':>9}{'escr./dia':>10}"
+        f"{'serv./dia':>10}{'descart.':>9}{'press µs':>10}{'escr.press':>11}{'save ms':>9}{'pico KiB':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for res in results:
+        day_p95 = (
+            statistics.quantiles(res.day_ms, n=20)[-1] if len(res.day_ms) > 1 else res.day_ms[0]
+        )
+        peak = f"{res.peak_kib:.0f}" if res.peak_kib is not None else "-"
+        print(
+            f"{res.mode:<6}{res.units:>7}{res.entities:>8}{res.setup_ms:>10.1f}"
+            f"{res.setup_writes:>11}{res.props_us:>9.1f}{statistics.mean(res.day_ms):>9.2f}"
+            f"{day_p95:>9.2f}{statistics.mean(res.day_writes):>10.1f}"
+            f"{statistics.mean(res.day_calls):>10.1f}{res.dropped:>9}{res.press_us:>10.1f}"
+            f"{res.press_writes:>11}{res.save_ms:>9.2f}{peak:>10}"
+        )
+
+
+async def _main(args: argparse.Namespace) -> None:
+    results = []
+    for mode in args.mode:
+        for count in args.units:
+            result = await _run(mode, count, args.days)
+            if not args.no_memory:
+                result.peak_kib = await _peak_memory(mode, count, args.days)
+            results.append(result)
+    _report(results)
+
+
+def main() -> None:
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--units", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--mode", nargs="+", choices=("unit", "fleet"), default=["unit", "fleet"])
+    parser.add_argument("--days", type=int, default=30, help="dias simulados")
+    parser.add_argument("--no-memory", action="store_true", help="pular a medição com tracemalloc")
+    logging.basicConfig(level=logging.WARNING)
+    # Descartes da fila de entrega aparecem na coluna "descart."
+    logging.getLogger(f"custom_components.{DOMAIN}.delivery").setLevel(logging.ERROR)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
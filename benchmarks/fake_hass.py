@@ -0,0 +1,274 @@
+"""Núcleo mínimo do Home Assistant para rodar a integração nos benchmarks.
+
+Só o que a integração usa de fato: `hass.data`, o registro de serviços, o
+encaminhamento das plataformas de uma entrada, um relógio simulado (instalado
+no `clock` da integração, com os timers) e um `Store` em memória. O pacote `homeassistant` precisa estar instalado, mas nenhuma
+instância roda.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Callable
+from datetime import datetime, timedelta
+import heapq
+import importlib
+import itertools
+from typing import Any
+
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.util import dt as dt_util
+
+PACKAGE = "custom_components.ac_filter_reminder"
+
+clock = importlib.import_module(f"{PACKAGE}.clock")
+
+
+class SimClock(clock.Clock):
+    """Relógio simulado: o tempo só anda em `advance`, disparando os timers."""
+
+    def __init__(self, start: datetime) -> None:
+        """Initialize the clock."""
+        self.now = start
+        self._timers: list[tuple[float, int, Callable[[datetime], Any]]] = []
+        self._cancelled: set[int] = set()
+        self._seq = itertools.count()
+        self.armed = 0
+
+    def utcnow(self) -> datetime:
+        """Return the simulated time."""
+        return self.now
+
+    def monotonic(self) -> float:
+        """Return the simulated monotonic time."""
+        # Horas de uso e média da poeira andam com o tempo simulado
+        return self.now.timestamp()
+
+    def async_track_point_in_utc_time(self, hass, action, point_in_time: datetime):
+        """Arm a timer at a simulated instant."""
+        return self._arm(point_in_time.timestamp(), action)
+
+    def async_call_later(self, hass, delay, action):
+        """Arm a timer after a simulated delay."""
+        if isinstance(delay, timedelta):
+            delay = delay.total_seconds()
+        return self._arm(self.now.timestamp() + delay, action)
+
+    def _arm(self, ts: float, action) -> Callable[[], None]:
+        seq = next(self._seq)
+        heapq.heappush(self._timers, (ts, seq, action))
+        self.armed += 1
+        return lambda: self._cancelled.add(seq)
+
+    def advance(self, until: datetime) -> int:
+        """Disparar, em ordem, os timers vencidos até `until`."""
+        fired = 0
+        limit = until.timestamp()
+        while self._timers and self._timers[0][0] <= limit:
+            ts, seq, action = heapq.heappop(self._timers)
+            if seq in self._cancelled:
+                self._cancelled.discard(seq)
+                continue
+            self.now = max(self.now, dt_util.utc_from_timestamp(ts))
+            action(self.now)
+            fired += 1
+        self.now = until
+        return fired
+
+
+class FakeStore:
+    """`Store` em memória; as gravações só são contadas."""
+
+    contents: dict[str, Any] = {}
+
+    def __init__(self, hass, version: int, key: str, *args, **kwargs) -> None:
+        """Initialize the store."""
+        self.key = key
+        self.saves = 0
+        self._data_func: Callable[[], Any] | None = None
+
+    async def async_load(self) -> Any:
+        """Return the seeded contents."""
+        return self.contents.get(self.key)
+
+    def async_delay_save(self, data_func, delay: float = 0) -> None:
+        """Register a pending save."""
+        self.saves += 1
+        self._data_func = data_func
+
+    def flush(self) -> Any:
+        """Serialize the pending save, as the real store would."""
+        if self._data_func is None:
+            return None
+        data, self._data_func = self._data_func(), None
+        return data
+
+
+class FakeServices:
+    """Registro de serviços que só conta as chamadas."""
+
+    def __init__(self) -> None:
+        """Initialize the registry."""
+        self.calls: Counter[str] = Counter()
+        self._handlers: dict[tuple[str, str], Callable] = {}
+
+    def async_register(self, domain: str, service: str, handler, schema=None, **kwargs) -> None:
+        """Register a service handler."""
+        self._handlers[(domain, service)] = handler
+
+    def has_service(self, domain: str, service: str) -> bool:
+        """Return True if the service is registered."""
+        return (domain, service) in self._handlers
+
+    async def async_call(self, domain: str, service: str, service_data=None,
+                         blocking: bool = False, **kwargs) -> None:
+        """Count the call."""
+        self.calls[f"{domain}.{service}"] += 1
+
+
+class FakeConfigEntry:
+    """Entrada de configuração com os atributos usados pela integração."""
+
+    _ids = itertools.count()
+
+    def __init__(self, title: str, data: dict[str, Any], options: dict[str, Any] | None = None,
+                 domain: str = "ac_filter_reminder") -> None:
+        """Initialize the entry."""
+        self.entry_id = f"bench{next(self._ids):05d}"
+        self.domain = domain
+        self.title = title
+        self.data = data
+        self.options = options or {}
+        self.unique_id = title
+        self.runtime_data: Any = None
+        self._on_unload: list[Callable[[], None]] = []
+
+    def add_update_listener(self, listener) -> Callable[[], None]:
+        """Accept an update listener (options are never changed here)."""
+        return lambda: None
+
+    def async_on_unload(self, func: Callable[[], None]) -> None:
+        """Keep an unload callback."""
+        self._on_unload.append(func)
+
+
+class FakeConfigEntries:
+    """Encaminha as plataformas de uma entrada direto para os módulos."""
+
+    def __init__(self, hass: FakeHass) -> None:
+        """Initialize the manager."""
+        self.hass = hass
+        self.entities: dict[str, list[Entity]] = {}
+        self._entries: dict[str, FakeConfigEntry] = {}
+
+    def async_add(self, entry: FakeConfigEntry) -> None:
+        """Register an entry, as if it had been created by its config flow."""
+        self._entries[entry.entry_id] = entry
+
+    def async_get_entry(self, entry_id: str) -> FakeConfigEntry | None:
+        """Return a registered entry."""
+        return self._entries.get(entry_id)
+
+    def async_entries(self, domain: str | None = None) -> list[FakeConfigEntry]:
+        """Return the registered entries of a domain."""
+        return [entry for entry in self._entries.values() if domain in (None, entry.domain)]
+
+    async def async_forward_entry_setups(self, entry: FakeConfigEntry, platforms) -> None:
+        """Run each platform's setup and add its entities."""
+        for platform in platforms:
+            module = importlib.import_module(f"{PACKAGE}.{platform}")
+            added: list[Entity] = []
+            await module.async_setup_entry(self.hass, entry, added.extend)
+            # Entidades desabilitadas por padrão não entram no HA
+            added = [entity for entity in added if entity.entity_registry_enabled_default]
+            for entity in added:
+                entity.hass = self.hass
+                entity.entity_id = f"{platform}.{entity.unique_id}"
+                await entity.async_added_to_hass()
+                entity.async_write_ha_state()
+            self.entities.setdefault(entry.entry_id, []).extend(added)
+
+    async def async_unload_platforms(self, entry: FakeConfigEntry, platforms) -> bool:
+        """Remove the entry's entities."""
+        for entity in self.entities.pop(entry.entry_id, []):
+            await entity.async_will_remove_from_hass()
+            for func in entity._on_remove or ():
+                func()
+        return True
+
+
+class FakeConfig:
+    """`hass.config` reduzido."""
+
+    time_zone = "UTC"
+    config_dir = "/tmp"
+
+    def path(self, *parts: str) -> str:
+        """Return a path inside the config dir."""
+        return "/".join((self.config_dir, *parts))
+
+
+class FakeHass:
+    """O bastante de `HomeAssistant` para a integração rodar."""
+
+    def __init__(self) -> None:
+        """Initialize the stand-in."""
+        self.loop = asyncio.get_running_loop()
+        self.data: dict[str, Any] = {}
+        self.services = FakeServices()
+        self.config = FakeConfig()
+        self.config_entries = FakeConfigEntries(self)
+        self.state_writes = 0
+        self._tasks: set[asyncio.Task] = set()
+
+    def async_create_task(self, target, name: str | None = None, **kwargs) -> asyncio.Task:
+        """Schedule a coroutine on the loop."""
+        task = self.loop.create_task(target, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async_create_background_task = async_create_task
+
+    async def async_block_till_done(self) -> None:
+        """Wait until every task created through hass is finished."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks)
+
+
+def install(hass: FakeHass, sim_clock: SimClock) -> Callable[[], None]:
+    """Trocar relógio, store e escrita de estado pelos substitutos.
+
+    Retorna uma função que desfaz tudo.
+    """
+    history = importlib.import_module(f"{PACKAGE}.history")
+    store = importlib.import_module(f"{PACKAGE}.store")
+
+    def write_ha_state(entity: Entity) -> None:
+        # Avalia o que o núcleo avaliaria ao montar o estado
+        hass.state_writes += 1
+        entity.state  # noqa: B018
+        entity.extra_state_attributes  # noqa: B018
+        entity.icon  # noqa: B018
+
+    async def get_last_state(entity: RestoreEntity) -> None:
+        return None
+
+    patches = [
+        (history, "Store", FakeStore),
+        (store, "Store", FakeStore),
+        (Entity, "async_write_ha_state", write_ha_state),
+        (RestoreEntity, "async_get_last_state", get_last_state),
+    ]
+    originals = [(target, name, getattr(target, name)) for target, name, _ in patches]
+    for target, name, value in patches:
+        setattr(target, name, value)
+    restore_clock = clock.set_clock(sim_clock)
+
+    def uninstall() -> None:
+        restore_clock()
+        for target, name, value in originals:
+            setattr(target, name, value)
+
+    return uninstall
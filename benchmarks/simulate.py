@@ -0,0 +1,188 @@
+"""Simulação de longo prazo do AC Filter Reminder no relógio simulado.
+
+Leva N unidades por meses de tempo simulado em poucos segundos de tempo
+real: lembretes diários, viradas de dia, reenvios e as limpezas feitas
+pelos usuários, alguns dias depois de cada unidade vencer. Por dia simulado
+conta os lembretes, as notificações entregues, as escritas de estado e o
+tempo de CPU, para conferir mudanças no agendamento em escala.
+
+Uso (na raiz do repositório, com o pacote `homeassistant` instalado):
+
+    python benchmarks/simulate.py
+    python benchmarks/simulate.py --units 1000 --days 365 --mode fleet
+    python benchmarks/simulate.py --units 200 --escalation-hours 4 --csv /tmp/sim.csv
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+import logging
+from pathlib import Path
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from bench import make_entries, seed_stores  # noqa: E402
+from fake_hass import FakeHass, SimClock, install  # noqa: E402
+
+from custom_components import ac_filter_reminder as integration  # noqa: E402
+from custom_components.ac_filter_reminder.const import CONF_ESCALATION_HOURS, DOMAIN  # noqa: E402
+from custom_components.ac_filter_reminder.delivery import async_get_delivery_queue  # noqa: E402
+from custom_components.ac_filter_reminder.escalation import async_get_escalation  # noqa: E402
+from custom_components.ac_filter_reminder.models import async_loaded_entries  # noqa: E402
+
+# Hora local em que os usuários limpam os filtros
+CLEANING_HOUR = 18
+
+
+@dataclass
+class Day:
+    """Números de um dia simulado."""
+
+    day: int
+    date: str
+    reminders: int
+    escalations: int
+    cleanings: int
+    notifications: int
+    state_writes: int
+    timers: int
+    cpu_ms: float
+
+
+def _notifications(hass: FakeHass) -> int:
+    """Chamadas de serviço que entregam um lembrete."""
+    return sum(
+        count for key, count in hass.services.calls.items()
+        if key.startswith("notify.") or key == "persistent_notification.create"
+    )
+
+
+async def _simulate(args: argparse.Namespace) -> tuple[list[Day], float, int]:
+    """Rodar o cenário e retornar os dias, o tempo real e os descartes da fila."""
+    rng = random.Random(args.seed)
+    start = dt_util.start_of_local_day(dt_util.utcnow())
+    sim_clock = SimClock(start)
+    hass = FakeHass()
+    uninstall = install(hass, sim_clock)
+    days: list[Day] = []
+    real_start = time.perf_counter()
+    try:
+        entries, unit_keys = make_entries(args.mode, args.units)
+        for entry in entries:
+            entry.options = {**entry.data, CONF_ESCALATION_HOURS: args.escalation_hours}
+            hass.config_entries.async_add(entry)
+        seed_stores(unit_keys, start.timestamp())
+
+        await integration.async_setup(hass, {})
+        for entry in entries:
+            await integration.async_setup_entry(hass, entry)
+        await hass.async_block_till_done()
+
+        units = {
+            unit_key: unit
+            for data in async_loaded_entries(hass).values()
+            for unit_key, unit in data.units.items()
+        }
+        # Dias de atraso que cada usuário tolera antes de limpar
+        patience = {unit_key: rng.randint(0, args.clean_delay) for unit_key in units}
+        wheel = async_get_escalation(hass)
+
+        for day in range(args.days):
+            day_start = start + timedelta(days=day)
+            entries_data = async_loaded_entries(hass).values()
+            reminders = sum(data.metrics.reminders for data in entries_data)
+            escalations, notifications = wheel.fired, _notifications(hass)
+            writes, cleanings = hass.state_writes, 0
+            cpu = time.process_time()
+
+            timers = sim_clock.advance(day_start + timedelta(hours=CLEANING_HOUR))
+            for unit_key, unit in units.items():
+                snap = unit.due.snapshot()
+                if snap.is_overdue and snap.overdue_days >= patience[unit_key]:
+                    await unit.mark_cleaned.async_press()
+                    patience[unit_key] = rng.randint(0, args.clean_delay)
+                    cleanings += 1
+            timers += sim_clock.advance(day_start + timedelta(days=1))
+            await hass.async_block_till_done()
+
+            days.append(Day(
+                day=day + 1,
+                date=day_start.date().isoformat(),
+                reminders=sum(data.metrics.reminders for data in entries_data) - reminders,
+                escalations=wheel.fired - escalations,
+                cleanings=cleanings,
+                notifications=_notifications(hass) - notifications,
+                state_writes=hass.state_writes - writes,
+                timers=timers,
+                cpu_ms=round((time.process_time() - cpu) * 1000, 3),
+            ))
+
+        for entry in entries:
+            await integration.async_unload_entry(hass, entry)
+        dropped = async_get_delivery_queue(hass).stats.dropped
+    finally:
+        uninstall()
+    return days, time.perf_counter() - real_start, dropped
+
+
+def _report(args: argparse.Namespace, days: list[Day], real_seconds: float, dropped: int) -> None:
+    """Imprimir o resumo da simulação."""
+    cpu = [day.cpu_ms for day in days]
+    cpu_p95 = statistics.quantiles(cpu, n=20)[-1] if len(cpu) > 1 else cpu[0]
+    print(
+        f"{args.units} unidade(s), modo {args.mode}, {len(days)} dia(s) simulados "
+        f"em {real_seconds:.1f} s"
+    )
+    for label, key in (
+        ("lembretes", "reminders"),
+        ("reenvios", "escalations"),
+        ("limpezas", "cleanings"),
+        ("notificações", "notifications"),
+        ("escritas de estado", "state_writes"),
+        ("timers disparados", "timers"),
+    ):
+        values = [getattr(day, key) for day in days]
+        print(f"  {label:<20}{sum(values):>10} total {statistics.mean(values):>10.1f}/dia "
+              f"{max(values):>8} máx.")
+    print(f"  {'CPU ms/dia':<20}{statistics.mean(cpu):>10.2f} média {cpu_p95:>10.2f} p95 "
+          f"{max(cpu):>10.2f} máx.")
+    print(f"  {'descartes da fila':<20}{dropped:>10}")
+
+
+def main() -> None:
+    """Ponto de entrada da linha de comando."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--units", type=int, default=100)
+    parser.add_argument("--mode", choices=("unit", "fleet"), default="fleet")
+    parser.add_argument("--days", type=int, default=180, help="dias simulados")
+    parser.add_argument("--clean-delay", type=int, default=7,
+                        help="máximo de dias de atraso até o usuário limpar")
+    parser.add_argument("--escalation-hours", type=int, default=0,
+                        help="reenviar a cada N horas enquanto vencida (0 = não)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--csv", type=Path, help="gravar os números de cada dia neste arquivo")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    # Descartes da fila de entrega aparecem no resumo
+    logging.getLogger(f"custom_components.{DOMAIN}.delivery").setLevel(logging.ERROR)
+
+    days, real_seconds, dropped = asyncio.run(_simulate(args))
+    _report(args, days, real_seconds, dropped)
+    if args.csv is not None:
+        with args.csv.open("w", newline="", encoding="utf-8") as file:
+            writer = csv.DictWriter(file, fieldnames=list(asdict(days[0])))
+            writer.writeheader()
+            writer.writerows(asdict(day) for day in days)
+
+
+if __name__ == "__main__":
+    main()
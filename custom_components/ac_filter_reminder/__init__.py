@@ -1,172 +1,422 @@
 """Integração AC Filter Reminder para Home Assistant."""
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import partial
 import logging
+import math
+import time
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.event import async_track_time_change
-from homeassistant.const import Platform
+from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.typing import ConfigType
+from homeassistant.util import dt as dt_util
 
+from . import clock
 from .const import (
-    DOMAIN, PLATFORMS,
+    DOMAIN, PLATFORMS, DATA_DIGEST, DEDUPE_OFF,
     CONF_NAME, CONF_REMINDER_HOUR, CONF_REMINDER_MINUTE, CONF_NOTIFY_SERVICE,
-    DEFAULT_HOUR, DEFAULT_MINUTE
+    CONF_ENTRY_TYPE, CONF_UNITS, CONF_DIGEST, CONF_CLIMATE_ENTITY, CONF_RUNTIME_HOURS,
+    CONF_AIR_QUALITY_ENTITY, CONF_RECORDER_LEAN, CONF_FILTERS,
+    CONF_ESCALATION_HOURS, CONF_ESCALATION_DAYS, CONF_ESCALATION_SERVICE, CONF_NOTIFY_DEDUPE,
+    ENTRY_TYPE_FLEET, DEFAULT_HOUR, DEFAULT_MINUTE, DEFAULT_RUNTIME_HOURS,
+    DEFAULT_ESCALATION_HOURS, DEFAULT_ESCALATION_DAYS, DEFAULT_NOTIFY_DEDUPE,
+    DEVICE_MANUFACTURER, DEVICE_MODEL,
 )
+from .air_quality import AirQualityTracker
+from .due import DueSnapshot, DueState
+from .due_index import async_get_due_index
+from .escalation import async_get_escalation
+from .filters import FilterSet
+from .fleet import FleetDueEngine
+from .history import async_get_history
+from .models import EntryData, UnitData, async_get_entry_data
+from .runtime import RuntimeTracker
+from .store import async_get_state_store
+from .notifications import async_get_digest, async_get_notification_cache, async_notify
+from .scheduler import async_get_scheduler, next_reminder_time
+from .services import async_setup_services
+from .statistics import async_import_daily_statistics
+from .websocket_api import async_setup_websocket
 
 _LOGGER = logging.getLogger(__name__)
 
-# Estrutura em memória por entry
-# hass.data[DOMAIN][entry_id] = {
-#   "name": str,
-#   "notify_service": str | None,
-#   "hour": int, "minute": int,
-#   "entities": {
-#       "last_cleaned": entity_obj,
-#       "interval_days": entity_obj,
-#       "days_until_due": entity_obj,
-#       "cleaning_due": entity_obj,
-#       "mark_cleaned": entity_obj,
-#   },
-#   "unsub": callable (para descadastrar o lembrete)
-# }
+# Cada entrada carregada guarda seus dados em entry.runtime_data (EntryData,
+# em models.py), com as unidades (UnitData) por unit_key.
+#
+# O lembrete diário de todas as entries fica no agendador compartilhado
+# (hass.data[DOMAIN]["scheduler"]), indexado pelo entry_id. O histórico de
+# limpezas de todas as unidades fica em hass.data[DOMAIN]["history"], o
+# vencimento de todas, ordenado, em hass.data[DOMAIN]["due_index"], e os
+# reenvios pendentes das unidades vencidas em hass.data[DOMAIN]["escalation"].
 
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Configuração inicial da integração."""
     if DOMAIN not in hass.data:
         hass.data[DOMAIN] = {}
+    async_setup_services(hass)
+    async_setup_websocket(hass)
     return True
 
 
+def _option(entry: ConfigEntry, key: str, default=None):
+    """Ler uma opção da entrada, caindo no valor da configuração inicial."""
+    return entry.options.get(key, entry.data.get(key, default))
+
+
+def _unit_config(entry: ConfigEntry) -> dict[str, dict[str, Any]]:
+    """Unidades da entrada e seus vínculos: {unit_key: {name, climate, air_quality, filters}}.
+
+    É o que define as entidades e os trackers; mudar isso exige recarregar.
+    """
+    if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_FLEET:
+        return {
+            f"{entry.entry_id}_{unit['id']}": {
+                "name": unit["name"],
+                "climate": unit.get(CONF_CLIMATE_ENTITY),
+                "air_quality": unit.get(CONF_AIR_QUALITY_ENTITY),
+                "filters": unit.get(CONF_FILTERS, []),
+            }
+            for unit in _option(entry, CONF_UNITS, [])
+        }
+    return {
+        entry.entry_id: {
+            "name": entry.data.get(CONF_NAME),
+            "climate": _option(entry, CONF_CLIMATE_ENTITY) or None,
+            "air_quality": _option(entry, CONF_AIR_QUALITY_ENTITY) or None,
+            "filters": _option(entry, CONF_FILTERS, []),
+        }
+    }
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Configurar uma entrada da integração."""
     hass.data.setdefault(DOMAIN, {})
 
+    # Histórico e estado de todo o domínio (cada arquivo é lido uma única vez)
+    await async_get_history(hass)
+    state_store = await async_get_state_store(hass)
+
     name = entry.data.get(CONF_NAME)
-    hour = entry.options.get(CONF_REMINDER_HOUR, entry.data.get(CONF_REMINDER_HOUR, DEFAULT_HOUR))
-    minute = entry.options.get(CONF_REMINDER_MINUTE, entry.data.get(CONF_REMINDER_MINUTE, DEFAULT_MINUTE))
-    notify_service = entry.options.get(CONF_NOTIFY_SERVICE, entry.data.get(CONF_NOTIFY_SERVICE))
-
-    hass.data[DOMAIN][entry.entry_id] = {
-        "name": name,
-        "notify_service": notify_service,
-        "hour": hour,
-        "minute": minute,
-        "entities": {},
-        "unsub": None,
+    runtime_hours = _option(entry, CONF_RUNTIME_HOURS, DEFAULT_RUNTIME_HOURS)
+
+    engine: DueState | FleetDueEngine
+    config = _unit_config(entry)
+    if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_FLEET:
+        engine = FleetDueEngine(len(config))
+        dues = engine.units
+    else:
+        engine = DueState()
+        dues = [engine]
+    # Um único DeviceInfo por unidade, compartilhado pelas plataformas
+    units = {
+        unit_key: UnitData(
+            key=unit_key,
+            name=unit["name"],
+            climate=unit["climate"],
+            air_quality=unit["air_quality"],
+            due=unit_due,
+            device_info=DeviceInfo(
+                identifiers={(DOMAIN, unit_key)},
+                name=unit["name"],
+                manufacturer=DEVICE_MANUFACTURER,
+                model=DEVICE_MODEL,
+            ),
+        )
+        for (unit_key, unit), unit_due in zip(config.items(), dues)
+    }
+    # Filtros extras: mesmo dispositivo e mesmo vencimento (o do primeiro a vencer)
+    for unit_key, unit in units.items():
+        if filters := config[unit_key]["filters"]:
+            unit.due.attach_filters(FilterSet(filters))
+
+    # Unidades com climate vinculada também vencem pelas horas de uso
+    linked = {unit_key: (unit.climate, unit.due) for unit_key, unit in units.items() if unit.climate}
+    if linked:
+        engine.runtime_limit = runtime_hours * 3600
+
+    # Unidades com sensor de qualidade do ar têm o intervalo ajustado pela média
+    sensors = {
+        unit_key: (unit.air_quality, unit.due) for unit_key, unit in units.items() if unit.air_quality
     }
 
-    # Configurar plataformas
-    await hass.config_entries.async_forward_entry_setups(
-        entry, [Platform.SENSOR, Platform.BINARY_SENSOR, Platform.NUMBER, Platform.BUTTON]
+    # Restaurar última limpeza e intervalo a partir do store tipado; unidades
+    # sem registro migram do estado restaurado das entidades
+    start = time.perf_counter()
+    restored = sum(
+        state_store.async_attach(unit_key, unit.due) for unit_key, unit in units.items()
+    )
+    restore_seconds = time.perf_counter() - start
+    _LOGGER.debug(
+        "%s: %s de %s unidade(s) restauradas em %.2f ms (leitura do arquivo: %.2f ms)",
+        entry.title, restored, len(units), restore_seconds * 1000,
+        (state_store.load_seconds or 0) * 1000,
     )
 
-    # Registrar lembrete diário no horário configurado
+    entry.runtime_data = data = EntryData(
+        name=name,
+        notify_service=_option(entry, CONF_NOTIFY_SERVICE),
+        hour=_option(entry, CONF_REMINDER_HOUR, DEFAULT_HOUR),
+        minute=_option(entry, CONF_REMINDER_MINUTE, DEFAULT_MINUTE),
+        digest=_option(entry, CONF_DIGEST, False),
+        recorder_lean=_option(entry, CONF_RECORDER_LEAN, False),
+        escalation_hours=_option(entry, CONF_ESCALATION_HOURS, DEFAULT_ESCALATION_HOURS),
+        escalation_days=_option(entry, CONF_ESCALATION_DAYS, DEFAULT_ESCALATION_DAYS),
+        escalation_service=_option(entry, CONF_ESCALATION_SERVICE),
+        notify_dedupe=_option(entry, CONF_NOTIFY_DEDUPE, DEFAULT_NOTIFY_DEDUPE),
+        engine=engine,
+        units=units,
+        restore_seconds=restore_seconds,
+        runtime=RuntimeTracker(hass, entry.entry_id, linked, state_store) if linked else None,
+        air_quality=AirQualityTracker(hass, sensors, state_store) if sensors else None,
+    )
+
+    scheduler = async_get_scheduler(hass)
+    rollover_key = (entry.entry_id, "rollover")
+
     @callback
-    def _daily_check(now: datetime):
-        """Verificação diária para lembretes."""
-        data = hass.data[DOMAIN].get(entry.entry_id)
-        if not data:
-            return
-        
-        # Verificar se é o horário correto
-        if now.hour != hour or now.minute != minute:
-            return
-            
-        ents = data.get("entities", {})
-        last_cleaned = ents.get("last_cleaned")
-        interval_ent = ents.get("interval_days")
-        due = ents.get("cleaning_due")
-        days_until = ents.get("days_until_due")
-
-        if not (last_cleaned and interval_ent and due):
+    def _rollover(now: datetime) -> None:
+        """Atualizar as entidades no instante em que os dias mudam."""
+        engine.async_refresh(now)
+
+    @callback
+    def _async_schedule_rollover() -> None:
+        """Agendar a próxima mudança de estado derivada do relógio."""
+        valid_until = engine.next_change()
+        if math.isinf(valid_until):
+            scheduler.async_cancel(rollover_key)
             return
+        scheduler.async_schedule(
+            rollover_key, dt_util.utc_from_timestamp(valid_until), _rollover
+        )
+
+    # Índice de vencimentos do domínio (lido pelo calendário)
+    async_get_due_index(hass).async_add_units(
+        {unit_key: (unit.name, unit.due) for unit_key, unit in units.items()}
+    )
+
+    # Configurar plataformas (as entidades restauram o estado aqui)
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-        # Se estiver vencido, notifica
-        if due.is_on:
-            _notify(hass, entry, data["name"], last_cleaned.native_value, 
-                   interval_ent.native_value, days_until.native_value)
+    # Cada mudança (limpeza, intervalo ou virada do dia) reagenda a próxima;
+    # registrado só depois da restauração para não recalcular a cada entidade
+    engine.async_add_listener(_async_schedule_rollover)
+    _async_schedule_rollover()
 
-    # Configurar tracking de tempo para verificação diária
-    unsub = async_track_time_change(hass, _daily_check, minute="*", second=0)
-    hass.data[DOMAIN][entry.entry_id]["unsub"] = unsub
+    # Acompanhar as entidades climate e os sensores de qualidade do ar vinculados
+    if data.runtime is not None:
+        data.runtime.async_start()
+    if data.air_quality is not None:
+        data.air_quality.async_start()
+
+    # Registrar lembrete diário no horário configurado
+    _async_schedule_daily_check(hass, entry.entry_id, clock.utcnow())
+    entry.async_on_unload(
+        async_get_escalation(hass).async_register(
+            entry.entry_id, partial(_async_escalate, hass, entry.entry_id)
+        )
+    )
+
+    # Opções alteradas são aplicadas sem recriar as entidades
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
 
     return True
 
 
-def _notify(hass: HomeAssistant, entry: ConfigEntry, ac_name: str, 
-           last_cleaned, interval_days, days_until):
-    """Enviar notificações de lembrete com melhor formatação."""
-    title = f"🌬️ Lembrete: limpar filtro do {ac_name}"
-    
-    try:
-        if last_cleaned and hasattr(last_cleaned, 'strftime'):
-            last_cleaned_str = last_cleaned.strftime("%d/%m/%Y às %H:%M")
-        elif last_cleaned:
-            last_cleaned_str = str(last_cleaned)
-        else:
-            last_cleaned_str = "Nunca"
-    except Exception:
-        last_cleaned_str = "Data inválida"
-    
-    try:
-        days_until_str = str(days_until) if days_until is not None else "N/A"
-        interval_str = str(interval_days) if interval_days is not None else "N/A"
-    except Exception:
-        days_until_str = "N/A"
-        interval_str = "N/A"
-    
-    message = (
-        f"Está na hora de LIMPAR (não trocar) o filtro do {ac_name}.\n\n"
-        f"📅 Última limpeza: {last_cleaned_str}\n"
-        f"⏰ Intervalo configurado: {interval_str} dias\n"
-        f"⏳ Dias restantes: {days_until_str}\n\n"
-        f"💡 Após limpar, clique no botão 'Marcar como limpo agora' no dispositivo."
+@callback
+def _async_schedule_daily_check(hass: HomeAssistant, entry_id: str, now: datetime) -> None:
+    """Agendar a próxima verificação diária no horário atual da entrada."""
+    data = async_get_entry_data(hass, entry_id)
+    async_get_scheduler(hass).async_schedule(
+        entry_id,
+        next_reminder_time(data.hour, data.minute, now),
+        # Resolvido pelo nome a cada disparo: o perfil sob demanda troca a função
+        lambda fired: _async_daily_check(hass, entry_id, fired),
     )
 
-    # Notificação persistente
-    hass.async_create_task(hass.services.async_call(
-        "persistent_notification", "create",
-        {
-            "title": title, 
-            "message": message,
-            "notification_id": f"ac_filter_{entry.entry_id}"
-        },
-        blocking=False,
-    ))
-
-    # Notificação via notify.* se configurada
-    notify_service = hass.data[DOMAIN][entry.entry_id].get("notify_service")
-    if notify_service and notify_service.strip():
-        if "." in notify_service:
-            domain, service = notify_service.split(".", 1)
-        else:
-            domain, service = "notify", notify_service
-            
-        hass.async_create_task(hass.services.async_call(
-            domain, service, 
-            {"title": title, "message": message}, 
-            blocking=False
-        ))
+
+@callback
+def _async_daily_check(hass: HomeAssistant, entry_id: str, now: datetime) -> None:
+    """Verificação diária para lembretes."""
+    if (data := async_get_entry_data(hass, entry_id)) is None:
+        return
+
+    # Reagendar para o próximo dia antes de qualquer outra coisa
+    _async_schedule_daily_check(hass, entry_id, now)
+
+    start = time.perf_counter()
+    overdue: list[str] = []
+
+    for unit_key, unit in data.units.items():
+        snap = unit.due.snapshot(now)
+
+        # Se estiver vencido, notifica (ou acumula no resumo)
+        if not snap.is_overdue:
+            continue
+        overdue.append(unit_key)
+        _async_remind(hass, data, unit_key, unit, snap)
+
+    # Reenviar a cada N horas até a unidade ser limpa
+    if overdue and data.escalation_hours:
+        wheel = async_get_escalation(hass)
+        when = now + timedelta(hours=data.escalation_hours)
+        for unit_key in overdue:
+            wheel.async_schedule(entry_id, unit_key, when)
+
+    # Modo enxuto: o histórico de longo prazo entra aqui, um ponto por dia
+    if data.recorder_lean:
+        async_import_daily_statistics(hass, data.units, now)
+
+    data.metrics.record_daily_check(now, time.perf_counter() - start, len(overdue))
+
+
+@callback
+def _async_remind(
+    hass: HomeAssistant, data: EntryData, unit_key: str, unit: UnitData, snap: DueSnapshot,
+    escalation: bool = False,
+) -> None:
+    """Lembrar uma unidade vencida, no destino certo para o atraso dela.
+
+    Um reenvio (`escalation`) sai sempre: a mensagem de uma unidade vencida
+    não muda entre reenvios, e o `notify_dedupe` descartaria todos.
+    """
+    dedupe = DEDUPE_OFF if escalation else data.notify_dedupe
+    notify_service = data.notify_service
+    if (
+        data.escalation_service
+        and data.escalation_days
+        and snap.overdue_days >= data.escalation_days
+    ):
+        notify_service = data.escalation_service
+
+    # Vencida por um filtro extra: lembrar esse filtro
+    name, last_cleaned = unit.name, unit.due.last_cleaned
+    if snap.filter is not None and (filters := unit.due.filters) is not None:
+        name = f"{unit.name} ({snap.filter})"
+        last_cleaned = filters.last_cleaned(filters.index(snap.filter))
+    if data.digest:
+        async_get_digest(hass).async_add(
+            unit_key, name, notify_service, last_cleaned, snap, dedupe
+        )
+    else:
+        async_notify(hass, unit_key, name, notify_service, last_cleaned,
+                     snap.interval, snap.days_until, dedupe)
+
+
+@callback
+def _async_escalate(hass: HomeAssistant, entry_id: str, unit_keys: list[str], now: datetime) -> None:
+    """Reenviar o lembrete das unidades que continuam vencidas."""
+    if (data := async_get_entry_data(hass, entry_id)) is None or not data.escalation_hours:
+        return
+    wheel = async_get_escalation(hass)
+    when = now + timedelta(hours=data.escalation_hours)
+    units = data.units
+
+    for unit_key in unit_keys:
+        if (unit := units.get(unit_key)) is None:
+            continue
+        snap = unit.due.snapshot(now)
+        if not snap.is_overdue:
+            continue
+        _async_remind(hass, data, unit_key, unit, snap, escalation=True)
+        wheel.async_schedule(entry_id, unit_key, when)
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Aplicar as opções alteradas na entrada já carregada.
+
+    Horário, destinos das notificações, resumo, reenvios e horas de uso mudam
+    no lugar; só mudanças nas unidades, nos vínculos, nos filtros extras ou no
+    modo do recorder recarregam a entrada.
+    """
+    if (data := getattr(entry, "runtime_data", None)) is None:
+        return
+
+    current = {
+        unit_key: {
+            "name": unit.name,
+            "climate": unit.climate,
+            "air_quality": unit.air_quality,
+            "filters": unit.filters.config() if unit.filters is not None else [],
+        }
+        for unit_key, unit in data.units.items()
+    }
+    # O modo do recorder escolhe as classes das entidades: só recriando
+    if (
+        _unit_config(entry) != current
+        or _option(entry, CONF_RECORDER_LEAN, False) != data.recorder_lean
+    ):
+        _LOGGER.debug(
+            "%s: unidades, vínculos, filtros ou modo do recorder alterados, recarregando",
+            entry.title,
+        )
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    data.notify_service = _option(entry, CONF_NOTIFY_SERVICE)
+    data.digest = _option(entry, CONF_DIGEST, False)
+    data.notify_dedupe = _option(entry, CONF_NOTIFY_DEDUPE, DEFAULT_NOTIFY_DEDUPE)
+    data.escalation_days = _option(entry, CONF_ESCALATION_DAYS, DEFAULT_ESCALATION_DAYS)
+    data.escalation_service = _option(entry, CONF_ESCALATION_SERVICE)
+    data.escalation_hours = _option(entry, CONF_ESCALATION_HOURS, DEFAULT_ESCALATION_HOURS)
+    if not data.escalation_hours:
+        async_get_escalation(hass).async_cancel_entry(entry.entry_id)
+
+    hour = _option(entry, CONF_REMINDER_HOUR, DEFAULT_HOUR)
+    minute = _option(entry, CONF_REMINDER_MINUTE, DEFAULT_MINUTE)
+    if (hour, minute) != (data.hour, data.minute):
+        data.hour, data.minute = hour, minute
+        _async_schedule_daily_check(hass, entry.entry_id, clock.utcnow())
+
+    engine = data.engine
+    runtime_limit = _option(entry, CONF_RUNTIME_HOURS, DEFAULT_RUNTIME_HOURS) * 3600
+    if data.runtime is not None and runtime_limit != engine.runtime_limit:
+        engine.runtime_limit = runtime_limit
+        for unit in data.units.values():
+            if not unit.climate:
+                continue
+            # Reavaliar o vencimento pelas horas de uso com o novo limite
+            unit.due.set_runtime(unit.due.runtime_seconds)
+            if unit.runtime_hours is not None:
+                unit.runtime_hours.async_write_ha_state()
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Descarregar uma entrada da integração."""
-    unload_ok = await hass.config_entries.async_unload_platforms(
-        entry, [Platform.SENSOR, Platform.BINARY_SENSOR, Platform.NUMBER, Platform.BUTTON]
-    )
-    
-    data = hass.data[DOMAIN].pop(entry.entry_id, None)
-    if data and data.get("unsub"):
-        data["unsub"]()
-        
+    # Parar as horas de uso antes de cancelar os jobs: o último flush ainda
+    # pode reagendar a virada do dia
+    data: EntryData | None = getattr(entry, "runtime_data", None)
+    if data is not None and data.runtime is not None:
+        data.runtime.async_stop()
+    if data is not None and data.air_quality is not None:
+        data.air_quality.async_stop()
+
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
+    scheduler = async_get_scheduler(hass)
+    scheduler.async_cancel(entry.entry_id)
+    scheduler.async_cancel((entry.entry_id, "rollover"))
+
+    if data is not None:
+        entry.runtime_data = None
+        state_store = await async_get_state_store(hass)
+        for unit_key in data.units:
+            state_store.async_detach(unit_key)
+        async_get_due_index(hass).async_remove_units(list(data.units))
+        async_get_notification_cache(hass).async_discard(data.units)
+
     return unload_ok
 
 
-async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Recarregar uma entrada da integração."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
\ No newline at end of file
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apagar os dados persistidos de uma entrada removida."""
+    history = await async_get_history(hass)
+    history.async_remove_entry(entry.entry_id)
+    state_store = await async_get_state_store(hass)
+    state_store.async_remove_entry(entry.entry_id)
+    if (digest := hass.data.get(DOMAIN, {}).get(DATA_DIGEST)) is not None:
+        digest.async_discard_entry(entry.entry_id)
+
@@ -0,0 +1,153 @@
+"""Intervalo adaptativo a partir de um sensor de qualidade do ar (PM2.5/poeira)."""
+from __future__ import annotations
+
+import logging
+import math
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from . import clock
+from .const import (
+    AIR_QUALITY_MAX_FACTOR, AIR_QUALITY_MIN_FACTOR, AIR_QUALITY_REFERENCE,
+    AIR_QUALITY_SAVE_SECONDS, AIR_QUALITY_TIME_CONSTANT_HOURS,
+)
+from .due import DueState
+from .fleet import FleetUnitState
+from .store import UnitStateStore
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def adaptive_factor(average: float) -> float:
+    """Converter a média da qualidade do ar no fator do intervalo.
+
+    Na referência o intervalo manual vale como está; com o dobro da poeira
+    ele cai pela metade, com metade da poeira ele dobra, sempre dentro dos
+    limites `AIR_QUALITY_MIN_FACTOR`..`AIR_QUALITY_MAX_FACTOR`.
+    """
+    if average <= 0:
+        return AIR_QUALITY_MAX_FACTOR
+    return min(max(AIR_QUALITY_REFERENCE / average, AIR_QUALITY_MIN_FACTOR), AIR_QUALITY_MAX_FACTOR)
+
+
+def reading(state: State | None) -> float | None:
+    """Retornar a leitura numérica do sensor, ou None se não houver."""
+    if state is None or state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+        return None
+    try:
+        value = float(state.state)
+    except ValueError:
+        return None
+    return value if math.isfinite(value) and value >= 0 else None
+
+
+class AirQualityTracker:
+    """Média móvel exponencial das leituras dos sensores vinculados às unidades.
+
+    Cada leitura atualiza a média em O(1), sem consultar o recorder: o valor
+    anterior pesa pelo tempo em que ficou valendo, com constante de tempo de
+    `AIR_QUALITY_TIME_CONSTANT_HOURS`, então sensores que reportam a cada
+    minuto ou só quando mudam chegam à mesma média. Por unidade ficam só a
+    média (no estado da unidade, salva no store), a última leitura e o
+    instante dela.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        units: dict[str, tuple[str, DueState | FleetUnitState]],
+        state_store: UnitStateStore,
+        time_constant: float = AIR_QUALITY_TIME_CONSTANT_HOURS * 3600,
+    ) -> None:
+        """Initialize the tracker with {unit_key: (sensor_entity_id, due)}."""
+        self.hass = hass
+        self._dues = {unit_key: due for unit_key, (_, due) in units.items()}
+        self._entity_of = {unit_key: entity_id for unit_key, (entity_id, _) in units.items()}
+        self._by_entity: dict[str, list[str]] = {}
+        for unit_key, (entity_id, _) in units.items():
+            self._by_entity.setdefault(entity_id, []).append(unit_key)
+        self._state_store = state_store
+        self._time_constant = time_constant
+        # Última leitura e o instante (monotônico) em que chegou
+        self._last_value: dict[str, float | None] = dict.fromkeys(self._dues)
+        self._last_seen: dict[str, float] = {}
+        self._saved_at = clock.monotonic()
+        self._unsubs: list[CALLBACK_TYPE] = []
+
+        # A média salva volta a ajustar o intervalo antes das entidades lerem
+        for due in self._dues.values():
+            if (average := due.air_quality) is not None:
+                due.set_air_quality(average, adaptive_factor(average))
+
+    @property
+    def entity_ids(self) -> list[str]:
+        """Return the linked air quality sensors."""
+        return list(self._by_entity)
+
+    def sensor_entity(self, unit_key: str) -> str | None:
+        """Return the air quality sensor linked to a unit."""
+        return self._entity_of.get(unit_key)
+
+    @callback
+    def async_start(self) -> None:
+        """Ler as leituras atuais e começar a acompanhar as mudanças."""
+        now = clock.monotonic()
+        for entity_id in self._by_entity:
+            self._async_sample(entity_id, reading(self.hass.states.get(entity_id)), now)
+
+        self._unsubs.append(
+            async_track_state_change_event(
+                self.hass, list(self._by_entity), self._async_state_changed
+            )
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Parar de acompanhar os sensores."""
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs.clear()
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Incorporar uma nova leitura à média."""
+        self._async_sample(
+            event.data["entity_id"], reading(event.data["new_state"]), clock.monotonic()
+        )
+
+    @callback
+    def _async_sample(self, entity_id: str, value: float | None, now: float) -> None:
+        """Atualizar a média das unidades ligadas ao sensor."""
+        if value is None:
+            return
+        save = False
+
+        for unit_key in self._by_entity.get(entity_id, ()):
+            due = self._dues[unit_key]
+            average = due.air_quality
+            previous = self._last_value[unit_key]
+            if average is None:
+                average = value
+            elif previous is not None:
+                # A leitura anterior valeu durante todo o trecho até agora
+                elapsed = now - self._last_seen[unit_key]
+                alpha = -math.expm1(-elapsed / self._time_constant)
+                average += alpha * (previous - average)
+            self._last_value[unit_key] = value
+            self._last_seen[unit_key] = now
+
+            interval = due.effective_interval
+            due.set_air_quality(average, adaptive_factor(average))
+            if due.effective_interval != interval:
+                _LOGGER.debug(
+                    "%s: intervalo efetivo %s -> %s dias (média %.1f)",
+                    unit_key, interval, due.effective_interval, average,
+                )
+                save = True
+
+        # A média muda a cada leitura; basta gravá-la de tempos em tempos
+        if save or now - self._saved_at >= AIR_QUALITY_SAVE_SECONDS:
+            self._saved_at = now
+            self._state_store.async_schedule_save()
@@ -3,12 +3,12 @@ from __future__ import annotations
 from typing import Any
 
 from homeassistant.components.binary_sensor import BinarySensorEntity, BinarySensorDeviceClass
-from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN, DEVICE_MANUFACTURER, DEVICE_MODEL
+from .metrics import EntryMetrics, StateWriteCounter
+from .models import EntryData, UnitData
 
 
 async def async_setup_entry(
@@ -17,98 +17,85 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Configurar binary sensors da entrada."""
-    dev_info = DeviceInfo(
-        identifiers={(DOMAIN, entry.entry_id)},
-        name=entry.data.get("name"),
-        manufacturer=DEVICE_MANUFACTURER,
-        model=DEVICE_MODEL,
-    )
-    
-    ent = CleaningDueBinary(hass, entry, dev_info)
-    async_add_entities([ent])
-    
-    # Armazenar referência da entidade
-    hass.data[DOMAIN][entry.entry_id]["entities"]["cleaning_due"] = ent
+    data: EntryData = entry.runtime_data
+    entities: list[CleaningDueBinary] = []
+    binary_cls = LeanCleaningDueBinary if data.recorder_lean else CleaningDueBinary
+
+    for unit in data.units.values():
+        # Armazenar referência da entidade
+        unit.cleaning_due = binary_cls(unit, data.metrics)
+        entities.append(unit.cleaning_due)
+
+    async_add_entities(entities)
 
 
-class CleaningDueBinary(BinarySensorEntity):
+class CleaningDueBinary(StateWriteCounter, BinarySensorEntity):
     """Binary sensor para indicar se a limpeza está vencida."""
 
     _attr_has_entity_name = True
+    _attr_should_poll = False
     _attr_name = "Limpeza vencida"
     _attr_icon = "mdi:air-filter"
     _attr_device_class = BinarySensorDeviceClass.PROBLEM
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, device_info: DeviceInfo) -> None:
+    def __init__(self, unit: UnitData, metrics: EntryMetrics) -> None:
         """Initialize the binary sensor."""
-        self.hass = hass
-        self._entry = entry
-        self._attr_unique_id = f"{entry.entry_id}_cleaning_due"
-        self._attr_device_info = device_info
+        self._metrics = metrics
+        self._due = unit.due
+        self._attr_unique_id = f"{unit.key}_cleaning_due"
+        self._attr_device_info = unit.device_info
+
+    async def async_added_to_hass(self) -> None:
+        """Handle entity being added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._due.async_add_listener(self.async_write_ha_state))
 
     @property
     def is_on(self) -> bool:
         """Return true if cleaning is due."""
-        try:
-            data = self.hass.data[DOMAIN][self._entry.entry_id]["entities"]
-            last = data.get("last_cleaned")
-            interval_ent = data.get("interval_days")
-            
-            if not interval_ent or interval_ent.native_value is None:
-                return False
-                
-            interval = int(interval_ent.native_value)
-            
-            if not last or not last.native_value:
-                return True  # sem histórico => considerar como pendente
-                
-            days_since = self._days_since(last.native_value)
-            return days_since >= interval
-        except Exception:
-            return False
+        # Sem histórico => considerar como pendente
+        return self._due.snapshot().is_overdue
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return extra state attributes."""
-        try:
-            data = self.hass.data[DOMAIN][self._entry.entry_id]["entities"]
-            last = data.get("last_cleaned")
-            interval_ent = data.get("interval_days")
-            
-            if last and interval_ent and interval_ent.native_value is not None:
-                days_since = self._days_since(last.native_value) if last.native_value else None
-                interval = int(interval_ent.native_value)
-                
-                attrs = {
-                    "interval_days": interval,
-                    "days_since_cleaned": days_since,
-                }
-                
-                if days_since is not None:
-                    attrs.update({
-                        "is_overdue": days_since >= interval,
-                        "overdue_days": max(0, days_since - interval),
-                        "days_until_due": max(0, interval - days_since)
-                    })
-                    
-                return attrs
-        except Exception:
-            pass
-            
-        return {}
+        snap = self._due.snapshot()
+        attrs = {
+            "interval_days": self._due.interval,
+            "effective_interval_days": snap.interval,
+            "days_since_cleaned": snap.days_since,
+        }
+
+        if snap.days_since is not None:
+            attrs.update({
+                "is_overdue": snap.is_overdue,
+                "overdue_days": snap.overdue_days,
+                "days_until_due": snap.days_until,
+            })
+
+        if self._due.runtime_limit is not None:
+            attrs["runtime_due"] = snap.runtime_due
+
+        # Filtro extra que vence primeiro (None => o principal)
+        if self._due.filters is not None:
+            attrs["filter"] = snap.filter
+
+        return attrs
 
     @property
     def icon(self) -> str:
         """Return the icon based on state."""
-        if self.is_on:
+        if self._due.snapshot().is_overdue:
             return "mdi:air-filter-alert"
         return "mdi:air-filter"
 
-    def _days_since(self, dt) -> int:
-        """Calculate days since given datetime."""
-        if not dt:
-            return 10**6  # força "vencido" quando não há histórico
-            
-        from datetime import datetime, timezone
-        now = datetime.now(timezone.utc)
-        return int((now - dt).total_seconds() // 86400)
\ No newline at end of file
+
+class LeanCleaningDueBinary(CleaningDueBinary):
+    """Limpeza vencida sem os atributos derivados no recorder."""
+
+    _unrecorded_attributes = frozenset(
+        {
+            "interval_days", "effective_interval_days", "days_since_cleaned", "is_overdue",
+            "overdue_days", "days_until_due", "runtime_due", "filter",
+        }
+    )
@@ -2,12 +2,16 @@
 from __future__ import annotations
 
 from homeassistant.components.button import ButtonEntity
-from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN, DEVICE_MANUFACTURER, DEVICE_MODEL
+from . import clock
+from .const import DOMAIN, DATA_DIGEST, DATA_STATE
+from .delivery import async_get_delivery_queue
+from .metrics import EntryMetrics, StateWriteCounter
+from .models import EntryData, UnitData
+from .store import UnitStateStore
 
 
 async def async_setup_entry(
@@ -16,75 +20,125 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Configurar buttons da entrada."""
-    dev_info = DeviceInfo(
-        identifiers={(DOMAIN, entry.entry_id)},
-        name=entry.data.get("name"),
-        manufacturer=DEVICE_MANUFACTURER,
-        model=DEVICE_MODEL,
-    )
-    
-    ent = MarkCleanedButton(hass, entry, dev_info)
-    async_add_entities([ent])
-    
-    # Armazenar referência da entidade
-    hass.data[DOMAIN][entry.entry_id]["entities"]["mark_cleaned"] = ent
-
-
-class MarkCleanedButton(ButtonEntity):
+    data: EntryData = entry.runtime_data
+    state_store: UnitStateStore = hass.data[DOMAIN][DATA_STATE]
+    entities: list[ButtonEntity] = []
+
+    for unit in data.units.values():
+        # Armazenar referência da entidade
+        unit.mark_cleaned = MarkCleanedButton(unit, data.metrics)
+        entities.append(unit.mark_cleaned)
+
+        # Um botão por filtro extra, no mesmo dispositivo
+        if unit.filters is not None:
+            unit.filter_buttons = [
+                MarkFilterCleanedButton(unit, data.metrics, state_store, index)
+                for index in unit.filters
+            ]
+            entities.extend(unit.filter_buttons)
+
+    async_add_entities(entities)
+
+
+class MarkCleanedButton(StateWriteCounter, ButtonEntity):
     """Button para marcar como limpo agora."""
 
     _attr_has_entity_name = True
+    _attr_should_poll = False
     _attr_name = "Marcar como limpo agora"
     _attr_icon = "mdi:broom"
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, device_info: DeviceInfo) -> None:
+    def __init__(self, unit: UnitData, metrics: EntryMetrics) -> None:
         """Initialize the button."""
-        self.hass = hass
-        self._entry = entry
-        self._attr_unique_id = f"{entry.entry_id}_mark_cleaned"
-        self._attr_device_info = device_info
+        self._metrics = metrics
+        self._unit = unit
+        self._unit_key = unit.key
+        self._attr_unique_id = f"{unit.key}_mark_cleaned"
+        self._attr_device_info = unit.device_info
 
     async def async_press(self) -> None:
         """Handle the button press."""
+        queue = async_get_delivery_queue(self.hass)
         try:
             # Obter a entidade last_cleaned e marcar como limpo agora
-            entities = self.hass.data[DOMAIN][self._entry.entry_id]["entities"]
-            last_cleaned_entity = entities.get("last_cleaned")
+            last_cleaned_entity = self._unit.last_cleaned
             
             if last_cleaned_entity:
                 await last_cleaned_entity.async_mark_cleaned_now()
                 
                 # Limpar notificação persistente se existir
-                await self.hass.services.async_call(
+                queue.async_enqueue(
                     "persistent_notification", "dismiss",
-                    {"notification_id": f"ac_filter_{self._entry.entry_id}"},
-                    blocking=False,
+                    {"notification_id": f"ac_filter_{self._unit_key}"},
                 )
+                if (digest := self.hass.data[DOMAIN].get(DATA_DIGEST)) is not None:
+                    digest.async_discard(self._unit_key)
                 
                 # Log da ação
-                ac_name = self._entry.data.get("name", "AC")
-                self.hass.async_create_task(
-                    self.hass.services.async_call(
-                        "system_log", "write",
-                        {
-                            "message": f"Filtro do {ac_name} marcado como limpo via botão",
-                            "level": "info",
-                            "logger": f"{DOMAIN}.button"
-                        },
-                        blocking=False,
-                    )
-                )
-                
-        except Exception as err:
-            # Log do erro
-            self.hass.async_create_task(
-                self.hass.services.async_call(
+                ac_name = self._unit.name or "AC"
+                queue.async_enqueue(
                     "system_log", "write",
                     {
-                        "message": f"Erro ao marcar filtro como limpo: {err}",
-                        "level": "error",
+                        "message": f"Filtro do {ac_name} marcado como limpo via botão",
+                        "level": "info",
                         "logger": f"{DOMAIN}.button"
                     },
-                    blocking=False,
                 )
-            )
\ No newline at end of file
+                
+        except Exception as err:
+            # Log do erro
+            queue.async_enqueue(
+                "system_log", "write",
+                {
+                    "message": f"Erro ao marcar filtro como limpo: {err}",
+                    "level": "error",
+                    "logger": f"{DOMAIN}.button"
+                },
+            )
+
+
+class MarkFilterCleanedButton(StateWriteCounter, ButtonEntity):
+    """Button para marcar um filtro extra como limpo agora."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_icon = "mdi:air-filter"
+
+    def __init__(
+        self, unit: UnitData, metrics: EntryMetrics, state_store: UnitStateStore, index: int
+    ) -> None:
+        """Initialize the button."""
+        self._metrics = metrics
+        self._unit = unit
+        self._filters = unit.filters
+        self._index = index
+        self._state_store = state_store
+        self._attr_unique_id = f"{unit.key}_{self._filters.ids[index]}_mark_cleaned"
+        self._attr_name = f"Marcar {self._filters.names[index]} como limpo"
+        self._attr_device_info = unit.device_info
+
+    async def async_press(self) -> None:
+        """Handle the button press."""
+        self._filters.set_last_cleaned(self._index, clock.utcnow())
+        self._state_store.async_schedule_save()
+
+        # O lembrete da unidade pode ter sido deste filtro; se outro ainda
+        # estiver vencido, a próxima verificação lembra de novo
+        unit_key = self._unit.key
+        queue = async_get_delivery_queue(self.hass)
+        queue.async_enqueue(
+            "persistent_notification", "dismiss", {"notification_id": f"ac_filter_{unit_key}"},
+        )
+        if (digest := self.hass.data[DOMAIN].get(DATA_DIGEST)) is not None:
+            digest.async_discard(unit_key)
+        queue.async_enqueue(
+            "system_log", "write",
+            {
+                "message": (
+                    f"{self._filters.names[self._index]} do {self._unit.name or 'AC'} "
+                    "marcado como limpo via botão"
+                ),
+                "level": "info",
+                "logger": f"{DOMAIN}.button",
+            },
+        )
@@ -0,0 +1,134 @@
+"""Calendário com as próximas limpezas de todas as unidades."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import math
+
+from homeassistant.components.calendar import CalendarEntity, CalendarEvent
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.util import dt as dt_util
+
+from . import clock
+from .const import DOMAIN, DATA_CALENDAR
+from .due import SECONDS_PER_DAY
+from .due_index import DueIndex, async_get_due_index
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Configurar o calendário do domínio.
+
+    Há um único calendário para todas as entradas: a primeira a carregar o
+    cria, e as demais ficam registradas para assumi-lo se ela sair.
+    """
+    calendar = hass.data[DOMAIN].setdefault(DATA_CALENDAR, {"adders": {}, "entity": None})
+    calendar["adders"][entry.entry_id] = async_add_entities
+
+    @callback
+    def _async_unregister() -> None:
+        calendar["adders"].pop(entry.entry_id, None)
+
+    entry.async_on_unload(_async_unregister)
+
+    if calendar["entity"] is None:
+        calendar["entity"] = DueCalendar(hass, entry.entry_id)
+        async_add_entities([calendar["entity"]])
+
+
+class DueCalendar(CalendarEntity):
+    """Calendário das limpezas, lido direto do índice de vencimentos.
+
+    Cada unidade é um evento de dia inteiro na data em que vence; uma
+    unidade vencida continua como evento em curso até hoje, até ser limpa.
+    """
+
+    _attr_should_poll = False
+    _attr_name = "Limpezas de filtro"
+    _attr_icon = "mdi:calendar-check"
+    _attr_unique_id = f"{DOMAIN}_cleanings"
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the calendar."""
+        self.hass = hass
+        self._entry_id = entry_id
+        self._index: DueIndex = async_get_due_index(hass)
+
+    async def async_added_to_hass(self) -> None:
+        """Handle entity being added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._index.async_add_listener(self.async_write_ha_state))
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Passar o calendário para outra entrada carregada."""
+        await super().async_will_remove_from_hass()
+        calendar = self.hass.data[DOMAIN][DATA_CALENDAR]
+        if calendar["entity"] is self:
+            calendar["entity"] = None
+        adders = calendar["adders"]
+        adders.pop(self._entry_id, None)
+        if calendar["entity"] is None and adders:
+            entry_id, async_add_entities = next(iter(adders.items()))
+            calendar["entity"] = DueCalendar(self.hass, entry_id)
+            async_add_entities([calendar["entity"]])
+
+    @property
+    def event(self) -> CalendarEvent | None:
+        """Return the next cleaning (or the oldest overdue one)."""
+        if (first := self._index.first()) is None:
+            return None
+        return self._event(*first, clock.now())
+
+    async def async_get_events(
+        self, hass: HomeAssistant, start_date: datetime, end_date: datetime
+    ) -> list[CalendarEvent]:
+        """Return the cleanings between start_date and end_date."""
+        now = clock.now()
+        tomorrow = dt_util.start_of_local_day(now + timedelta(days=1))
+        # Um vencimento cai no dia do evento: um dia de folga nas pontas basta.
+        # Os vencidos vão até hoje, então entram todos se o período chega a hoje.
+        keys = self._index.between(
+            start_date.timestamp() - SECONDS_PER_DAY,
+            end_date.timestamp() + SECONDS_PER_DAY,
+            include_overdue=start_date < tomorrow,
+        )
+        events = []
+        for when, unit_key in keys:
+            event = self._event(when, unit_key, now)
+            if event.start_datetime_local < end_date and event.end_datetime_local > start_date:
+                events.append(event)
+        return events
+
+    def _event(self, when: float, unit_key: str, now: datetime) -> CalendarEvent:
+        """Montar o evento de uma unidade."""
+        name, due = self._index.unit(unit_key)
+        snap = due.snapshot()
+        today = now.date()
+
+        if when <= now.timestamp():
+            start = today if math.isinf(when) else dt_util.as_local(
+                dt_util.utc_from_timestamp(when)
+            ).date()
+            end = today + timedelta(days=1)
+            if snap.days_since is None:
+                description = "Sem registro de limpeza"
+            elif snap.runtime_due:
+                description = "Vencida pelas horas de uso"
+            else:
+                description = f"Vencida há {snap.overdue_days} dia(s)"
+        else:
+            start = dt_util.as_local(dt_util.utc_from_timestamp(when)).date()
+            end = start + timedelta(days=1)
+            description = f"Intervalo de {snap.interval} dias"
+
+        return CalendarEvent(
+            start=start,
+            end=end,
+            summary=f"Limpar {snap.filter}: {name}" if snap.filter else f"Limpar filtro: {name}",
+            description=description,
+            uid=unit_key,
+        )
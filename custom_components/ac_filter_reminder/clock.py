@@ -0,0 +1,91 @@
+"""Relógio da integração: hora atual e timers, trocáveis em uma simulação.
+
+Todo o código da integração lê a hora e arma timers por aqui, nunca direto
+em `datetime.now`, `dt_util.utcnow` ou nos helpers de evento. O padrão é o
+relógio do Home Assistant; `set_clock` instala outro (como o relógio
+simulado de `benchmarks/`) para avançar meses em segundos. Medições de
+desempenho (latência da fila de entrega, escritas por minuto) continuam no
+relógio real.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime, timedelta
+import time
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import event
+from homeassistant.util import dt as dt_util
+
+TimerAction = Callable[[datetime], Any]
+
+
+class Clock:
+    """Relógio de parede e timers do Home Assistant."""
+
+    def utcnow(self) -> datetime:
+        """Return the current time in UTC."""
+        return dt_util.utcnow()
+
+    def monotonic(self) -> float:
+        """Return a monotonic time in seconds, for elapsed intervals."""
+        return time.monotonic()
+
+    def async_track_point_in_utc_time(
+        self, hass: HomeAssistant, action: TimerAction, point_in_time: datetime
+    ) -> CALLBACK_TYPE:
+        """Chamar `action` no instante `point_in_time`."""
+        return event.async_track_point_in_utc_time(hass, action, point_in_time)
+
+    def async_call_later(
+        self, hass: HomeAssistant, delay: float | timedelta, action: TimerAction
+    ) -> CALLBACK_TYPE:
+        """Chamar `action` depois de `delay`."""
+        return event.async_call_later(hass, delay, action)
+
+
+_clock = Clock()
+
+
+def set_clock(clock: Clock) -> Callable[[], None]:
+    """Instalar outro relógio; o retorno restaura o anterior."""
+    global _clock  # noqa: PLW0603
+    previous, _clock = _clock, clock
+
+    def restore() -> None:
+        global _clock  # noqa: PLW0603
+        _clock = previous
+
+    return restore
+
+
+def utcnow() -> datetime:
+    """Retornar a hora atual em UTC."""
+    return _clock.utcnow()
+
+
+def now() -> datetime:
+    """Retornar a hora atual no fuso do Home Assistant."""
+    return dt_util.as_local(_clock.utcnow())
+
+
+def monotonic() -> float:
+    """Retornar o relógio monotônico, em segundos."""
+    return _clock.monotonic()
+
+
+@callback
+def async_track_point_in_utc_time(
+    hass: HomeAssistant, action: TimerAction, point_in_time: datetime
+) -> CALLBACK_TYPE:
+    """Armar um timer para um instante, no relógio atual."""
+    return _clock.async_track_point_in_utc_time(hass, action, point_in_time)
+
+
+@callback
+def async_call_later(
+    hass: HomeAssistant, delay: float | timedelta, action: TimerAction
+) -> CALLBACK_TYPE:
+    """Armar um timer relativo, no relógio atual."""
+    return _clock.async_call_later(hass, delay, action)
@@ -5,10 +5,44 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers.selector import (
+    EntitySelector, EntitySelectorConfig, SelectOptionDict, SelectSelector, SelectSelectorConfig,
+    SelectSelectorMode, TextSelector, TextSelectorConfig,
+)
 
 from .const import (
     DOMAIN, CONF_NAME, CONF_REMINDER_HOUR, CONF_REMINDER_MINUTE, CONF_NOTIFY_SERVICE,
-    DEFAULT_HOUR, DEFAULT_MINUTE
+    CONF_ENTRY_TYPE, CONF_UNITS, CONF_DIGEST, CONF_CLIMATE_ENTITY, CONF_CLIMATE_ENTITIES,
+    CONF_RUNTIME_HOURS, CONF_FILTERS,
+    CONF_AIR_QUALITY_ENTITY, CONF_RECORDER_LEAN, CONF_ESCALATION_HOURS, CONF_ESCALATION_DAYS,
+    CONF_ESCALATION_SERVICE, CONF_NOTIFY_DEDUPE, DEDUPE_OFF, DEDUPE_QUIET, DEDUPE_SKIP,
+    DEFAULT_ESCALATION_HOURS, DEFAULT_ESCALATION_DAYS, DEFAULT_NOTIFY_DEDUPE, ENTRY_TYPE_UNIT, ENTRY_TYPE_FLEET, STEP_BULK, DEFAULT_HOUR, DEFAULT_MINUTE, DEFAULT_RUNTIME_HOURS
+)
+from .filters import format_filter, parse_filters
+from .fleet import climate_units, format_units, parse_units
+
+# Entidade climate opcional: o filtro também vence pelas horas de uso
+CLIMATE_SELECTOR = EntitySelector(EntitySelectorConfig(domain="climate"))
+# Sensor opcional de PM2.5/poeira: o intervalo acompanha a média das leituras
+AIR_QUALITY_SELECTOR = EntitySelector(EntitySelectorConfig(domain="sensor"))
+# Cadastro em lote: várias entidades climate, uma unidade para cada
+CLIMATE_MULTI_SELECTOR = EntitySelector(EntitySelectorConfig(domain="climate", multiple=True))
+RUNTIME_HOURS = vol.All(vol.Coerce(int), vol.Range(min=1, max=10000))
+# Filtros extras da unidade, um por linha: "Pré-filtro: 30"
+FILTERS_SELECTOR = TextSelector(TextSelectorConfig(multiline=True))
+# Reenvio dos lembretes vencidos (0 = desligado)
+ESCALATION_HOURS = vol.All(vol.Coerce(int), vol.Range(min=0, max=168))
+ESCALATION_DAYS = vol.All(vol.Coerce(int), vol.Range(min=0, max=365))
+# Lembrete igual ao último enviado: enviar, só a notificação persistente ou nada
+NOTIFY_DEDUPE_SELECTOR = SelectSelector(
+    SelectSelectorConfig(
+        options=[
+            SelectOptionDict(value=DEDUPE_OFF, label="Enviar sempre"),
+            SelectOptionDict(value=DEDUPE_QUIET, label="Só a notificação persistente"),
+            SelectOptionDict(value=DEDUPE_SKIP, label="Não enviar"),
+        ],
+        mode=SelectSelectorMode.DROPDOWN,
+    )
 )
 
 
@@ -19,12 +53,20 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def async_step_user(self, user_input=None) -> FlowResult:
         """Handle the initial step."""
+        return self.async_show_menu(
+            step_id="user",
+            menu_options=[ENTRY_TYPE_UNIT, ENTRY_TYPE_FLEET, STEP_BULK],
+        )
+
+    async def async_step_unit(self, user_input=None) -> FlowResult:
+        """Adicionar um único ar-condicionado."""
         errors = {}
         
         if user_input is not None:
             # Validar nome único
             await self.async_set_unique_id(user_input[CONF_NAME])
             self._abort_if_unique_id_configured()
+            user_input[CONF_FILTERS] = parse_filters(user_input.get(CONF_FILTERS, ""))
             
             return self.async_create_entry(
                 title=user_input[CONF_NAME], 
@@ -38,18 +80,152 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             vol.Optional(CONF_REMINDER_MINUTE, default=DEFAULT_MINUTE): 
                 vol.All(int, vol.Range(min=0, max=59)),
             vol.Optional(CONF_NOTIFY_SERVICE, default=""): str,
+            vol.Optional(CONF_DIGEST, default=False): bool,
+            vol.Optional(CONF_CLIMATE_ENTITY): CLIMATE_SELECTOR,
+            vol.Optional(CONF_RUNTIME_HOURS, default=DEFAULT_RUNTIME_HOURS): RUNTIME_HOURS,
+            vol.Optional(CONF_AIR_QUALITY_ENTITY): AIR_QUALITY_SELECTOR,
+            vol.Optional(CONF_FILTERS, default=""): FILTERS_SELECTOR,
         })
         
         return self.async_show_form(
-            step_id="user", 
+            step_id="unit", 
             data_schema=schema, 
             errors=errors,
             description_placeholders={
                 "name_example": "AC Sala",
+                "filters_example": "Pré-filtro: 30\nSerpentina: 180",
+                "notify_example": "notify.mobile_app_seu_celular"
+            }
+        )
+
+    async def async_step_fleet(self, user_input=None) -> FlowResult:
+        """Adicionar uma frota: várias unidades em uma única entrada."""
+        errors = {}
+
+        if user_input is not None:
+            units = parse_units(user_input[CONF_UNITS])
+            if not units:
+                errors[CONF_UNITS] = "no_units"
+            else:
+                await self.async_set_unique_id(f"fleet_{user_input[CONF_NAME]}")
+                self._abort_if_unique_id_configured()
+
+                return self.async_create_entry(
+                    title=user_input[CONF_NAME],
+                    data={
+                        **user_input,
+                        CONF_ENTRY_TYPE: ENTRY_TYPE_FLEET,
+                        CONF_UNITS: units,
+                    },
+                )
+
+        schema = vol.Schema({
+            vol.Required(CONF_NAME): str,
+            vol.Required(CONF_UNITS): TextSelector(TextSelectorConfig(multiline=True)),
+            vol.Optional(CONF_REMINDER_HOUR, default=DEFAULT_HOUR): 
+                vol.All(int, vol.Range(min=0, max=23)),
+            vol.Optional(CONF_REMINDER_MINUTE, default=DEFAULT_MINUTE): 
+                vol.All(int, vol.Range(min=0, max=59)),
+            vol.Optional(CONF_NOTIFY_SERVICE, default=""): str,
+            vol.Optional(CONF_DIGEST, default=True): bool,
+            vol.Optional(CONF_RUNTIME_HOURS, default=DEFAULT_RUNTIME_HOURS): RUNTIME_HOURS,
+            vol.Optional(CONF_RECORDER_LEAN, default=False): bool,
+        })
+
+        return self.async_show_form(
+            step_id="fleet",
+            data_schema=schema,
+            errors=errors,
+            description_placeholders={
+                "name_example": "Prédio Comercial",
+                "units_example": (
+                    "AC Sala 101 | climate.sala_101 | sensor.pm25_sala_101\n"
+                    "AC Sala 102 | Pré-filtro: 30 | Serpentina: 180"
+                ),
+                "notify_example": "notify.mobile_app_seu_celular"
+            }
+        )
+
+    async def async_step_bulk(self, user_input=None) -> FlowResult:
+        """Criar uma frota com uma unidade por entidade climate escolhida."""
+        errors = {}
+
+        if user_input is not None:
+            climates = user_input.pop(CONF_CLIMATE_ENTITIES, [])
+            units = climate_units([
+                (entity_id, state.name if (state := self.hass.states.get(entity_id)) else entity_id)
+                for entity_id in climates
+            ])
+            if not units:
+                errors[CONF_CLIMATE_ENTITIES] = "no_units"
+            else:
+                await self.async_set_unique_id(f"fleet_{user_input[CONF_NAME]}")
+                self._abort_if_unique_id_configured()
+
+                # Uma única entrada: um setup de plataformas para todas as unidades
+                return self.async_create_entry(
+                    title=user_input[CONF_NAME],
+                    data={
+                        **user_input,
+                        CONF_ENTRY_TYPE: ENTRY_TYPE_FLEET,
+                        CONF_UNITS: units,
+                    },
+                )
+
+        # Pré-selecionar as entidades climate que ainda não estão vinculadas
+        linked = self._linked_climates()
+        available = sorted(
+            entity_id for entity_id in self.hass.states.async_entity_ids("climate")
+            if entity_id not in linked
+        )
+
+        schema = vol.Schema({
+            vol.Required(CONF_NAME): str,
+            vol.Required(CONF_CLIMATE_ENTITIES, default=available): CLIMATE_MULTI_SELECTOR,
+            vol.Optional(CONF_REMINDER_HOUR, default=DEFAULT_HOUR):
+                vol.All(int, vol.Range(min=0, max=23)),
+            vol.Optional(CONF_REMINDER_MINUTE, default=DEFAULT_MINUTE):
+                vol.All(int, vol.Range(min=0, max=59)),
+            vol.Optional(CONF_NOTIFY_SERVICE, default=""): str,
+            vol.Optional(CONF_DIGEST, default=True): bool,
+            vol.Optional(CONF_RUNTIME_HOURS, default=DEFAULT_RUNTIME_HOURS): RUNTIME_HOURS,
+            vol.Optional(CONF_RECORDER_LEAN, default=False): bool,
+        })
+
+        return self.async_show_form(
+            step_id=STEP_BULK,
+            data_schema=schema,
+            errors=errors,
+            description_placeholders={
+                "name_example": "Prédio Comercial",
+                "available": str(len(available)),
                 "notify_example": "notify.mobile_app_seu_celular"
             }
         )
 
+    async def async_step_import(self, import_data) -> FlowResult:
+        """Criar uma entrada a partir do serviço de importação."""
+        name = import_data[CONF_NAME]
+        is_fleet = import_data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_FLEET
+        # Mesmo unique_id dos formulários: importar de novo não duplica
+        await self.async_set_unique_id(f"fleet_{name}" if is_fleet else name)
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title=name, data=import_data)
+
+    def _linked_climates(self) -> set[str]:
+        """Entidades climate já vinculadas a alguma entrada."""
+        linked: set[str] = set()
+        for entry in self._async_current_entries(include_ignore=False):
+            config = {**entry.data, **entry.options}
+            if climate := config.get(CONF_CLIMATE_ENTITY):
+                linked.add(climate)
+            linked.update(
+                unit[CONF_CLIMATE_ENTITY]
+                for unit in config.get(CONF_UNITS, [])
+                if unit.get(CONF_CLIMATE_ENTITY)
+            )
+        return linked
+
     @staticmethod
     @callback
     def async_get_options_flow(config_entry):
@@ -66,8 +242,29 @@ class OptionsFlow(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input=None) -> FlowResult:
         """Manage the options."""
+        is_fleet = self.config_entry.data.get(CONF_ENTRY_TYPE) == ENTRY_TYPE_FLEET
+        current_units = self.config_entry.options.get(
+            CONF_UNITS,
+            self.config_entry.data.get(CONF_UNITS, [])
+        )
+
+        errors = {}
+
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            if is_fleet:
+                user_input = {
+                    **user_input,
+                    CONF_UNITS: parse_units(user_input[CONF_UNITS], current_units),
+                }
+                if not user_input[CONF_UNITS]:
+                    errors[CONF_UNITS] = "no_units"
+            else:
+                # Campo limpo no formulário => desvincular a entidade
+                user_input.setdefault(CONF_CLIMATE_ENTITY, "")
+                user_input.setdefault(CONF_AIR_QUALITY_ENTITY, "")
+                user_input[CONF_FILTERS] = parse_filters(user_input.get(CONF_FILTERS, ""))
+            if not errors:
+                return self.async_create_entry(title="", data=user_input)
 
         current_hour = self.config_entry.options.get(
             CONF_REMINDER_HOUR, 
@@ -81,6 +278,46 @@ class OptionsFlow(config_entries.OptionsFlow):
             CONF_NOTIFY_SERVICE, 
             self.config_entry.data.get(CONF_NOTIFY_SERVICE, "")
         )
+        current_digest = self.config_entry.options.get(
+            CONF_DIGEST,
+            self.config_entry.data.get(CONF_DIGEST, False)
+        )
+        current_runtime_hours = self.config_entry.options.get(
+            CONF_RUNTIME_HOURS,
+            self.config_entry.data.get(CONF_RUNTIME_HOURS, DEFAULT_RUNTIME_HOURS)
+        )
+        current_recorder_lean = self.config_entry.options.get(
+            CONF_RECORDER_LEAN,
+            self.config_entry.data.get(CONF_RECORDER_LEAN, False)
+        )
+        current_escalation_hours = self.config_entry.options.get(
+            CONF_ESCALATION_HOURS,
+            self.config_entry.data.get(CONF_ESCALATION_HOURS, DEFAULT_ESCALATION_HOURS)
+        )
+        current_escalation_days = self.config_entry.options.get(
+            CONF_ESCALATION_DAYS,
+            self.config_entry.data.get(CONF_ESCALATION_DAYS, DEFAULT_ESCALATION_DAYS)
+        )
+        current_escalation_service = self.config_entry.options.get(
+            CONF_ESCALATION_SERVICE,
+            self.config_entry.data.get(CONF_ESCALATION_SERVICE, "")
+        )
+        current_notify_dedupe = self.config_entry.options.get(
+            CONF_NOTIFY_DEDUPE,
+            self.config_entry.data.get(CONF_NOTIFY_DEDUPE, DEFAULT_NOTIFY_DEDUPE)
+        )
+        current_climate = self.config_entry.options.get(
+            CONF_CLIMATE_ENTITY,
+            self.config_entry.data.get(CONF_CLIMATE_ENTITY)
+        )
+        current_air_quality = self.config_entry.options.get(
+            CONF_AIR_QUALITY_ENTITY,
+            self.config_entry.data.get(CONF_AIR_QUALITY_ENTITY)
+        )
+        current_filters = self.config_entry.options.get(
+            CONF_FILTERS,
+            self.config_entry.data.get(CONF_FILTERS, [])
+        )
 
         schema = vol.Schema({
             vol.Optional(CONF_REMINDER_HOUR, default=current_hour): 
@@ -88,11 +325,39 @@ class OptionsFlow(config_entries.OptionsFlow):
             vol.Optional(CONF_REMINDER_MINUTE, default=current_minute): 
                 vol.All(int, vol.Range(min=0, max=59)),
             vol.Optional(CONF_NOTIFY_SERVICE, default=current_notify): str,
+            vol.Optional(CONF_DIGEST, default=current_digest): bool,
+            vol.Optional(CONF_RUNTIME_HOURS, default=current_runtime_hours): RUNTIME_HOURS,
+            vol.Optional(CONF_RECORDER_LEAN, default=current_recorder_lean): bool,
+            vol.Optional(CONF_ESCALATION_HOURS, default=current_escalation_hours): ESCALATION_HOURS,
+            vol.Optional(CONF_ESCALATION_DAYS, default=current_escalation_days): ESCALATION_DAYS,
+            vol.Optional(CONF_ESCALATION_SERVICE, default=current_escalation_service): str,
+            vol.Optional(CONF_NOTIFY_DEDUPE, default=current_notify_dedupe): NOTIFY_DEDUPE_SELECTOR,
         })
+
+        if is_fleet:
+            schema = schema.extend({
+                vol.Required(CONF_UNITS, default=format_units(current_units)):
+                    TextSelector(TextSelectorConfig(multiline=True)),
+            })
+        else:
+            schema = schema.extend({
+                vol.Optional(
+                    CONF_CLIMATE_ENTITY,
+                    description={"suggested_value": current_climate or None},
+                ): CLIMATE_SELECTOR,
+                vol.Optional(
+                    CONF_AIR_QUALITY_ENTITY,
+                    description={"suggested_value": current_air_quality or None},
+                ): AIR_QUALITY_SELECTOR,
+                vol.Optional(
+                    CONF_FILTERS, default="\n".join(map(format_filter, current_filters))
+                ): FILTERS_SELECTOR,
+            })
         
         return self.async_show_form(
             step_id="init", 
             data_schema=schema,
+            errors=errors,
             description_placeholders={
                 "notify_example": "notify.mobile_app_seu_celular"
             }
@@ -6,13 +6,116 @@ CONF_NAME = "name"
 CONF_REMINDER_HOUR = "reminder_hour"
 CONF_REMINDER_MINUTE = "reminder_minute"
 CONF_NOTIFY_SERVICE = "notify_service"  # ex.: notify.mobile_app_meu_celular
+CONF_DIGEST = "digest"  # agrupar lembretes de várias unidades em um resumo
+CONF_ENTRY_TYPE = "entry_type"
+CONF_UNITS = "units"  # modo frota: [{"id": str, "name": str, "climate_entity"?: str}, ...]
+CONF_CLIMATE_ENTITIES = "climate_entities"  # cadastro em lote: uma unidade por entidade climate
+CONF_CLIMATE_ENTITY = "climate_entity"  # entidade climate cujo uso desgasta o filtro
+CONF_RUNTIME_HOURS = "runtime_hours"  # horas de uso até vencer a limpeza
+CONF_AIR_QUALITY_ENTITY = "air_quality_entity"  # sensor de PM2.5/poeira que ajusta o intervalo
+CONF_RECORDER_LEAN = "recorder_lean"  # manter atributos derivados fora do recorder
+CONF_ESCALATION_HOURS = "escalation_hours"  # reenviar a cada N horas enquanto vencida (0 = não)
+CONF_ESCALATION_DAYS = "escalation_days"  # após M dias de atraso, usar o destino de escalonamento
+CONF_ESCALATION_SERVICE = "escalation_notify_service"  # ex.: notify.mobile_app_do_gerente
+CONF_NOTIFY_DEDUPE = "notify_dedupe"  # o que fazer com um lembrete igual ao último enviado
+CONF_FILTERS = "filters"  # filtros extras da unidade: [{"id": str, "name": str, "interval": int}, ...]
 
-PLATFORMS = ["sensor", "binary_sensor", "number", "button"]
+ENTRY_TYPE_UNIT = "unit"
+ENTRY_TYPE_FLEET = "fleet"
+STEP_BULK = "bulk"  # frota criada a partir das entidades climate existentes
+
+PLATFORMS = ["sensor", "binary_sensor", "number", "button", "calendar"]
 DEVICE_MANUFACTURER = "VictorFS"
 DEVICE_MODEL = "AC Filter Reminder"
 
+# Chaves de hass.data[DOMAIN] compartilhadas por todas as entries
+DATA_SCHEDULER = "scheduler"
+DATA_DIGEST = "digest"
+DATA_DELIVERY = "delivery"
+DATA_HISTORY = "history"
+DATA_STATE = "state"
+DATA_DUE_INDEX = "due_index"
+DATA_CALENDAR = "calendar"
+DATA_ESCALATION = "escalation"
+DATA_NOTIFICATION_CACHE = "notification_cache"
+DATA_PROFILER = "profiler"
+
+# Resumo de notificações
+DIGEST_WINDOW_SECONDS = 10
+DIGEST_NOTIFICATION_ID = "ac_filter_digest"
+
+# Lembretes repetidos das unidades vencidas
+DEFAULT_ESCALATION_HOURS = 0
+DEFAULT_ESCALATION_DAYS = 0
+ESCALATION_SLOT_SECONDS = 60  # largura de cada fatia da roda de reenvios
+
+# Lembrete igual ao último enviado ao mesmo destino
+DEDUPE_OFF = "off"  # enviar sempre
+DEDUPE_QUIET = "quiet"  # só atualizar a notificação persistente, sem push
+DEDUPE_SKIP = "skip"  # não enviar nada
+DEDUPE_POLICIES = [DEDUPE_OFF, DEDUPE_QUIET, DEDUPE_SKIP]  # do mais ao menos permissivo
+DEFAULT_NOTIFY_DEDUPE = DEDUPE_OFF
+NOTIFY_FINGERPRINT_MAX = 1024  # destinos x unidades lembrados (LRU)
+
+# Fila de entrega de notificações
+DELIVERY_CONCURRENCY = 4
+DELIVERY_TIMEOUT_SECONDS = 15
+DELIVERY_RETRIES = 3
+DELIVERY_BACKOFF_SECONDS = 2
+DELIVERY_MAX_PENDING = 500  # além disso, só lembretes entram (log/remoção são descartados)
+DELIVERY_DROP_LOG_SECONDS = 60  # no máximo um aviso de descarte por minuto
+
+# Horas de uso via entidade climate vinculada
+DEFAULT_RUNTIME_HOURS = 250
+RUNTIME_FLUSH_SECONDS = 300
+
+# Intervalo adaptativo pela qualidade do ar (média móvel exponencial)
+AIR_QUALITY_REFERENCE = 12.0  # µg/m³ em que o intervalo manual vale como está
+AIR_QUALITY_TIME_CONSTANT_HOURS = 72  # constante de tempo da média
+AIR_QUALITY_MIN_FACTOR = 0.5
+AIR_QUALITY_MAX_FACTOR = 1.5
+AIR_QUALITY_SAVE_SECONDS = 3600  # gravar a média no máximo uma vez por hora
+
+# Histórico de limpezas (helpers.storage)
+HISTORY_STORAGE_KEY = f"{DOMAIN}.history"
+HISTORY_STORAGE_VERSION = 1
+HISTORY_MAX_ENTRIES = 50
+HISTORY_SAVE_DELAY = 30
+
+# Estado autoritativo das unidades (helpers.storage)
+STATE_STORAGE_KEY = f"{DOMAIN}.state"
+STATE_STORAGE_VERSION = 1
+STATE_SAVE_DELAY = 10
+
 ATTR_LAST_CLEANED = "last_cleaned"
 ATTR_INTERVAL_DAYS = "interval_days"
+ATTR_TIMESTAMP = "timestamp"
+ATTR_DAYS = "days"
+ATTR_SECONDS = "seconds"
+ATTR_TOP = "top"
+ATTR_FILTER = "filter"
+ATTR_PATH = "path"
+ATTR_FORMAT = "format"
+
+# Serviços do domínio
+SERVICE_MARK_CLEANED = "mark_cleaned"
+SERVICE_SET_INTERVAL = "set_interval"
+SERVICE_PROFILE = "profile"
+SERVICE_EXPORT = "export"
+SERVICE_IMPORT = "import"
+
+# Perfil sob demanda: duração (s) e linhas do resumo no log
+DEFAULT_PROFILE_SECONDS = 60
+DEFAULT_PROFILE_TOP = 20
+
+# Importação/exportação: formatos aceitos e linhas lidas ou gravadas por lote
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+TRANSFER_BATCH_ROWS = 500
+# Os arquivos ficam só nesta subpasta da configuração, com uma destas extensões
+TRANSFER_DIR = DOMAIN
+TRANSFER_EXTENSIONS = (".csv", ".jsonl", ".ndjson")
+
 DEFAULT_INTERVAL_DAYS = 60
 DEFAULT_HOUR = 9
 DEFAULT_MINUTE = 0
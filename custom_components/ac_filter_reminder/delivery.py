@@ -0,0 +1,206 @@
+"""Fila de entrega das chamadas de serviço do AC Filter Reminder."""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import asdict, dataclass
+import logging
+import time
+from typing import Any, NamedTuple
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    DOMAIN, DATA_DELIVERY,
+    DELIVERY_BACKOFF_SECONDS, DELIVERY_CONCURRENCY, DELIVERY_DROP_LOG_SECONDS, DELIVERY_MAX_PENDING,
+    DELIVERY_RETRIES, DELIVERY_TIMEOUT_SECONDS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Chamadas que podem ser descartadas com a fila cheia: a linha no log do
+# sistema e a remoção de uma notificação. Lembretes (`create`, `notify.*`)
+# nunca são descartados.
+LOW_PRIORITY_CALLS = frozenset({("system_log", "write"), ("persistent_notification", "dismiss")})
+
+
+class ServiceCall(NamedTuple):
+    """Uma chamada de serviço aguardando entrega."""
+
+    domain: str
+    service: str
+    data: dict[str, Any]
+    queued_at: float
+
+
+@dataclass
+class DeliveryStats:
+    """Contadores de entrega, baratos o suficiente para ficarem sempre ligados."""
+
+    sent: int = 0
+    failed: int = 0
+    retries: int = 0
+    timeouts: int = 0
+    dropped: int = 0
+    latency_last: float | None = None
+    latency_max: float = 0.0
+    latency_total: float = 0.0
+    last_error: str | None = None
+
+    @property
+    def latency_avg(self) -> float | None:
+        """Return the mean delivery latency in seconds."""
+        return self.latency_total / self.sent if self.sent else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters as a plain dict."""
+        return {**asdict(self), "latency_avg": self.latency_avg}
+
+
+class DeliveryQueue:
+    """Entrega `persistent_notification`, `notify.*` e `system_log` com limites.
+
+    No máximo `concurrency` chamadas ficam em andamento ao mesmo tempo; cada
+    uma tem timeout próprio e é repetida com backoff exponencial. A ordem de
+    chegada é mantida. Com `max_pending` chamadas na fila, cada chamada nova
+    descarta a chamada de baixa prioridade (`LOW_PRIORITY_CALLS`) mais antiga;
+    sem nenhuma na fila, a nova é descartada se também for de baixa prioridade
+    e aceita além do limite se for um lembrete.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        concurrency: int = DELIVERY_CONCURRENCY,
+        timeout: float = DELIVERY_TIMEOUT_SECONDS,
+        retries: int = DELIVERY_RETRIES,
+        backoff: float = DELIVERY_BACKOFF_SECONDS,
+        max_pending: int = DELIVERY_MAX_PENDING,
+    ) -> None:
+        """Initialize the queue."""
+        self.hass = hass
+        self._concurrency = concurrency
+        self._timeout = timeout
+        self._retries = retries
+        self._backoff = backoff
+        self._max_pending = max_pending
+        self._pending: deque[ServiceCall] = deque()
+        self._low_pending = 0  # chamadas de baixa prioridade em _pending
+        self._dropped_unlogged = 0
+        self._drop_logged_at: float | None = None
+        self._workers = 0
+        self.stats = DeliveryStats()
+
+    @property
+    def pending(self) -> int:
+        """Return the number of queued calls."""
+        return len(self._pending)
+
+    @callback
+    def async_enqueue(self, domain: str, service: str, data: dict[str, Any]) -> None:
+        """Enfileirar uma chamada de serviço, sem bloquear quem chama."""
+        low = (domain, service) in LOW_PRIORITY_CALLS
+        if (
+            len(self._pending) >= self._max_pending
+            and not self._async_drop_low()
+            and low
+        ):
+            # Nada de baixa prioridade na fila: a própria chamada é descartada
+            self._async_count_drop()
+            return
+        self._pending.append(ServiceCall(domain, service, data, time.monotonic()))
+        if low:
+            self._low_pending += 1
+
+        if self._workers < self._concurrency:
+            self._workers += 1
+            self.hass.async_create_background_task(
+                self._async_worker(), f"{DOMAIN} delivery worker"
+            )
+
+    @callback
+    def _async_drop_low(self) -> bool:
+        """Descartar a chamada de baixa prioridade mais antiga da fila, se houver."""
+        if not self._low_pending:
+            return False
+        for index, call in enumerate(self._pending):
+            if (call.domain, call.service) in LOW_PRIORITY_CALLS:
+                del self._pending[index]
+                self._low_pending -= 1
+                break
+        self._async_count_drop()
+        return True
+
+    @callback
+    def _async_count_drop(self) -> None:
+        """Contar um descarte e avisar no log, no máximo uma vez por minuto."""
+        self.stats.dropped += 1
+        self._dropped_unlogged += 1
+        now = time.monotonic()
+        if self._drop_logged_at is None or now - self._drop_logged_at >= DELIVERY_DROP_LOG_SECONDS:
+            _LOGGER.warning(
+                "Fila de notificações cheia: %s chamadas de log/remoção descartadas "
+                "(total: %s); nenhum lembrete foi descartado",
+                self._dropped_unlogged, self.stats.dropped,
+            )
+            self._drop_logged_at = now
+            self._dropped_unlogged = 0
+
+    @callback
+    def _async_pop(self) -> ServiceCall:
+        """Retirar a próxima chamada da fila."""
+        call = self._pending.popleft()
+        if (call.domain, call.service) in LOW_PRIORITY_CALLS:
+            self._low_pending -= 1
+        return call
+
+    async def _async_worker(self) -> None:
+        """Entregar chamadas até a fila esvaziar."""
+        try:
+            while self._pending:
+                await self._async_deliver(self._async_pop())
+        finally:
+            self._workers -= 1
+
+    async def _async_deliver(self, call: ServiceCall) -> None:
+        """Entregar uma chamada, com timeout e novas tentativas."""
+        stats = self.stats
+        for attempt in range(self._retries + 1):
+            if attempt:
+                stats.retries += 1
+                await asyncio.sleep(self._backoff * 2 ** (attempt - 1))
+            try:
+                await asyncio.wait_for(
+                    self.hass.services.async_call(
+                        call.domain, call.service, call.data, blocking=True
+                    ),
+                    self._timeout,
+                )
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+                error = f"timeout após {self._timeout}s"
+            except Exception as err:  # noqa: BLE001
+                error = str(err) or type(err).__name__
+            else:
+                latency = time.monotonic() - call.queued_at
+                stats.sent += 1
+                stats.latency_last = latency
+                stats.latency_total += latency
+                stats.latency_max = max(stats.latency_max, latency)
+                return
+
+        stats.failed += 1
+        stats.last_error = f"{call.domain}.{call.service}: {error}"
+        _LOGGER.warning(
+            "Falha ao chamar %s.%s após %s tentativas: %s (falhas: %s)",
+            call.domain, call.service, self._retries + 1, error, stats.failed,
+        )
+
+
+@callback
+def async_get_delivery_queue(hass: HomeAssistant) -> DeliveryQueue:
+    """Obter (ou criar) a fila de entrega compartilhada do domínio."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (queue := domain_data.get(DATA_DELIVERY)) is None:
+        queue = domain_data[DATA_DELIVERY] = DeliveryQueue(hass)
+    return queue
@@ -0,0 +1,96 @@
+"""Diagnóstico da integração AC Filter Reminder."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DOMAIN, DATA_DIGEST, DATA_DUE_INDEX, DATA_ESCALATION, DATA_HISTORY, DATA_NOTIFICATION_CACHE,
+    DATA_SCHEDULER, DATA_STATE,
+)
+from .delivery import async_get_delivery_queue
+from .models import EntryData, async_loaded_entries
+
+
+def _entry_diagnostics(data: EntryData) -> dict[str, Any]:
+    """Resumo de uma entrada carregada."""
+    engine = data.engine
+    units = data.units
+    return {
+        "units": len(units),
+        "overdue_units": sum(unit.due.snapshot().is_overdue for unit in units.values()),
+        "extra_filters": sum(len(unit.filters) for unit in units.values() if unit.filters is not None),
+        "digest": data.digest,
+        "reminder_time": f"{data.hour:02d}:{data.minute:02d}",
+        "escalation_hours": data.escalation_hours,
+        "notify_dedupe": data.notify_dedupe,
+        "restore_seconds": data.restore_seconds,
+        "due_computations": engine.computations,
+        "due_compute_seconds": engine.compute_seconds,
+        "metrics": data.metrics.as_dict(),
+    }
+
+
+def _domain_diagnostics(hass: HomeAssistant) -> dict[str, Any]:
+    """Resumo de todo o domínio: objetos compartilhados e totais das entradas."""
+    domain_data = hass.data.get(DOMAIN, {})
+    entries = async_loaded_entries(hass)
+
+    scheduler = domain_data.get(DATA_SCHEDULER)
+    digest = domain_data.get(DATA_DIGEST)
+    history = domain_data.get(DATA_HISTORY)
+    state_store = domain_data.get(DATA_STATE)
+    due_index = domain_data.get(DATA_DUE_INDEX)
+    escalation = domain_data.get(DATA_ESCALATION)
+    notification_cache = domain_data.get(DATA_NOTIFICATION_CACHE)
+    queue = async_get_delivery_queue(hass)
+
+    return {
+        "entries": len(entries),
+        "units": sum(len(data.units) for data in entries.values()),
+        "daily_checks": sum(data.metrics.daily_checks for data in entries.values()),
+        "daily_check_seconds": sum(data.metrics.daily_check_total for data in entries.values()),
+        "state_writes": sum(data.metrics.state_writes for data in entries.values()),
+        "due_compute_seconds": sum(data.engine.compute_seconds for data in entries.values()),
+        "scheduler": {
+            "jobs": len(scheduler) if scheduler is not None else 0,
+            "next_fire": scheduler.next_fire if scheduler is not None else None,
+        },
+        "digest_pending": digest.pending if digest is not None else 0,
+        "delivery": {**queue.stats.as_dict(), "pending": queue.pending},
+        "notification_cache": {
+            "fingerprints": len(notification_cache),
+            "renders": notification_cache.renders,
+            "hits": notification_cache.hits,
+            "skipped": notification_cache.skipped,
+        } if notification_cache is not None else None,
+        "history_units": len(history) if history is not None else 0,
+        "escalation": {
+            "pending": len(escalation) if escalation is not None else 0,
+            "slots": escalation.slots if escalation is not None else 0,
+            "fired": escalation.fired if escalation is not None else 0,
+        },
+        "due_index": {
+            "units": len(due_index) if due_index is not None else 0,
+            "moves": due_index.moves if due_index is not None else 0,
+        },
+        "state_load_seconds": state_store.load_seconds if state_store is not None else None,
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Retornar o diagnóstico da entrada e do domínio."""
+    data: EntryData | None = getattr(entry, "runtime_data", None)
+    return {
+        "entry": {
+            "title": entry.title,
+            "data": dict(entry.data),
+            "options": dict(entry.options),
+        },
+        "runtime": _entry_diagnostics(data) if data is not None else None,
+        "domain": _domain_diagnostics(hass),
+    }
@@ -0,0 +1,223 @@
+"""Estado de vencimento compartilhado para AC Filter Reminder."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from datetime import datetime
+import math
+import time
+from typing import TYPE_CHECKING, NamedTuple
+
+from . import clock
+from .const import DEFAULT_INTERVAL_DAYS
+
+if TYPE_CHECKING:
+    from .filters import FilterSet
+
+SECONDS_PER_DAY = 86400
+
+
+class DueSnapshot(NamedTuple):
+    """Resultado imutável do cálculo de vencimento."""
+
+    interval: int
+    days_since: int | None
+    days_until: int | None
+    is_overdue: bool
+    overdue_days: int
+    valid_until: float
+    runtime_due: bool = False
+    # Filtro extra que vence primeiro (None => o filtro principal)
+    filter: str | None = None
+
+
+def scale_interval(interval: int, factor: float) -> int:
+    """Aplicar o fator da qualidade do ar ao intervalo manual (mínimo de 1 dia)."""
+    if factor == 1.0:
+        return interval
+    return max(1, round(interval * factor))
+
+
+def compute_due(
+    last_cleaned: datetime | None, interval: int, now_ts: float, runtime_due: bool = False
+) -> DueSnapshot:
+    """Calcular o estado de vencimento para o instante `now_ts` (epoch).
+
+    Os dias contam períodos completos de 24h desde a última limpeza, então o
+    resultado só muda no próximo aniversário desse instante (`valid_until`).
+    `runtime_due` indica que as horas de uso já passaram do limite.
+    """
+    return compute_due_ts(
+        last_cleaned.timestamp() if last_cleaned is not None else None,
+        interval, now_ts, runtime_due,
+    )
+
+
+def compute_due_ts(
+    last_ts: float | None, interval: int, now_ts: float, runtime_due: bool = False
+) -> DueSnapshot:
+    """Como `compute_due`, com a última limpeza já em epoch."""
+    if last_ts is None:
+        # Sem histórico => considerar como pendente, sem data para expirar
+        return DueSnapshot(interval, None, None, True, 0, math.inf, runtime_due)
+
+    days_since = int((now_ts - last_ts) // SECONDS_PER_DAY)
+    is_overdue = days_since >= interval or runtime_due
+    return DueSnapshot(
+        interval=interval,
+        days_since=days_since,
+        days_until=max(interval - days_since, 0),
+        is_overdue=is_overdue,
+        overdue_days=max(0, days_since - interval),
+        valid_until=last_ts + (days_since + 1) * SECONDS_PER_DAY,
+        runtime_due=runtime_due,
+    )
+
+
+def most_urgent(snapshots: Iterable[DueSnapshot]) -> DueSnapshot:
+    """Juntar os snapshots dos filtros de uma unidade no que vence primeiro.
+
+    Vencido ganha de em dia; entre vencidos, o mais atrasado; entre em dia, o
+    que vence antes. O resultado vale até o primeiro `valid_until` de todos.
+    """
+    snapshots = list(snapshots)
+    first = min(
+        snapshots,
+        key=lambda snap: (not snap.is_overdue, snap.days_until or 0, -snap.overdue_days),
+    )
+    valid_until = min(snap.valid_until for snap in snapshots)
+    if valid_until != first.valid_until:
+        first = first._replace(valid_until=valid_until)
+    return first
+
+
+class ListenerMixin:
+    """Lista de listeners avisados quando o estado derivado muda."""
+
+    __slots__ = ()
+
+    _listeners: list[Callable[[], None]]
+
+    def async_add_listener(self, update_callback: Callable[[], None]) -> Callable[[], None]:
+        """Registrar um listener e retornar a função para removê-lo."""
+        self._listeners.append(update_callback)
+
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    def _async_update_listeners(self) -> None:
+        """Avisar os listeners de que o estado mudou."""
+        for update_callback in list(self._listeners):
+            update_callback()
+
+
+class DueState(ListenerMixin):
+    """Última limpeza e intervalo de uma unidade, com o cálculo memoizado.
+
+    Todas as plataformas leem o mesmo snapshot, que só é recalculado na
+    virada do dia, ao marcar como limpo ou ao alterar o intervalo. Os
+    listeners são avisados sempre que o estado derivado muda.
+
+    Com uma entidade climate vinculada, as horas de uso desde a limpeza
+    (`runtime_seconds`) também vencem a unidade ao passar de `runtime_limit`.
+    Com um sensor de qualidade do ar, `interval_factor` encurta ou alonga o
+    intervalo manual; o snapshot usa o intervalo efetivo.
+
+    Filtros extras (`filters`) entram no mesmo snapshot: o da unidade é o do
+    filtro que vence primeiro.
+    """
+
+    def __init__(self, interval: int = DEFAULT_INTERVAL_DAYS) -> None:
+        """Initialize the due state."""
+        self.last_cleaned: datetime | None = None
+        self.interval = interval
+        self.runtime_seconds = 0.0
+        self.runtime_limit: float | None = None
+        self.runtime_due = False
+        # Média móvel da qualidade do ar e o fator aplicado ao intervalo
+        self.air_quality: float | None = None
+        self.interval_factor = 1.0
+        self.filters: FilterSet | None = None
+        self._snapshot: DueSnapshot | None = None
+        self._listeners: list[Callable[[], None]] = []
+        # Métricas: quantos cálculos foram feitos e quanto tempo levaram
+        self.computations = 0
+        self.compute_seconds = 0.0
+
+    def attach_filters(self, filters: FilterSet) -> None:
+        """Vincular os filtros extras da unidade."""
+        self.filters = filters
+        filters.on_change = self._filters_changed
+
+    def _filters_changed(self) -> None:
+        """Invalidar o snapshot quando um filtro extra muda."""
+        self._snapshot = None
+        self._async_update_listeners()
+
+    def set_last_cleaned(self, value: datetime | None) -> None:
+        """Atualizar a data da última limpeza (e zerar as horas de uso)."""
+        self.last_cleaned = value
+        self.runtime_seconds = 0.0
+        self.runtime_due = False
+        self._snapshot = None
+        self._async_update_listeners()
+
+    def set_runtime(self, seconds: float) -> None:
+        """Atualizar as horas de uso; avisa só quando o vencimento muda."""
+        self.runtime_seconds = seconds
+        runtime_due = self.runtime_limit is not None and seconds >= self.runtime_limit
+        if runtime_due != self.runtime_due:
+            self.runtime_due = runtime_due
+            self._snapshot = None
+            self._async_update_listeners()
+
+    @property
+    def effective_interval(self) -> int:
+        """Return the interval in days after the air quality factor."""
+        return scale_interval(self.interval, self.interval_factor)
+
+    def set_interval(self, value: int) -> None:
+        """Atualizar o intervalo em dias."""
+        self.interval = int(value)
+        self._snapshot = None
+        self._async_update_listeners()
+
+    def set_air_quality(self, value: float | None, factor: float) -> None:
+        """Atualizar a média da qualidade do ar; avisa só quando o intervalo efetivo muda."""
+        previous = self.effective_interval
+        previous_factor = self.interval_factor
+        self.air_quality = value
+        self.interval_factor = factor
+        # O fator vale também para os filtros extras
+        if self.effective_interval != previous or (
+            self.filters is not None and factor != previous_factor
+        ):
+            self._snapshot = None
+            self._async_update_listeners()
+
+    def async_refresh(self, now: datetime | None = None) -> None:
+        """Recalcular na virada do dia e avisar os listeners."""
+        self._snapshot = None
+        self.snapshot(now)
+        self._async_update_listeners()
+
+    def next_change(self, now: datetime | None = None) -> float:
+        """Retornar o próximo instante (epoch) em que o estado derivado muda."""
+        return self.snapshot(now).valid_until
+
+    def snapshot(self, now: datetime | None = None) -> DueSnapshot:
+        """Retornar o estado de vencimento, recalculando só quando expirar."""
+        now_ts = (now or clock.utcnow()).timestamp()
+        snap = self._snapshot
+        if snap is None or now_ts >= snap.valid_until:
+            start = time.perf_counter()
+            snap = compute_due(
+                self.last_cleaned, self.effective_interval, now_ts, self.runtime_due
+            )
+            if self.filters is not None:
+                snap = self.filters.merge(snap, now_ts, self.interval_factor)
+            self._snapshot = snap
+            self.compute_seconds += time.perf_counter() - start
+            self.computations += 1
+        return snap
@@ -0,0 +1,162 @@
+"""Índice de vencimentos de todas as unidades, ordenado pelo próximo vencimento."""
+from __future__ import annotations
+
+import bisect
+from collections.abc import Callable, Iterable, Iterator
+import math
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, DATA_DUE_INDEX
+from .due import SECONDS_PER_DAY, DueState, ListenerMixin
+from .fleet import FleetUnitState
+
+# Chave ordenada: (instante do vencimento, unit_key); -inf para unidades que
+# já venceram sem data (nunca limpas ou vencidas pelas horas de uso)
+IndexKey = tuple[float, str]
+
+
+def due_at(due: DueState | FleetUnitState) -> float:
+    """Retornar o instante (epoch) em que a unidade vence pelos dias.
+
+    Com filtros extras, é o do filtro que vence primeiro.
+    """
+    last = due.last_cleaned
+    if last is None or due.runtime_due:
+        return -math.inf
+    when = last.timestamp() + due.effective_interval * SECONDS_PER_DAY
+    if (filters := due.filters) is not None:
+        when = min(when, filters.due_at(due.interval_factor))
+    return when
+
+
+class DueIndex(ListenerMixin):
+    """Vencimento de todas as unidades do domínio em uma lista ordenada.
+
+    Cada unidade entra com a chave `(due_at, unit_key)`; só limpar, mudar o
+    intervalo (manual ou efetivo) ou vencer pelas horas de uso move a chave,
+    com uma busca binária. A virada do dia não muda nada aqui. Consultas por
+    intervalo são fatias da lista: O(log n + k). Os listeners só são avisados
+    quando muda a unidade que vence primeiro, que é o estado do calendário;
+    os listeners de unidade recebem o `unit_key` de toda unidade que mudou,
+    entrou ou saiu do índice.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the index."""
+        self._keys: list[IndexKey] = []
+        self._due_at: dict[str, float] = {}
+        self._units: dict[str, tuple[str, DueState | FleetUnitState]] = {}
+        self._unsubs: dict[str, Callable[[], None]] = {}
+        self._listeners: list[Callable[[], None]] = []
+        self._unit_listeners: list[Callable[[str], None]] = []
+        # Quantas vezes alguma chave mudou de posição
+        self.moves = 0
+
+    def __len__(self) -> int:
+        """Return the number of indexed units."""
+        return len(self._keys)
+
+    def __contains__(self, unit_key: object) -> bool:
+        """Return True if the unit is indexed."""
+        return unit_key in self._units
+
+    def items(self) -> Iterator[tuple[str, tuple[str, DueState | FleetUnitState]]]:
+        """Iterate over (unit_key, (name, due)) of every indexed unit."""
+        return iter(self._units.items())
+
+    def unit(self, unit_key: str) -> tuple[str, DueState | FleetUnitState]:
+        """Return (name, due) of an indexed unit."""
+        return self._units[unit_key]
+
+    def first(self) -> IndexKey | None:
+        """Retornar a unidade que vence primeiro."""
+        return self._keys[0] if self._keys else None
+
+    def between(self, start_ts: float, end_ts: float, include_overdue: bool = False) -> list[IndexKey]:
+        """Retornar as chaves com vencimento em [start_ts, end_ts), em ordem.
+
+        Com `include_overdue`, começa do início da lista: tudo antes de
+        `start_ts` também entra.
+        """
+        keys = self._keys
+        hi = bisect.bisect_left(keys, (end_ts,))
+        lo = 0 if include_overdue else bisect.bisect_left(keys, (start_ts,))
+        return keys[lo:hi]
+
+    @callback
+    def async_add_unit_listener(self, update_callback: Callable[[str], None]) -> Callable[[], None]:
+        """Registrar um listener chamado com o `unit_key` de cada unidade alterada."""
+        self._unit_listeners.append(update_callback)
+
+        def remove_listener() -> None:
+            self._unit_listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_add_units(self, units: dict[str, tuple[str, DueState | FleetUnitState]]) -> None:
+        """Indexar as unidades de uma entrada, ordenando uma única vez."""
+        head = self.first()
+        for unit_key, (name, due) in units.items():
+            self._units[unit_key] = (name, due)
+            self._due_at[unit_key] = when = due_at(due)
+            self._keys.append((when, unit_key))
+            self._unsubs[unit_key] = due.async_add_listener(
+                lambda unit_key=unit_key: self._async_unit_changed(unit_key)
+            )
+        self._keys.sort()
+        self._async_head_changed(head)
+        self._async_update_unit_listeners(units)
+
+    @callback
+    def async_remove_units(self, unit_keys: list[str]) -> None:
+        """Tirar do índice as unidades de uma entrada descarregada."""
+        removed = set(unit_keys) & self._units.keys()
+        if not removed:
+            return
+        head = self.first()
+        for unit_key in removed:
+            self._unsubs.pop(unit_key)()
+            del self._units[unit_key], self._due_at[unit_key]
+        self._keys = [key for key in self._keys if key[1] not in removed]
+        self._async_head_changed(head)
+        self._async_update_unit_listeners(removed)
+
+    @callback
+    def _async_unit_changed(self, unit_key: str) -> None:
+        """Mover a chave da unidade, se o vencimento mudou."""
+        self._async_update_unit_listeners((unit_key,))
+        old = self._due_at[unit_key]
+        new = due_at(self._units[unit_key][1])
+        if new == old:
+            return
+        keys = self._keys
+        head = self.first()
+        del keys[bisect.bisect_left(keys, (old, unit_key))]
+        bisect.insort(keys, (new, unit_key))
+        self._due_at[unit_key] = new
+        self.moves += 1
+        self._async_head_changed(head)
+
+    @callback
+    def _async_update_unit_listeners(self, unit_keys: Iterable[str]) -> None:
+        """Avisar os listeners de unidade."""
+        for update_callback in list(self._unit_listeners):
+            for unit_key in unit_keys:
+                update_callback(unit_key)
+
+    @callback
+    def _async_head_changed(self, head: IndexKey | None) -> None:
+        """Avisar os listeners se a primeira unidade da lista mudou."""
+        if self.first() != head:
+            self._async_update_listeners()
+
+
+@callback
+def async_get_due_index(hass: HomeAssistant) -> DueIndex:
+    """Obter (ou criar) o índice de vencimentos do domínio."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (index := domain_data.get(DATA_DUE_INDEX)) is None:
+        index = domain_data[DATA_DUE_INDEX] = DueIndex()
+    return index
@@ -0,0 +1,157 @@
+"""Roda de reenvios dos lembretes das unidades vencidas."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+import logging
+import math
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, DATA_ESCALATION, ESCALATION_SLOT_SECONDS
+from .due_index import DueIndex, async_get_due_index
+from .scheduler import ReminderScheduler, async_get_scheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+# Chamado com (unit_keys, instante do disparo) para as unidades da entrada
+EscalationHandler = Callable[[list[str], datetime], None]
+
+
+class EscalationWheel:
+    """Reenvios pendentes de todas as unidades do domínio, em fatias de tempo.
+
+    Cada unidade fica em uma única fatia de `ESCALATION_SLOT_SECONDS`; cada
+    fatia ocupada é um job no agendador compartilhado, então unidades que
+    venceram juntas (como as de uma frota, todas lembradas na verificação
+    diária) voltam todas no mesmo disparo, agrupadas por entrada. Agendar,
+    trocar de fatia e cancelar são O(1). Uma unidade limpa sai da roda na
+    hora, pelo listener do índice de vencimentos.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        scheduler: ReminderScheduler,
+        index: DueIndex,
+        slot_seconds: float = ESCALATION_SLOT_SECONDS,
+    ) -> None:
+        """Initialize the wheel."""
+        self.hass = hass
+        self._scheduler = scheduler
+        self._index = index
+        self._slot_seconds = slot_seconds
+        self._slots: dict[int, set[str]] = {}
+        self._slot_of: dict[str, int] = {}
+        self._entry_of: dict[str, str] = {}
+        self._handlers: dict[str, EscalationHandler] = {}
+        self._unsub_index: CALLBACK_TYPE | None = None
+        # Reenvios entregues aos handlers
+        self.fired = 0
+
+    def __len__(self) -> int:
+        """Return the number of pending escalations."""
+        return len(self._slot_of)
+
+    def __contains__(self, unit_key: object) -> bool:
+        """Return True if the unit has a pending escalation."""
+        return unit_key in self._slot_of
+
+    @property
+    def slots(self) -> int:
+        """Return the number of occupied slots (scheduler jobs)."""
+        return len(self._slots)
+
+    @callback
+    def async_register(self, entry_id: str, handler: EscalationHandler) -> CALLBACK_TYPE:
+        """Registrar o handler da entrada; o retorno também cancela suas unidades."""
+        self._handlers[entry_id] = handler
+        if self._unsub_index is None:
+            self._unsub_index = self._index.async_add_unit_listener(self._async_unit_changed)
+
+        @callback
+        def _async_unregister() -> None:
+            self._handlers.pop(entry_id, None)
+            self.async_cancel_entry(entry_id)
+            if not self._handlers and self._unsub_index is not None:
+                self._unsub_index()
+                self._unsub_index = None
+
+        return _async_unregister
+
+    @callback
+    def async_schedule(self, entry_id: str, unit_key: str, when: datetime) -> None:
+        """Agendar (ou adiar) o próximo reenvio da unidade."""
+        slot = math.ceil(when.timestamp() / self._slot_seconds)
+        if self._slot_of.get(unit_key) == slot:
+            return
+        self._async_remove(unit_key)
+        self._slot_of[unit_key] = slot
+        self._entry_of[unit_key] = entry_id
+        if (units := self._slots.get(slot)) is None:
+            units = self._slots[slot] = set()
+            self._scheduler.async_schedule(
+                (DATA_ESCALATION, slot),
+                dt_util.utc_from_timestamp(slot * self._slot_seconds),
+                lambda now, slot=slot: self._async_fire(slot, now),
+            )
+        units.add(unit_key)
+
+    @callback
+    def async_cancel(self, unit_key: str) -> None:
+        """Cancelar o reenvio pendente da unidade, se houver."""
+        self._async_remove(unit_key)
+
+    @callback
+    def async_cancel_entry(self, entry_id: str) -> None:
+        """Cancelar os reenvios de todas as unidades da entrada."""
+        for unit_key in [key for key, entry in self._entry_of.items() if entry == entry_id]:
+            self._async_remove(unit_key)
+
+    @callback
+    def _async_remove(self, unit_key: str) -> None:
+        """Tirar a unidade da sua fatia, liberando o job se ela esvaziar."""
+        if (slot := self._slot_of.pop(unit_key, None)) is None:
+            return
+        del self._entry_of[unit_key]
+        units = self._slots[slot]
+        units.discard(unit_key)
+        if not units:
+            del self._slots[slot]
+            self._scheduler.async_cancel((DATA_ESCALATION, slot))
+
+    @callback
+    def _async_unit_changed(self, unit_key: str) -> None:
+        """Parar os reenvios de uma unidade que deixou de estar vencida."""
+        if unit_key not in self._slot_of:
+            return
+        if unit_key not in self._index or not self._index.unit(unit_key)[1].snapshot().is_overdue:
+            _LOGGER.debug("%s: não está mais vencida, reenvios cancelados", unit_key)
+            self._async_remove(unit_key)
+
+    @callback
+    def _async_fire(self, slot: int, now: datetime) -> None:
+        """Entregar as unidades da fatia aos handlers, uma chamada por entrada."""
+        units = self._slots.pop(slot, set())
+        by_entry: dict[str, list[str]] = {}
+        for unit_key in units:
+            del self._slot_of[unit_key]
+            by_entry.setdefault(self._entry_of.pop(unit_key), []).append(unit_key)
+
+        for entry_id, unit_keys in by_entry.items():
+            if (handler := self._handlers.get(entry_id)) is None:
+                continue
+            self.fired += len(unit_keys)
+            handler(unit_keys, now)
+
+
+@callback
+def async_get_escalation(hass: HomeAssistant) -> EscalationWheel:
+    """Obter (ou criar) a roda de reenvios do domínio."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (wheel := domain_data.get(DATA_ESCALATION)) is None:
+        wheel = domain_data[DATA_ESCALATION] = EscalationWheel(
+            hass, async_get_scheduler(hass), async_get_due_index(hass)
+        )
+    return wheel
@@ -0,0 +1,177 @@
+"""Filtros extras de uma unidade: pré-filtro, filtro fino, serpentina..."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Callable, Iterator
+from datetime import datetime
+import math
+
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DEFAULT_INTERVAL_DAYS
+from .due import SECONDS_PER_DAY, DueSnapshot, compute_due_ts, most_urgent, scale_interval
+
+# Marca "nunca limpo" no array de epochs
+_NEVER = math.nan
+
+# Registro salvo: {filter_id: [epoch da última limpeza (int) ou None, intervalo (int)]}
+FiltersRecord = dict[str, list[int | None]]
+
+
+def parse_filter(text: str) -> dict[str, str | int] | None:
+    """Converter `Nome: dias` (ou só `Nome`) em um filtro; None se não houver nome."""
+    name, _, days = (part.strip() for part in text.partition(":"))
+    if not (filter_id := slugify(name)):
+        return None
+    try:
+        interval = min(max(int(days), 1), 365) if days else DEFAULT_INTERVAL_DAYS
+    except ValueError:
+        interval = DEFAULT_INTERVAL_DAYS
+    return {"id": filter_id, "name": name, "interval": interval}
+
+
+def parse_filters(text: str) -> list[dict[str, str | int]]:
+    """Converter o texto do formulário (um filtro por linha) na lista de filtros."""
+    filters: list[dict[str, str | int]] = []
+    seen: set[str] = set()
+    for line in text.splitlines():
+        if (item := parse_filter(line)) is None or item["id"] in seen:
+            continue
+        seen.add(item["id"])
+        filters.append(item)
+    return filters
+
+
+def format_filter(item: dict[str, str | int]) -> str:
+    """Converter um filtro em `Nome: dias`."""
+    return f"{item['name']}: {item['interval']}"
+
+
+class FilterSet:
+    """Os filtros extras de uma unidade em arrays compactos.
+
+    O filtro principal continua no estado da unidade (`DueState` ou a posição
+    no `FleetDueEngine`); aqui ficam só os extras, cada um com a última
+    limpeza (epoch, NaN => nunca) e o intervalo próprio. O estado da unidade
+    junta todos em um único snapshot, o do filtro que vence primeiro: o
+    dispositivo, o índice de vencimentos, a verificação diária e o registro
+    no store continuam sendo um por unidade.
+    """
+
+    __slots__ = ("ids", "names", "defaults", "_last", "_interval", "on_change")
+
+    def __init__(self, filters: list[dict[str, str | int]]) -> None:
+        """Initialize the filter set."""
+        self.ids: tuple[str, ...] = tuple(str(item["id"]) for item in filters)
+        self.names: tuple[str, ...] = tuple(str(item["name"]) for item in filters)
+        # Intervalo da configuração: só o valor inicial de um filtro novo
+        self.defaults: tuple[int, ...] = tuple(int(item["interval"]) for item in filters)
+        self._last = array("d", [_NEVER]) * len(filters)
+        self._interval = array("H", self.defaults)
+        # Chamado pelo dono (o estado da unidade) a cada mudança
+        self.on_change: Callable[[], None] | None = None
+
+    def __len__(self) -> int:
+        """Return the number of extra filters."""
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the filter positions."""
+        return iter(range(len(self.ids)))
+
+    def config(self) -> list[dict[str, str | int]]:
+        """Retornar os filtros como na configuração da entrada."""
+        return [
+            {"id": filter_id, "name": name, "interval": interval}
+            for filter_id, name, interval in zip(self.ids, self.names, self.defaults)
+        ]
+
+    def index(self, filter_id: str) -> int:
+        """Retornar a posição de um filtro pelo id ou pelo nome (ValueError se não existir)."""
+        if filter_id in self.ids:
+            return self.ids.index(filter_id)
+        return self.names.index(filter_id)
+
+    def last_cleaned(self, index: int) -> datetime | None:
+        """Retornar a última limpeza de um filtro."""
+        last_ts = self._last[index]
+        if last_ts != last_ts:
+            return None
+        return dt_util.utc_from_timestamp(last_ts)
+
+    def interval(self, index: int) -> int:
+        """Retornar o intervalo de um filtro."""
+        return self._interval[index]
+
+    def set_last_cleaned(self, index: int, value: datetime | None) -> None:
+        """Atualizar a última limpeza de um filtro."""
+        self._last[index] = _NEVER if value is None else value.timestamp()
+        self._changed()
+
+    def set_interval(self, index: int, value: int) -> None:
+        """Atualizar o intervalo de um filtro."""
+        self._interval[index] = int(value)
+        self._changed()
+
+    def _changed(self) -> None:
+        if self.on_change is not None:
+            self.on_change()
+
+    def snapshot(self, index: int, now_ts: float, factor: float = 1.0) -> DueSnapshot:
+        """Calcular o estado de vencimento de um filtro."""
+        last_ts = self._last[index]
+        return compute_due_ts(
+            None if last_ts != last_ts else last_ts,
+            scale_interval(self._interval[index], factor),
+            now_ts,
+        )._replace(filter=self.names[index])
+
+    def merge(self, main: DueSnapshot, now_ts: float, factor: float = 1.0) -> DueSnapshot:
+        """Juntar o snapshot do filtro principal com os dos extras."""
+        if not self.ids:
+            return main
+        return most_urgent([main, *(self.snapshot(index, now_ts, factor) for index in self)])
+
+    def next_change(self, now_ts: float) -> float:
+        """Retornar o próximo instante (epoch) em que algum filtro muda de dia."""
+        next_change = math.inf
+        for last_ts in self._last:
+            if last_ts != last_ts:
+                continue
+            boundary = last_ts + ((now_ts - last_ts) // SECONDS_PER_DAY + 1) * SECONDS_PER_DAY
+            if boundary < next_change:
+                next_change = boundary
+        return next_change
+
+    def due_at(self, factor: float = 1.0) -> float:
+        """Retornar o instante (epoch) em que o primeiro filtro vence pelos dias."""
+        due_at = math.inf
+        for last_ts, interval in zip(self._last, self._interval):
+            if last_ts != last_ts:
+                return -math.inf
+            due_at = min(due_at, last_ts + scale_interval(interval, factor) * SECONDS_PER_DAY)
+        return due_at
+
+    def record(self) -> FiltersRecord:
+        """Converter os filtros no registro salvo."""
+        return {
+            filter_id: [None if last_ts != last_ts else int(last_ts), interval]
+            for filter_id, last_ts, interval in zip(self.ids, self._last, self._interval)
+        }
+
+    def restore(self, record: FiltersRecord | None, default_last: datetime | None) -> None:
+        """Aplicar o registro salvo.
+
+        Um filtro sem registro (acabou de ser configurado) começa na última
+        limpeza do filtro principal, com o intervalo da configuração.
+        """
+        record = record or {}
+        default_ts = _NEVER if default_last is None else default_last.timestamp()
+        for index, filter_id in enumerate(self.ids):
+            if (saved := record.get(filter_id)) is None:
+                self._last[index] = default_ts
+                continue
+            last_ts, interval = saved
+            self._last[index] = _NEVER if last_ts is None else last_ts
+            self._interval[index] = interval
+        self._changed()
@@ -0,0 +1,479 @@
+"""Modo frota: várias unidades gerenciadas por uma única entrada."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Callable
+from datetime import datetime
+import heapq
+import math
+import time
+from typing import Any
+
+from homeassistant.util import dt as dt_util, slugify
+
+from . import clock
+from .const import (
+    CONF_AIR_QUALITY_ENTITY, CONF_CLIMATE_ENTITY, CONF_FILTERS, DEFAULT_INTERVAL_DAYS,
+)
+from .due import SECONDS_PER_DAY, DueSnapshot, ListenerMixin, scale_interval
+from .filters import FilterSet, format_filter, parse_filter
+
+# Marca "nunca limpo" no array de epochs
+_NEVER = math.nan
+
+# Recompacta o heap de viradas quando entradas obsoletas passam deste fator
+_COMPACT_FACTOR = 2
+
+
+def parse_units(text: str, existing: list[dict[str, Any]] | None = None) -> list[dict[str, Any]]:
+    """Converter o texto do formulário (um nome por linha) na lista de unidades.
+
+    Cada linha pode vincular uma entidade climate, um sensor de qualidade do
+    ar e filtros extras (`Nome: dias`), em qualquer ordem:
+    `AC Sala 101 | climate.sala_101 | sensor.pm25_sala | Serpentina: 180`.
+    Unidades já existentes mantêm o id, para preservar as entidades.
+    """
+    ids_by_name = {unit["name"]: unit["id"] for unit in existing or []}
+    units: list[dict[str, Any]] = []
+    seen: set[str] = set()
+
+    for line in text.splitlines():
+        name, *links = (part.strip() for part in line.split("|"))
+        if not name:
+            continue
+        unit_id = ids_by_name.get(name) or slugify(name)
+        if not unit_id or unit_id in seen:
+            continue
+        seen.add(unit_id)
+        unit = {"id": unit_id, "name": name}
+        filters = []
+        for link in filter(None, links):
+            if ":" in link:
+                if (item := parse_filter(link)) is not None and all(
+                    item["id"] != other["id"] for other in filters
+                ):
+                    filters.append(item)
+                continue
+            key = CONF_AIR_QUALITY_ENTITY if link.startswith("sensor.") else CONF_CLIMATE_ENTITY
+            unit[key] = link
+        if filters:
+            unit[CONF_FILTERS] = filters
+        units.append(unit)
+
+    return units
+
+
+def climate_units(climates: list[tuple[str, str]]) -> list[dict[str, str]]:
+    """Montar as unidades de uma frota a partir de (entity_id, nome) de entidades climate.
+
+    O id vem do object_id da entidade, que já é único; nomes repetidos
+    recebem o entity_id para o formulário de opções continuar distinguindo
+    as unidades.
+    """
+    units: list[dict[str, str]] = []
+    seen_ids: set[str] = set()
+    seen_names: set[str] = set()
+
+    for entity_id, name in climates:
+        unit_id = slugify(entity_id.partition(".")[2])
+        if not unit_id or unit_id in seen_ids:
+            continue
+        if name in seen_names:
+            name = f"{name} ({entity_id})"
+        seen_ids.add(unit_id)
+        seen_names.add(name)
+        units.append({"id": unit_id, "name": name, CONF_CLIMATE_ENTITY: entity_id})
+
+    return units
+
+
+def format_units(units: list[dict[str, Any]]) -> str:
+    """Converter a lista de unidades no texto do formulário."""
+    return "\n".join(
+        " | ".join(
+            part for part in (
+                unit["name"], unit.get(CONF_CLIMATE_ENTITY), unit.get(CONF_AIR_QUALITY_ENTITY),
+                *map(format_filter, unit.get(CONF_FILTERS, [])),
+            ) if part
+        )
+        for unit in units
+    )
+
+
+class FleetDueEngine(ListenerMixin):
+    """Estado de vencimento de N unidades em arrays paralelos.
+
+    Epochs da última limpeza e intervalos ficam em `array`s compactos. A
+    primeira leitura calcula todas as unidades em uma única passada; depois,
+    um heap com a próxima virada de dia de cada unidade (e dos filtros extras)
+    faz cada recálculo tocar só as unidades cuja virada já passou. Cada
+    unidade é exposta como um `FleetUnitState`, com a mesma interface do
+    `DueState`. Só as unidades com filtros extras têm um `FilterSet`, juntado
+    ao snapshot delas.
+    """
+
+    def __init__(self, count: int, interval: int = DEFAULT_INTERVAL_DAYS) -> None:
+        """Initialize the fleet engine."""
+        self._last = array("d", [_NEVER]) * count
+        self._interval = array("H", [interval]) * count
+        self._days_since = array("q", [0]) * count
+        # Horas de uso (segundos) desde a limpeza e se já passaram do limite
+        self._runtime = array("d", [0.0]) * count
+        self._runtime_due = bytearray(count)
+        self.runtime_limit: float | None = None
+        # Média da qualidade do ar (NaN => sem leitura) e fator do intervalo
+        self._air_quality = array("d", [math.nan]) * count
+        self._factor = array("d", [1.0]) * count
+        self._snapshots: list[DueSnapshot | None] = [None] * count
+        self._filters: dict[int, FilterSet] = {}
+        self._pending: set[int] = set()
+        # Próxima virada de dia de cada unidade e dos filtros extras dela; o
+        # heap tem (virada, posição, é_filtro) e uma entrada só vale enquanto
+        # bate com a virada guardada aqui
+        self._boundary = array("d", [math.inf]) * count
+        self._filter_boundary: dict[int, float] = {}
+        self._heap: list[tuple[float, int, bool]] = []
+        # -inf força o cálculo completo na primeira leitura
+        self._valid_until = -math.inf
+        self._listeners: list[Callable[[], None]] = []
+        self.units = [FleetUnitState(self, index) for index in range(count)]
+        # Métricas: passadas completas + snapshots montados, e o tempo gasto
+        self.computations = 0
+        self.compute_seconds = 0.0
+
+    def __len__(self) -> int:
+        """Return the number of units."""
+        return len(self._last)
+
+    def _recompute(self, now_ts: float) -> None:
+        """Recalcular as unidades cuja virada de dia já passou."""
+        start = time.perf_counter()
+        if self._valid_until == -math.inf:
+            self._recompute_all(now_ts)
+        else:
+            heap = self._heap
+            while heap and heap[0][0] <= now_ts:
+                boundary, index, is_filter = heapq.heappop(heap)
+                if not self._is_live((boundary, index, is_filter)):
+                    continue
+                if is_filter:
+                    # Um filtro extra mudou de dia: refazer o snapshot juntado
+                    self._snapshots[index] = None
+                    self._pending.add(index)
+                    self._push_filter(index, now_ts)
+                else:
+                    self._roll(index, now_ts)
+            # Entradas obsoletas no topo só antecipariam um recálculo à toa
+            while heap and not self._is_live(heap[0]):
+                heapq.heappop(heap)
+            self._valid_until = heap[0][0] if heap else math.inf
+        self.compute_seconds += time.perf_counter() - start
+        self.computations += 1
+
+    def _recompute_all(self, now_ts: float) -> None:
+        """Calcular todas as unidades e montar o heap de viradas."""
+        days_since = self._days_since
+        boundaries = self._boundary
+        snapshots = self._snapshots
+        pending = self._pending
+        heap: list[tuple[float, int, bool]] = []
+
+        for index, last_ts in enumerate(self._last):
+            if last_ts != last_ts:  # NaN => nunca limpo
+                boundaries[index] = math.inf
+                continue
+            days = int((now_ts - last_ts) // SECONDS_PER_DAY)
+            if days != days_since[index]:
+                days_since[index] = days
+                snapshots[index] = None
+                pending.add(index)
+            boundary = boundaries[index] = last_ts + (days + 1) * SECONDS_PER_DAY
+            heap.append((boundary, index, False))
+
+        for index, filters in self._filters.items():
+            snapshots[index] = None
+            pending.add(index)
+            boundary = self._filter_boundary[index] = filters.next_change(now_ts)
+            if boundary != math.inf:
+                heap.append((boundary, index, True))
+
+        heapq.heapify(heap)
+        self._heap = heap
+        self._valid_until = heap[0][0] if heap else math.inf
+
+    def _roll(self, index: int, now_ts: float) -> None:
+        """Atualizar os dias de uma unidade e empilhar a próxima virada."""
+        last_ts = self._last[index]
+        if last_ts != last_ts:
+            self._boundary[index] = math.inf
+            return
+        days = int((now_ts - last_ts) // SECONDS_PER_DAY)
+        if days != self._days_since[index]:
+            self._days_since[index] = days
+            self._snapshots[index] = None
+            self._pending.add(index)
+        boundary = self._boundary[index] = last_ts + (days + 1) * SECONDS_PER_DAY
+        heapq.heappush(self._heap, (boundary, index, False))
+        self._compact()
+
+    def _push_filter(self, index: int, now_ts: float) -> float:
+        """Empilhar a próxima virada dos filtros extras de uma unidade."""
+        boundary = self._filter_boundary[index] = self._filters[index].next_change(now_ts)
+        if boundary != math.inf:
+            heapq.heappush(self._heap, (boundary, index, True))
+            self._compact()
+        return boundary
+
+    def _compact(self) -> None:
+        """Descartar entradas obsoletas quando o heap cresce demais."""
+        if len(self._heap) <= _COMPACT_FACTOR * (len(self._last) + len(self._filters)) + 16:
+            return
+        # No lugar: `_recompute` pode estar iterando o mesmo heap
+        self._heap[:] = [item for item in self._heap if self._is_live(item)]
+        heapq.heapify(self._heap)
+
+    def _is_live(self, item: tuple[float, int, bool]) -> bool:
+        """Verificar se a entrada do heap ainda é a virada atual."""
+        boundary, index, is_filter = item
+        if is_filter:
+            return self._filter_boundary.get(index) == boundary
+        return self._boundary[index] == boundary
+
+    def _ensure(self, now_ts: float) -> None:
+        """Garantir que os arrays derivados estão válidos para `now_ts`."""
+        if now_ts >= self._valid_until:
+            self._recompute(now_ts)
+
+    def _build(self, index: int, now_ts: float) -> DueSnapshot:
+        """Montar o snapshot de uma unidade a partir dos arrays."""
+        snap = self._build_main(index)
+        if (filters := self._filters.get(index)) is not None:
+            snap = filters.merge(snap, now_ts, self._factor[index])
+        return snap
+
+    def _build_main(self, index: int) -> DueSnapshot:
+        """Montar o snapshot do filtro principal de uma unidade."""
+        interval = scale_interval(self._interval[index], self._factor[index])
+        last_ts = self._last[index]
+        runtime_due = bool(self._runtime_due[index])
+        if last_ts != last_ts:
+            return DueSnapshot(interval, None, None, True, 0, math.inf, runtime_due)
+
+        days = self._days_since[index]
+        return DueSnapshot(
+            interval=interval,
+            days_since=days,
+            days_until=max(interval - days, 0),
+            is_overdue=days >= interval or runtime_due,
+            overdue_days=max(0, days - interval),
+            valid_until=last_ts + (days + 1) * SECONDS_PER_DAY,
+            runtime_due=runtime_due,
+        )
+
+    def snapshot(self, index: int, now: datetime | None = None) -> DueSnapshot:
+        """Retornar o estado de vencimento de uma unidade."""
+        now_ts = (now or clock.utcnow()).timestamp()
+        self._ensure(now_ts)
+        snap = self._snapshots[index]
+        if snap is None:
+            start = time.perf_counter()
+            snap = self._snapshots[index] = self._build(index, now_ts)
+            self.compute_seconds += time.perf_counter() - start
+            self.computations += 1
+        return snap
+
+    def next_change(self, now: datetime | None = None) -> float:
+        """Retornar o próximo instante (epoch) em que alguma unidade muda."""
+        self._ensure((now or clock.utcnow()).timestamp())
+        return self._valid_until
+
+    def last_cleaned(self, index: int) -> datetime | None:
+        """Retornar a última limpeza de uma unidade."""
+        last_ts = self._last[index]
+        if last_ts != last_ts:
+            return None
+        return dt_util.utc_from_timestamp(last_ts)
+
+    def interval(self, index: int) -> int:
+        """Retornar o intervalo de uma unidade."""
+        return self._interval[index]
+
+    def effective_interval(self, index: int) -> int:
+        """Retornar o intervalo de uma unidade após o fator da qualidade do ar."""
+        return scale_interval(self._interval[index], self._factor[index])
+
+    def air_quality(self, index: int) -> float | None:
+        """Retornar a média da qualidade do ar de uma unidade."""
+        value = self._air_quality[index]
+        return None if value != value else value
+
+    def interval_factor(self, index: int) -> float:
+        """Retornar o fator aplicado ao intervalo de uma unidade."""
+        return self._factor[index]
+
+    def runtime_seconds(self, index: int) -> float:
+        """Retornar as horas de uso (em segundos) de uma unidade."""
+        return self._runtime[index]
+
+    def runtime_due(self, index: int) -> bool:
+        """Retornar se as horas de uso da unidade passaram do limite."""
+        return bool(self._runtime_due[index])
+
+    def filters(self, index: int) -> FilterSet | None:
+        """Retornar os filtros extras de uma unidade."""
+        return self._filters.get(index)
+
+    def attach_filters(self, index: int, filters: FilterSet) -> None:
+        """Vincular os filtros extras de uma unidade."""
+        self._filters[index] = filters
+        filters.on_change = lambda: self._async_filters_changed(index)
+
+    def _async_filters_changed(self, index: int) -> None:
+        """Antecipar o próximo recálculo, se preciso, e avisar a unidade."""
+        if self._valid_until != -math.inf:
+            boundary = self._push_filter(index, clock.utcnow().timestamp())
+            if boundary < self._valid_until:
+                self._valid_until = boundary
+        self._async_unit_changed(index)
+
+    def set_last_cleaned(self, index: int, value: datetime | None) -> None:
+        """Atualizar a última limpeza de uma unidade sem refazer a frota."""
+        self._runtime[index] = 0.0
+        self._runtime_due[index] = 0
+        if value is None:
+            self._last[index] = _NEVER
+            self._boundary[index] = math.inf
+        else:
+            last_ts = self._last[index] = value.timestamp()
+            now_ts = clock.utcnow().timestamp()
+            if self._valid_until == -math.inf:
+                # Antes do cálculo completo, que monta o heap sozinho
+                self._days_since[index] = int((now_ts - last_ts) // SECONDS_PER_DAY)
+            else:
+                self._roll(index, now_ts)
+                if (boundary := self._boundary[index]) < self._valid_until:
+                    self._valid_until = boundary
+        self._async_unit_changed(index)
+
+    def set_interval(self, index: int, value: int) -> None:
+        """Atualizar o intervalo de uma unidade."""
+        self._interval[index] = int(value)
+        self._async_unit_changed(index)
+
+    def set_air_quality(self, index: int, value: float | None, factor: float) -> None:
+        """Atualizar a média da qualidade do ar; avisa só quando o intervalo efetivo muda."""
+        previous = self.effective_interval(index)
+        previous_factor = self._factor[index]
+        self._air_quality[index] = math.nan if value is None else value
+        self._factor[index] = factor
+        # O fator vale também para os filtros extras
+        if self.effective_interval(index) != previous or (
+            index in self._filters and factor != previous_factor
+        ):
+            self._async_unit_changed(index)
+
+    def set_runtime(self, index: int, seconds: float) -> None:
+        """Atualizar as horas de uso; avisa só quando o vencimento muda."""
+        self._runtime[index] = seconds
+        limit = self.runtime_limit
+        runtime_due = limit is not None and seconds >= limit
+        if runtime_due != self._runtime_due[index]:
+            self._runtime_due[index] = runtime_due
+            self._async_unit_changed(index)
+
+    def _async_unit_changed(self, index: int) -> None:
+        """Invalidar e avisar os listeners de uma unidade e da frota."""
+        self._snapshots[index] = None
+        self._pending.discard(index)
+        self.units[index]._async_update_listeners()
+        self._async_update_listeners()
+
+    def async_refresh(self, now: datetime | None = None) -> None:
+        """Recalcular a frota e avisar só as unidades que mudaram."""
+        self._recompute((now or clock.utcnow()).timestamp())
+        pending, self._pending = self._pending, set()
+        units = self.units
+        for index in sorted(pending):
+            units[index]._async_update_listeners()
+        self._async_update_listeners()
+
+
+class FleetUnitState(ListenerMixin):
+    """Visão de uma unidade da frota com a interface do `DueState`."""
+
+    __slots__ = ("_engine", "_index", "_listeners")
+
+    def __init__(self, engine: FleetDueEngine, index: int) -> None:
+        """Initialize the unit view."""
+        self._engine = engine
+        self._index = index
+        self._listeners: list[Callable[[], None]] = []
+
+    @property
+    def last_cleaned(self) -> datetime | None:
+        """Return the last cleaning time."""
+        return self._engine.last_cleaned(self._index)
+
+    @property
+    def interval(self) -> int:
+        """Return the cleaning interval in days."""
+        return self._engine.interval(self._index)
+
+    @property
+    def effective_interval(self) -> int:
+        """Return the interval in days after the air quality factor."""
+        return self._engine.effective_interval(self._index)
+
+    @property
+    def air_quality(self) -> float | None:
+        """Return the moving average of the air quality sensor."""
+        return self._engine.air_quality(self._index)
+
+    @property
+    def interval_factor(self) -> float:
+        """Return the factor applied to the interval."""
+        return self._engine.interval_factor(self._index)
+
+    @property
+    def runtime_seconds(self) -> float:
+        """Return the operating seconds since the last cleaning."""
+        return self._engine.runtime_seconds(self._index)
+
+    @property
+    def runtime_limit(self) -> float | None:
+        """Return the operating seconds after which the filter is due."""
+        return self._engine.runtime_limit
+
+    @property
+    def runtime_due(self) -> bool:
+        """Return True if the operating time passed the limit."""
+        return self._engine.runtime_due(self._index)
+
+    @property
+    def filters(self) -> FilterSet | None:
+        """Return the unit's extra filters."""
+        return self._engine.filters(self._index)
+
+    def attach_filters(self, filters: FilterSet) -> None:
+        """Vincular os filtros extras da unidade."""
+        self._engine.attach_filters(self._index, filters)
+
+    def set_last_cleaned(self, value: datetime | None) -> None:
+        """Atualizar a data da última limpeza."""
+        self._engine.set_last_cleaned(self._index, value)
+
+    def set_interval(self, value: int) -> None:
+        """Atualizar o intervalo em dias."""
+        self._engine.set_interval(self._index, value)
+
+    def set_air_quality(self, value: float | None, factor: float) -> None:
+        """Atualizar a média da qualidade do ar."""
+        self._engine.set_air_quality(self._index, value, factor)
+
+    def set_runtime(self, seconds: float) -> None:
+        """Atualizar as horas de uso."""
+        self._engine.set_runtime(self._index, seconds)
+
+    def snapshot(self, now: datetime | None = None) -> DueSnapshot:
+        """Retornar o estado de vencimento da unidade."""
+        return self._engine.snapshot(self._index, now)
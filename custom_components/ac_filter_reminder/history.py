@@ -0,0 +1,160 @@
+"""Histórico de limpezas persistido para AC Filter Reminder."""
+from __future__ import annotations
+
+import asyncio
+import bisect
+from collections import deque
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN, DATA_HISTORY,
+    HISTORY_MAX_ENTRIES, HISTORY_SAVE_DELAY, HISTORY_STORAGE_KEY, HISTORY_STORAGE_VERSION,
+)
+from .due import SECONDS_PER_DAY
+
+
+class HistoryStats(NamedTuple):
+    """Estatísticas derivadas do histórico de uma unidade."""
+
+    cleanings: int
+    mean_interval_days: float | None
+    overdue_days: int
+
+
+class CleaningHistory:
+    """Histórico de limpezas de todas as unidades em um único `Store`.
+
+    Cada unidade guarda seus epochs (int, segundos) em um buffer circular
+    limitado; o arquivo é salvo em lote com `async_delay_save`. Nada aqui
+    consulta o recorder.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the history."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, HISTORY_STORAGE_VERSION, HISTORY_STORAGE_KEY
+        )
+        self._units: dict[str, deque[int]] = {}
+        self._stats: dict[str, tuple[tuple[int, int, int, int], HistoryStats]] = {}
+        self._lock = asyncio.Lock()
+        self._loaded = False
+
+    def __len__(self) -> int:
+        """Return the number of units with recorded history."""
+        return len(self._units)
+
+    async def async_load(self) -> None:
+        """Carregar o arquivo uma única vez."""
+        async with self._lock:
+            if self._loaded:
+                return
+            data = await self._store.async_load() or {}
+            self._units = {
+                unit_key: deque(stamps, maxlen=HISTORY_MAX_ENTRIES)
+                for unit_key, stamps in data.get("units", {}).items()
+            }
+            self._loaded = True
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Serializar o histórico."""
+        return {"units": {key: list(stamps) for key, stamps in self._units.items()}}
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Agendar a gravação em lote."""
+        self._store.async_delay_save(self._data_to_save, HISTORY_SAVE_DELAY)
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Agendar a gravação depois de uma série de `async_merge`."""
+        self._async_schedule_save()
+
+    @callback
+    def async_record(self, unit_key: str, when: datetime) -> None:
+        """Registrar uma limpeza."""
+        stamps = self._units.get(unit_key)
+        if stamps is None:
+            stamps = self._units[unit_key] = deque(maxlen=HISTORY_MAX_ENTRIES)
+        stamp = int(when.timestamp())
+        if stamps and stamp < stamps[-1]:
+            # Limpeza retroativa: manter os epochs em ordem
+            ordered = list(stamps)
+            bisect.insort(ordered, stamp)
+            self._units[unit_key] = deque(ordered, maxlen=HISTORY_MAX_ENTRIES)
+        else:
+            stamps.append(stamp)
+        self._async_schedule_save()
+
+    @callback
+    def async_merge(self, unit_key: str, stamps: Iterable[int]) -> bool:
+        """Juntar epochs importados ao histórico, sem repetir; retorna se mudou.
+
+        Não agenda a gravação: quem importa em lote chama `async_schedule_save`.
+        """
+        current = self._units.get(unit_key, ())
+        merged = sorted(set(current).union(stamps))[-HISTORY_MAX_ENTRIES:]
+        if merged == list(current):
+            return False
+        self._units[unit_key] = deque(merged, maxlen=HISTORY_MAX_ENTRIES)
+        return True
+
+    @callback
+    def async_seed(self, unit_key: str, when: datetime) -> None:
+        """Registrar a última limpeza conhecida se a unidade não tiver histórico."""
+        if not self._units.get(unit_key):
+            self.async_record(unit_key, when)
+
+    @callback
+    def async_remove_entry(self, entry_id: str) -> None:
+        """Apagar o histórico das unidades de uma entrada removida."""
+        removed = [key for key in self._units if key.startswith(entry_id)]
+        for unit_key in removed:
+            del self._units[unit_key]
+            self._stats.pop(unit_key, None)
+        if removed:
+            self._async_schedule_save()
+
+    def timestamps(self, unit_key: str) -> list[int]:
+        """Retornar os epochs registrados para uma unidade."""
+        return list(self._units.get(unit_key, ()))
+
+    def stats(self, unit_key: str, interval: int) -> HistoryStats:
+        """Calcular (com cache) as estatísticas de uma unidade."""
+        stamps = self._units.get(unit_key)
+        if not stamps:
+            return HistoryStats(0, None, 0)
+
+        cache_key = (len(stamps), stamps[0], stamps[-1], interval)
+        cached = self._stats.get(unit_key)
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+
+        mean_interval: float | None = None
+        overdue = 0
+        if len(stamps) > 1:
+            mean_interval = round(
+                (stamps[-1] - stamps[0]) / (len(stamps) - 1) / SECONDS_PER_DAY, 1
+            )
+            previous = stamps[0]
+            for stamp in list(stamps)[1:]:
+                overdue += max(0, (stamp - previous) // SECONDS_PER_DAY - interval)
+                previous = stamp
+
+        result = HistoryStats(len(stamps), mean_interval, overdue)
+        self._stats[unit_key] = (cache_key, result)
+        return result
+
+
+async def async_get_history(hass: HomeAssistant) -> CleaningHistory:
+    """Obter (ou criar e carregar) o histórico compartilhado do domínio."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (history := domain_data.get(DATA_HISTORY)) is None:
+        history = domain_data[DATA_HISTORY] = CleaningHistory(hass)
+    await history.async_load()
+    return history
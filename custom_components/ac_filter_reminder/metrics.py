@@ -0,0 +1,67 @@
+"""Contadores de execução da própria integração."""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+import time
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.entity import Entity
+
+
+@dataclass
+class EntryMetrics:
+    """Contadores de uma entrada; só somas e máximos, sempre ligados."""
+
+    daily_checks: int = 0
+    daily_check_last: float | None = None
+    daily_check_max: float = 0.0
+    daily_check_total: float = 0.0
+    last_daily_check: datetime | None = None
+    reminders: int = 0
+    state_writes: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def daily_check_avg(self) -> float | None:
+        """Return the mean daily check duration in seconds."""
+        return self.daily_check_total / self.daily_checks if self.daily_checks else None
+
+    @property
+    def state_write_rate(self) -> float:
+        """Return state writes per minute since setup."""
+        minutes = (time.monotonic() - self.started) / 60
+        return self.state_writes / minutes if minutes > 0 else 0.0
+
+    @callback
+    def record_daily_check(self, now: datetime, seconds: float, reminders: int) -> None:
+        """Registrar uma execução do `_daily_check`."""
+        self.daily_checks += 1
+        self.daily_check_last = seconds
+        self.daily_check_total += seconds
+        self.daily_check_max = max(self.daily_check_max, seconds)
+        self.last_daily_check = now
+        self.reminders += reminders
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters as a plain dict."""
+        data = asdict(self)
+        del data["started"]
+        return {
+            **data,
+            "daily_check_avg": self.daily_check_avg,
+            "state_write_rate": round(self.state_write_rate, 3),
+        }
+
+
+class StateWriteCounter(Entity):
+    """Mixin que conta as escritas de estado nas métricas da entrada."""
+
+    _metrics: EntryMetrics
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state, counting it in the entry metrics."""
+        self._metrics.state_writes += 1
+        super().async_write_ha_state()
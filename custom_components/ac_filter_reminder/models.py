@@ -0,0 +1,117 @@
+"""Dados em memória das entradas carregadas e de suas unidades."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import DeviceInfo, Entity
+
+from .const import DOMAIN
+from .due import DueState
+from .fleet import FleetDueEngine, FleetUnitState
+from .metrics import EntryMetrics
+
+if TYPE_CHECKING:
+    from .air_quality import AirQualityTracker
+    from .binary_sensor import CleaningDueBinary
+    from .button import MarkCleanedButton, MarkFilterCleanedButton
+    from .filters import FilterSet
+    from .number import FilterIntervalNumber, IntervalDaysNumber
+    from .runtime import RuntimeTracker
+    from .sensor import DaysUntilDueSensor, LastCleanedSensor, RuntimeHoursSensor
+
+
+@dataclass(slots=True, eq=False)
+class UnitData:
+    """Uma unidade: vínculos, estado de vencimento e entidades.
+
+    As entidades da unidade recebem este objeto (ou o `due` dele) por
+    referência, e compartilham um único `DeviceInfo`. Cada filtro extra tem
+    só um number e um button, na ordem de `due.filters`.
+    """
+
+    key: str
+    name: str
+    climate: str | None
+    air_quality: str | None
+    due: DueState | FleetUnitState
+    device_info: DeviceInfo
+    last_cleaned: LastCleanedSensor | None = None
+    days_until_due: DaysUntilDueSensor | None = None
+    cleaning_due: CleaningDueBinary | None = None
+    interval_days: IntervalDaysNumber | None = None
+    mark_cleaned: MarkCleanedButton | None = None
+    runtime_hours: RuntimeHoursSensor | None = None
+    filter_intervals: list[FilterIntervalNumber] = field(default_factory=list)
+    filter_buttons: list[MarkFilterCleanedButton] = field(default_factory=list)
+
+    @property
+    def filters(self) -> FilterSet | None:
+        """Return the unit's extra filters."""
+        return self.due.filters
+
+    @property
+    def entities(self) -> list[Entity]:
+        """Return the unit's entities that were created."""
+        return [
+            entity for entity in (
+                self.last_cleaned, self.days_until_due, self.cleaning_due,
+                self.interval_days, self.mark_cleaned, self.runtime_hours,
+                *self.filter_intervals, *self.filter_buttons,
+            )
+            if entity is not None
+        ]
+
+
+@dataclass(slots=True, eq=False)
+class EntryData:
+    """Uma entrada carregada, guardada em `entry.runtime_data`.
+
+    Uma entrada comum tem uma única unidade, com `key == entry_id`. No modo
+    frota cada unidade usa `f"{entry_id}_{unit_id}"` e todas compartilham o
+    mesmo `FleetDueEngine`.
+    """
+
+    name: str
+    notify_service: str | None
+    hour: int
+    minute: int
+    # Agrupar lembretes no resumo do domínio
+    digest: bool
+    # Atributos fora do recorder, estatísticas diárias
+    recorder_lean: bool
+    # Reenviar a cada N horas enquanto vencida (0 = não); após M dias de
+    # atraso (0 = nunca), lembrar no destino de escalonamento
+    escalation_hours: int
+    escalation_days: int
+    escalation_service: str | None
+    # Lembrete igual ao último enviado: "off", "quiet" ou "skip"
+    notify_dedupe: str
+    engine: DueState | FleetDueEngine
+    units: dict[str, UnitData]
+    # Tempo para restaurar o estado no setup
+    restore_seconds: float
+    metrics: EntryMetrics = field(default_factory=EntryMetrics)
+    # Horas de uso das unidades com climate e intervalo adaptativo pela poeira
+    runtime: RuntimeTracker | None = None
+    air_quality: AirQualityTracker | None = None
+
+
+@callback
+def async_get_entry_data(hass: HomeAssistant, entry_id: str) -> EntryData | None:
+    """Retornar os dados da entrada, se ela estiver carregada."""
+    if (entry := hass.config_entries.async_get_entry(entry_id)) is None:
+        return None
+    data = getattr(entry, "runtime_data", None)
+    return data if isinstance(data, EntryData) else None
+
+
+@callback
+def async_loaded_entries(hass: HomeAssistant) -> dict[str, EntryData]:
+    """Retornar {entry_id: dados} de todas as entradas carregadas do domínio."""
+    return {
+        entry.entry_id: data
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if isinstance(data := getattr(entry, "runtime_data", None), EntryData)
+    }
@@ -0,0 +1,408 @@
+"""Envio de lembretes (individuais e em resumo) para AC Filter Reminder."""
+from __future__ import annotations
+
+from asyncio import Handle
+from collections import OrderedDict
+from collections.abc import Iterable
+from datetime import datetime
+from typing import NamedTuple
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from . import clock
+from .const import (
+    DOMAIN, DATA_DIGEST, DATA_NOTIFICATION_CACHE, DEDUPE_OFF, DEDUPE_POLICIES, DEDUPE_SKIP,
+    DIGEST_NOTIFICATION_ID, DIGEST_WINDOW_SECONDS, NOTIFY_FINGERPRINT_MAX,
+)
+from .delivery import async_get_delivery_queue
+from .due import DueSnapshot
+from .due_index import async_get_due_index
+
+
+def format_last_cleaned(last_cleaned) -> str:
+    """Formatar a data da última limpeza para as mensagens."""
+    try:
+        if last_cleaned and hasattr(last_cleaned, 'strftime'):
+            return last_cleaned.strftime("%d/%m/%Y às %H:%M")
+        if last_cleaned:
+            return str(last_cleaned)
+        return "Nunca"
+    except Exception:
+        return "Data inválida"
+
+
+def split_notify_service(notify_service: str | None) -> tuple[str, str] | None:
+    """Separar `notify.xxx` em (domínio, serviço); None se não configurado."""
+    if not notify_service or not notify_service.strip():
+        return None
+    if "." in notify_service:
+        domain, service = notify_service.split(".", 1)
+        return domain, service
+    return "notify", notify_service
+
+
+def render_reminder(ac_name: str, last_cleaned, interval_days, days_until) -> tuple[str, str]:
+    """Montar título e mensagem do lembrete de uma unidade."""
+    title = f"🌬️ Lembrete: limpar filtro do {ac_name}"
+    last_cleaned_str = format_last_cleaned(last_cleaned)
+
+    try:
+        days_until_str = str(days_until) if days_until is not None else "N/A"
+        interval_str = str(interval_days) if interval_days is not None else "N/A"
+    except Exception:
+        days_until_str = "N/A"
+        interval_str = "N/A"
+
+    message = (
+        f"Está na hora de LIMPAR (não trocar) o filtro do {ac_name}.\n\n"
+        f"📅 Última limpeza: {last_cleaned_str}\n"
+        f"⏰ Intervalo configurado: {interval_str} dias\n"
+        f"⏳ Dias restantes: {days_until_str}\n\n"
+        f"💡 Após limpar, clique no botão 'Marcar como limpo agora' no dispositivo."
+    )
+    return title, message
+
+
+@callback
+def async_notify(hass: HomeAssistant, unit_key: str, ac_name: str, notify_service: str | None,
+                 last_cleaned, interval_days, days_until, dedupe: str = DEDUPE_OFF) -> None:
+    """Enviar notificações de lembrete com melhor formatação.
+
+    `dedupe` diz o que fazer quando a mensagem é igual à última enviada ao
+    mesmo destino: enviar mesmo assim, só atualizar a notificação
+    persistente ou não enviar nada.
+    """
+    cache = async_get_notification_cache(hass)
+    title, message = cache.render(unit_key, ac_name, last_cleaned, interval_days, days_until)
+    queue = async_get_delivery_queue(hass)
+
+    # Notificação persistente
+    if not cache.async_skip("persistent_notification", unit_key, title, message, dedupe == DEDUPE_SKIP):
+        queue.async_enqueue(
+            "persistent_notification", "create",
+            {
+                "title": title,
+                "message": message,
+                "notification_id": f"ac_filter_{unit_key}"
+            },
+        )
+
+    # Notificação via notify.* se configurada
+    if target := split_notify_service(notify_service):
+        domain, service = target
+        if not cache.async_skip(f"{domain}.{service}", unit_key, title, message, dedupe != DEDUPE_OFF):
+            queue.async_enqueue(domain, service, {"title": title, "message": message})
+
+
+class DigestItem(NamedTuple):
+    """Uma unidade vencida aguardando o resumo."""
+
+    name: str
+    last_cleaned: datetime | None
+    overdue_days: int
+    line: str
+
+
+def digest_item(name: str, last_cleaned: datetime | None, overdue_days: int) -> DigestItem:
+    """Montar a linha de uma unidade no resumo."""
+    if not last_cleaned:
+        line = f"• {name}: sem limpeza registrada"
+    else:
+        line = (
+            f"• {name}: {overdue_days} dia(s) de atraso "
+            f"(última limpeza: {format_last_cleaned(last_cleaned)})"
+        )
+    return DigestItem(name, last_cleaned, overdue_days, line)
+
+
+def _render_digest(items: list[DigestItem]) -> tuple[str, str]:
+    """Montar título e mensagem do resumo, dos mais atrasados para os menos."""
+    ordered = sorted(items, key=lambda item: (-item.overdue_days, item.name.casefold()))
+    lines = [item.line for item in ordered]
+
+    title = f"🌬️ Lembrete: limpar filtro de {len(ordered)} ar-condicionado(s)"
+    message = (
+        "Está na hora de LIMPAR (não trocar) os filtros abaixo:\n\n"
+        + "\n".join(lines)
+        + "\n\n💡 Após limpar, clique no botão 'Marcar como limpo agora' em cada dispositivo."
+    )
+    return title, message
+
+
+class NotificationCache:
+    """Mensagens já montadas por unidade e a última enviada a cada destino.
+
+    A mensagem de uma unidade só é refeita quando mudam os dados dela (nome,
+    última limpeza, intervalo, dias restantes); uma unidade que continua
+    vencida reaproveita o texto do dia anterior, sem formatar datas de novo.
+    Para cada (destino, unidade ou resumo) fica uma impressão digital da
+    última mensagem enviada, com no máximo `NOTIFY_FINGERPRINT_MAX` entradas
+    (a menos usada sai primeiro).
+    """
+
+    def __init__(self, max_fingerprints: int = NOTIFY_FINGERPRINT_MAX) -> None:
+        """Initialize the cache."""
+        self._renders: dict[str, tuple[tuple, tuple[str, str]]] = {}
+        self._digest_items: dict[str, DigestItem] = {}
+        self._fingerprints: OrderedDict[tuple[str, str], int] = OrderedDict()
+        self._max_fingerprints = max_fingerprints
+        # Mensagens montadas, reaproveitadas e envios descartados por repetição
+        self.renders = 0
+        self.hits = 0
+        self.skipped = 0
+
+    def __len__(self) -> int:
+        """Return the number of remembered fingerprints."""
+        return len(self._fingerprints)
+
+    def render(
+        self, unit_key: str, ac_name: str, last_cleaned, interval_days, days_until
+    ) -> tuple[str, str]:
+        """Retornar título e mensagem da unidade, montando só se algo mudou."""
+        inputs = (ac_name, last_cleaned, interval_days, days_until)
+        if (cached := self._renders.get(unit_key)) is not None and cached[0] == inputs:
+            self.hits += 1
+            return cached[1]
+        rendered = render_reminder(ac_name, last_cleaned, interval_days, days_until)
+        self._renders[unit_key] = (inputs, rendered)
+        self.renders += 1
+        return rendered
+
+    def digest_item(
+        self, unit_key: str, name: str, last_cleaned: datetime | None, overdue_days: int
+    ) -> DigestItem:
+        """Retornar o item do resumo da unidade, montando só se algo mudou."""
+        cached = self._digest_items.get(unit_key)
+        if cached is not None and cached[:3] == (name, last_cleaned, overdue_days):
+            self.hits += 1
+            return cached
+        item = self._digest_items[unit_key] = digest_item(name, last_cleaned, overdue_days)
+        self.renders += 1
+        return item
+
+    @callback
+    def async_skip(self, target: str, key: str, title: str, message: str, drop_repeat: bool) -> bool:
+        """Registrar o envio e dizer se ele deve ser descartado.
+
+        Só descarta quando `drop_repeat` e a mensagem é igual à última enviada
+        ao mesmo destino para a mesma chave.
+        """
+        fingerprints = self._fingerprints
+        fingerprint_key = (target, key)
+        fingerprint = hash((title, message))
+        repeat = fingerprints.get(fingerprint_key) == fingerprint
+        fingerprints[fingerprint_key] = fingerprint
+        fingerprints.move_to_end(fingerprint_key)
+        if len(fingerprints) > self._max_fingerprints:
+            fingerprints.popitem(last=False)
+
+        if repeat and drop_repeat:
+            self.skipped += 1
+            return True
+        return False
+
+    @callback
+    def async_discard(self, unit_keys: Iterable[str]) -> None:
+        """Esquecer as mensagens montadas de unidades descarregadas."""
+        for unit_key in unit_keys:
+            self._renders.pop(unit_key, None)
+            self._digest_items.pop(unit_key, None)
+
+
+def _most_permissive(policies: Iterable[str]) -> str:
+    """Retornar a política mais permissiva (nenhuma entrada perde lembretes)."""
+    return min(policies, key=DEDUPE_POLICIES.index, default=DEDUPE_OFF)
+
+
+class NotificationDigest:
+    """Agrupa os lembretes disparados em uma janela curta.
+
+    Todas as unidades vencidas com o mesmo destino `notify.*` viram uma única
+    mensagem ordenada, e todas juntas viram uma única notificação persistente.
+    Uma unidade sai da notificação persistente quando é limpa ou quando deixa
+    de estar vencida por outro motivo (intervalo maior, qualidade do ar,
+    limite de horas de uso), pelo listener do índice de vencimentos.
+    """
+
+    def __init__(self, hass: HomeAssistant, window: float = DIGEST_WINDOW_SECONDS) -> None:
+        """Initialize the digest."""
+        self.hass = hass
+        self._window = window
+        self._pending: dict[str, DigestItem] = {}
+        self._targets: dict[str, str | None] = {}
+        self._policies: dict[str, str] = {}
+        self._notified: dict[str, DigestItem] = {}
+        self._unsub_flush: CALLBACK_TYPE | None = None
+        self._unsub_index: CALLBACK_TYPE | None = None
+        # Unidades listadas que mudaram neste ciclo do loop
+        self._changed: set[str] = set()
+        self._changed_handle: Handle | None = None
+
+    @property
+    def pending(self) -> int:
+        """Return the number of units waiting for the next digest."""
+        return len(self._pending)
+
+    @callback
+    def async_add(self, unit_key: str, ac_name: str, notify_service: str | None,
+                  last_cleaned: datetime | None, snap: DueSnapshot,
+                  dedupe: str = DEDUPE_OFF) -> None:
+        """Adicionar uma unidade vencida ao próximo resumo."""
+        self._pending[unit_key] = async_get_notification_cache(self.hass).digest_item(
+            unit_key, ac_name, last_cleaned, snap.overdue_days
+        )
+        self._targets[unit_key] = notify_service
+        self._policies[unit_key] = dedupe
+        if self._unsub_flush is None:
+            self._unsub_flush = clock.async_call_later(self.hass, self._window, self._async_flush)
+
+    @callback
+    def async_discard(self, unit_key: str) -> None:
+        """Remover uma unidade que acabou de ser limpa."""
+        self.async_discard_many((unit_key,))
+
+    @callback
+    def async_discard_many(self, unit_keys: Iterable[str]) -> None:
+        """Remover várias unidades limpas, refazendo o resumo uma única vez."""
+        changed = False
+        for unit_key in unit_keys:
+            self._pending.pop(unit_key, None)
+            self._targets.pop(unit_key, None)
+            self._policies.pop(unit_key, None)
+            if self._notified.pop(unit_key, None) is not None:
+                changed = True
+        if changed:
+            self._async_update_persistent()
+
+    @callback
+    def async_discard_entry(self, entry_id: str) -> None:
+        """Remover as unidades de uma entrada apagada."""
+        self.async_discard_many(
+            [unit_key for unit_key in (*self._pending, *self._notified) if unit_key.startswith(entry_id)]
+        )
+
+    @callback
+    def async_cancel(self) -> None:
+        """Cancelar o envio pendente."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        if self._changed_handle is not None:
+            self._changed_handle.cancel()
+            self._changed_handle = None
+
+    @callback
+    def _async_resolved(self, unit_keys: Iterable[str]) -> list[str]:
+        """Retornar as unidades carregadas que não estão mais vencidas."""
+        index = async_get_due_index(self.hass)
+        return [
+            unit_key for unit_key in unit_keys
+            if unit_key in index and not index.unit(unit_key)[1].snapshot().is_overdue
+        ]
+
+    @callback
+    def _async_unit_changed(self, unit_key: str) -> None:
+        """Juntar as unidades listadas que mudaram; conferidas uma vez por ciclo."""
+        if unit_key not in self._notified:
+            return
+        self._changed.add(unit_key)
+        if self._changed_handle is None:
+            self._changed_handle = self.hass.loop.call_soon(self._async_drop_resolved)
+
+    @callback
+    def _async_drop_resolved(self) -> None:
+        """Tirar do resumo as unidades que mudaram e deixaram de estar vencidas."""
+        self._changed_handle = None
+        changed, self._changed = self._changed, set()
+        self.async_discard_many(self._async_resolved(changed))
+
+    @callback
+    def _async_update_persistent(self, drop_repeat: bool = False) -> None:
+        """Refazer a notificação persistente, ou removê-la se ficou vazia.
+
+        Só acompanha o índice de vencimentos enquanto há unidades listadas.
+        """
+        if self._notified:
+            if self._unsub_index is None:
+                self._unsub_index = async_get_due_index(self.hass).async_add_unit_listener(
+                    self._async_unit_changed
+                )
+            self._async_create_persistent(drop_repeat)
+            return
+
+        if self._unsub_index is not None:
+            self._unsub_index()
+            self._unsub_index = None
+        async_get_delivery_queue(self.hass).async_enqueue(
+            "persistent_notification", "dismiss",
+            {"notification_id": DIGEST_NOTIFICATION_ID},
+        )
+
+    @callback
+    def _async_create_persistent(self, drop_repeat: bool = False) -> None:
+        """Criar (ou substituir) a notificação persistente do resumo."""
+        title, message = _render_digest(list(self._notified.values()))
+        cache = async_get_notification_cache(self.hass)
+        if cache.async_skip("persistent_notification", DIGEST_NOTIFICATION_ID, title, message, drop_repeat):
+            return
+        async_get_delivery_queue(self.hass).async_enqueue(
+            "persistent_notification", "create",
+            {
+                "title": title,
+                "message": message,
+                "notification_id": DIGEST_NOTIFICATION_ID,
+            },
+        )
+
+    @callback
+    def _async_flush(self, _now: datetime) -> None:
+        """Enviar o resumo: uma mensagem por destino e uma persistente."""
+        self._unsub_flush = None
+        pending, self._pending = self._pending, {}
+        targets, self._targets = self._targets, {}
+        policies, self._policies = self._policies, {}
+        if not pending:
+            return
+
+        # A notificação persistente é uma só para todas as entradas e para os
+        # reenvios: as unidades deste envio se juntam às já listadas que
+        # continuam vencidas (as demais saem, como no listener do índice)
+        self._notified.update(pending)
+        for unit_key in self._async_resolved(self._notified):
+            del self._notified[unit_key]
+            pending.pop(unit_key, None)
+        self._async_update_persistent(_most_permissive(policies.values()) == DEDUPE_SKIP)
+
+        by_target: dict[tuple[str, str], list[str]] = {}
+        for unit_key in pending:
+            if target := split_notify_service(targets.get(unit_key)):
+                by_target.setdefault(target, []).append(unit_key)
+
+        cache = async_get_notification_cache(self.hass)
+        queue = async_get_delivery_queue(self.hass)
+        for (domain, service), unit_keys in by_target.items():
+            title, message = _render_digest([pending[unit_key] for unit_key in unit_keys])
+            policy = _most_permissive(policies[unit_key] for unit_key in unit_keys)
+            if cache.async_skip(
+                f"{domain}.{service}", DIGEST_NOTIFICATION_ID, title, message, policy != DEDUPE_OFF
+            ):
+                continue
+            queue.async_enqueue(domain, service, {"title": title, "message": message})
+
+
+@callback
+def async_get_digest(hass: HomeAssistant) -> NotificationDigest:
+    """Obter (ou criar) o resumo compartilhado do domínio."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (digest := domain_data.get(DATA_DIGEST)) is None:
+        digest = domain_data[DATA_DIGEST] = NotificationDigest(hass)
+    return digest
+
+
+@callback
+def async_get_notification_cache(hass: HomeAssistant) -> NotificationCache:
+    """Obter (ou criar) o cache de mensagens do domínio."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (cache := domain_data.get(DATA_NOTIFICATION_CACHE)) is None:
+        cache = domain_data[DATA_NOTIFICATION_CACHE] = NotificationCache()
+    return cache
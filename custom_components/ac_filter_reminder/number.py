@@ -4,15 +4,15 @@ from typing import Any
 
 from homeassistant.components.number import NumberEntity
 from homeassistant.helpers.restore_state import RestoreEntity
-from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import (
-    DOMAIN, ATTR_INTERVAL_DAYS, DEFAULT_INTERVAL_DAYS, 
-    DEVICE_MANUFACTURER, DEVICE_MODEL
-)
+from .const import DOMAIN, ATTR_INTERVAL_DAYS, DATA_STATE, DEFAULT_INTERVAL_DAYS
+from .due import scale_interval
+from .metrics import EntryMetrics, StateWriteCounter
+from .models import EntryData, UnitData
+from .store import UnitStateStore
 
 
 async def async_setup_entry(
@@ -21,24 +21,34 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Configurar entidades number da entrada."""
-    dev_info = DeviceInfo(
-        identifiers={(DOMAIN, entry.entry_id)},
-        name=entry.data.get("name"),
-        manufacturer=DEVICE_MANUFACTURER,
-        model=DEVICE_MODEL,
-    )
-    
-    ent = IntervalDaysNumber(hass, entry, dev_info)
-    async_add_entities([ent])
-    
-    # Armazenar referência da entidade
-    hass.data[DOMAIN][entry.entry_id]["entities"]["interval_days"] = ent
+    state_store: UnitStateStore = hass.data[DOMAIN][DATA_STATE]
+    data: EntryData = entry.runtime_data
+    entities: list[IntervalDaysNumber] = []
+    if data.recorder_lean:
+        number_cls, filter_cls = LeanIntervalDaysNumber, LeanFilterIntervalNumber
+    else:
+        number_cls, filter_cls = IntervalDaysNumber, FilterIntervalNumber
+
+    for unit in data.units.values():
+        # Armazenar referência da entidade
+        unit.interval_days = number_cls(unit, data.metrics, state_store)
+        entities.append(unit.interval_days)
+
+        # Um intervalo por filtro extra, no mesmo dispositivo
+        if unit.filters is not None:
+            unit.filter_intervals = [
+                filter_cls(unit, data.metrics, state_store, index) for index in unit.filters
+            ]
+            entities.extend(unit.filter_intervals)
 
+    async_add_entities(entities)
 
-class IntervalDaysNumber(RestoreEntity, NumberEntity):
+
+class IntervalDaysNumber(StateWriteCounter, RestoreEntity, NumberEntity):
     """Entidade number para configurar o intervalo de dias entre limpezas."""
 
     _attr_has_entity_name = True
+    _attr_should_poll = False
     _attr_name = "Intervalo (dias)"
     _attr_icon = "mdi:counter"
     _attr_native_min_value = 1
@@ -46,18 +56,19 @@ class IntervalDaysNumber(RestoreEntity, NumberEntity):
     _attr_native_step = 1
     _attr_native_unit_of_measurement = "d"
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, device_info: DeviceInfo) -> None:
+    def __init__(self, unit: UnitData, metrics: EntryMetrics, state_store: UnitStateStore) -> None:
         """Initialize the number entity."""
-        self.hass = hass
-        self._entry = entry
-        self._attr_unique_id = f"{entry.entry_id}_interval_days"
-        self._attr_device_info = device_info
-        self._val = DEFAULT_INTERVAL_DAYS
+        self._metrics = metrics
+        self._unit_key = unit.key
+        self._due = unit.due
+        self._state_store = state_store
+        self._attr_unique_id = f"{unit.key}_interval_days"
+        self._attr_device_info = unit.device_info
 
     @property
     def native_value(self) -> float:
         """Return the current value."""
-        return self._val
+        return self._due.interval
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
@@ -66,25 +77,93 @@ class IntervalDaysNumber(RestoreEntity, NumberEntity):
             "min_value": self._attr_native_min_value,
             "max_value": self._attr_native_max_value,
             "step": self._attr_native_step,
-            "description": "Intervalo em dias entre as limpezas do filtro"
+            "description": "Intervalo em dias entre as limpezas do filtro",
+            "effective_interval_days": self._due.effective_interval,
         }
 
     async def async_set_native_value(self, value: float) -> None:
         """Set the native value."""
-        self._val = int(value)
-        self.async_write_ha_state()
+        self._due.set_interval(int(value))
+        self._state_store.async_schedule_save()
 
     async def async_added_to_hass(self) -> None:
         """Handle entity being added to hass."""
         await super().async_added_to_hass()
-        
+
+        # Só migra do estado restaurado quando o store tipado não tem a unidade
+        if not self._state_store.has_record(self._unit_key):
+            await self._async_migrate_last_state()
+
+        self.async_on_remove(self._due.async_add_listener(self.async_write_ha_state))
+
+    async def _async_migrate_last_state(self) -> None:
+        """Converter o último estado (texto) para o store tipado, uma única vez."""
         if (state := await self.async_get_last_state()) and state.state not in ("unknown", "unavailable"):
             try:
-                self._val = int(float(state.state))
+                val = int(float(state.state))
                 # Validar limites
-                if self._val < self._attr_native_min_value:
-                    self._val = int(self._attr_native_min_value)
-                elif self._val > self._attr_native_max_value:
-                    self._val = int(self._attr_native_max_value)
+                if val < self._attr_native_min_value:
+                    val = int(self._attr_native_min_value)
+                elif val > self._attr_native_max_value:
+                    val = int(self._attr_native_max_value)
             except (ValueError, TypeError):
-                self._val = DEFAULT_INTERVAL_DAYS
\ No newline at end of file
+                val = DEFAULT_INTERVAL_DAYS
+            self._due.set_interval(val)
+
+        self._state_store.async_schedule_save()
+
+
+class LeanIntervalDaysNumber(IntervalDaysNumber):
+    """Intervalo sem os atributos constantes e derivados no recorder."""
+
+    _unrecorded_attributes = frozenset(
+        {"min_value", "max_value", "step", "description", "effective_interval_days"}
+    )
+
+
+class FilterIntervalNumber(IntervalDaysNumber):
+    """Intervalo de um filtro extra da unidade."""
+
+    _attr_icon = "mdi:air-filter"
+
+    def __init__(
+        self, unit: UnitData, metrics: EntryMetrics, state_store: UnitStateStore, index: int
+    ) -> None:
+        """Initialize the number entity."""
+        super().__init__(unit, metrics, state_store)
+        self._filters = unit.filters
+        self._index = index
+        self._attr_unique_id = f"{unit.key}_{self._filters.ids[index]}_interval_days"
+        self._attr_name = f"Intervalo {self._filters.names[index]} (dias)"
+
+    @property
+    def native_value(self) -> float:
+        """Return the current value."""
+        return self._filters.interval(self._index)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return extra state attributes."""
+        return {
+            "min_value": self._attr_native_min_value,
+            "max_value": self._attr_native_max_value,
+            "step": self._attr_native_step,
+            "description": f"Intervalo em dias entre as limpezas do {self._filters.names[self._index]}",
+            "effective_interval_days": scale_interval(
+                self._filters.interval(self._index), self._due.interval_factor
+            ),
+        }
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Set the native value."""
+        self._filters.set_interval(self._index, int(value))
+        self._state_store.async_schedule_save()
+
+    async def _async_migrate_last_state(self) -> None:
+        """Filtros extras nasceram com o store tipado: nada a migrar."""
+
+
+class LeanFilterIntervalNumber(FilterIntervalNumber):
+    """Intervalo de um filtro extra sem os atributos constantes e derivados no recorder."""
+
+    _unrecorded_attributes = LeanIntervalDaysNumber._unrecorded_attributes
@@ -0,0 +1,250 @@
+"""Perfil sob demanda dos caminhos quentes da integração."""
+from __future__ import annotations
+
+from collections.abc import Callable, Coroutine, Generator
+import cProfile
+from datetime import datetime
+from functools import wraps
+import importlib
+import inspect
+import io
+import logging
+import pstats
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from . import clock
+from .const import DOMAIN, DATA_PROFILER
+
+_LOGGER = logging.getLogger(__name__)
+
+# Propriedades lidas pelo núcleo a cada escrita de estado
+_ENTITY_PROPERTIES = ("native_value", "is_on", "extra_state_attributes", "icon")
+
+
+def _targets() -> list[tuple[Any, str]]:
+    """Retornar (dono, atributo) de cada função medida.
+
+    O `_async_daily_check` é agendado por nome (não por referência), então a
+    troca também vale para os jobs já agendados.
+    """
+    # Plataformas são importadas pelo Home Assistant; aqui já estão carregadas
+    integration = importlib.import_module(__package__)
+    binary_sensor = importlib.import_module(f"{__package__}.binary_sensor")
+    button = importlib.import_module(f"{__package__}.button")
+    number = importlib.import_module(f"{__package__}.number")
+    sensor = importlib.import_module(f"{__package__}.sensor")
+    notifications = importlib.import_module(f"{__package__}.notifications")
+
+    targets: list[tuple[Any, str]] = [
+        (integration, "_async_daily_check"),
+        (integration, "_async_remind"),
+        (integration, "async_notify"),
+        (notifications.NotificationDigest, "_async_flush"),
+        (button.MarkCleanedButton, "async_press"),
+    ]
+    for entity_cls in (
+        sensor.LastCleanedSensor, sensor.DaysUntilDueSensor, sensor.RuntimeHoursSensor,
+        binary_sensor.CleaningDueBinary, number.IntervalDaysNumber,
+    ):
+        targets.extend(
+            (entity_cls, name) for name in _ENTITY_PROPERTIES
+            if isinstance(entity_cls.__dict__.get(name), property)
+        )
+    return targets
+
+
+class ProfileSession:
+    """Uma medição com cProfile, ligada só dentro das funções medidas.
+
+    As funções medidas são trocadas por versões que ligam o profiler ao
+    entrar e desligam ao sair; ao terminar, as originais voltam. Fora de uma
+    sessão nada muda no código medido: não há custo quando desligado. Nas
+    corrotinas (como `async_press`) o profiler é desligado a cada `await`
+    que suspende, então o resto do loop não entra na conta; cada retomada
+    aparece no pstats como mais uma chamada da corrotina.
+    """
+
+    def __init__(self, hass: HomeAssistant, seconds: float, top: int) -> None:
+        """Initialize the session."""
+        self.hass = hass
+        self.seconds = seconds
+        self.top = top
+        self.started: datetime | None = None
+        # Entradas nas funções medidas, inclusive as aninhadas
+        self.calls = 0
+        # Entradas que rodaram sem medir: outro profiler estava ativo
+        self.unmeasured = 0
+        self._profiler = cProfile.Profile()
+        self._depth = 0
+        self._originals: list[tuple[Any, str, Any]] = []
+        self._unsub_stop: CALLBACK_TYPE | None = None
+
+    def _enter(self) -> bool:
+        """Ligar o profiler; False se outro já está ativo (rodar sem medir)."""
+        if self._depth == 0:
+            try:
+                self._profiler.enable()
+            except ValueError:
+                # Outro profiler (o `profiler.start` do núcleo, um depurador)
+                # ligado no meio da sessão: a função roda normalmente
+                return False
+        self._depth += 1
+        return True
+
+    def _exit(self) -> None:
+        self._depth -= 1
+        if self._depth == 0:
+            self._profiler.disable()
+
+    def _wrap(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Retornar `func` medida por esta sessão."""
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                self.calls += 1
+                return await _Measured(self, func(*args, **kwargs))
+
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            self.calls += 1
+            if not self._enter():
+                self.unmeasured += 1
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._exit()
+
+        return wrapper
+
+    @callback
+    def async_start(self) -> None:
+        """Trocar as funções medidas e agendar o fim da sessão."""
+        # Só um profiler por vez no interpretador: falhar aqui, não nas funções medidas
+        try:
+            self._profiler.enable()
+        except ValueError as err:
+            raise HomeAssistantError(
+                "Outro profiler já está ativo (profiler.start ou um depurador)"
+            ) from err
+        self._profiler.disable()
+
+        for owner, name in _targets():
+            original = owner.__dict__[name] if isinstance(owner, type) else getattr(owner, name)
+            if isinstance(original, property):
+                replacement: Any = property(self._wrap(original.fget))
+            else:
+                replacement = self._wrap(original)
+            self._originals.append((owner, name, original))
+            setattr(owner, name, replacement)
+
+        self.started = clock.utcnow()
+        self._unsub_stop = clock.async_call_later(self.hass, self.seconds, self._async_finish)
+        _LOGGER.warning(
+            "Perfil iniciado por %ss em %s função(ões) do AC Filter Reminder",
+            self.seconds, len(self._originals),
+        )
+
+    @callback
+    def async_restore(self) -> None:
+        """Devolver as funções originais."""
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+        for owner, name, original in reversed(self._originals):
+            setattr(owner, name, original)
+        self._originals.clear()
+        if self._depth:
+            # Parado de dentro de uma função medida
+            self._depth = 0
+            self._profiler.disable()
+
+    @callback
+    def _async_finish(self, _now: datetime) -> None:
+        """Encerrar a sessão e gravar o resultado fora do loop."""
+        self._unsub_stop = None
+        self.async_restore()
+        if self.hass.data.get(DOMAIN, {}).get(DATA_PROFILER) is self:
+            del self.hass.data[DOMAIN][DATA_PROFILER]
+        self.hass.async_create_background_task(
+            self._async_save(), name=f"{DOMAIN} profile"
+        )
+
+    async def _async_save(self) -> None:
+        """Gravar o arquivo pstats e o resumo no log."""
+        path = self.hass.config.path(
+            f"{DOMAIN}_profile_{dt_util.as_local(self.started).strftime('%Y%m%d_%H%M%S')}.pstats"
+        )
+        summary = await self.hass.async_add_executor_job(self._write, path)
+        _LOGGER.warning(
+            "Perfil do AC Filter Reminder: %s chamada(s) medidas em %ss (%s sem medir, "
+            "outro profiler ativo), gravado em %s\n%s",
+            self.calls - self.unmeasured, self.seconds, self.unmeasured, path, summary,
+        )
+
+    def _write(self, path: str) -> str:
+        """Gravar o pstats e retornar as `top` funções por tempo acumulado."""
+        self._profiler.dump_stats(path)
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=stream)
+        stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        return stream.getvalue()
+
+
+class _Measured:
+    """Awaitable que mede só os trechos em que a corrotina roda.
+
+    Cada passo (`send`/`throw`) liga o profiler e cada suspensão o desliga;
+    o valor e as exceções (inclusive o cancelamento) passam sem mudança.
+    """
+
+    def __init__(self, session: ProfileSession, coro: Coroutine[Any, Any, Any]) -> None:
+        """Initialize the awaitable."""
+        self._session = session
+        self._coro = coro
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        """Run the coroutine one step at a time."""
+        coro = self._coro
+        session = self._session
+        value: Any = None
+        error: BaseException | None = None
+        complete = True
+        while True:
+            measured = session._enter()  # noqa: SLF001
+            if not measured and complete:
+                complete = False
+                session.unmeasured += 1
+            try:
+                if error is not None:
+                    yielded = coro.throw(error)
+                else:
+                    yielded = coro.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                if measured:
+                    session._exit()  # noqa: SLF001
+            try:
+                value, error = (yield yielded), None
+            except BaseException as err:  # noqa: BLE001
+                value, error = None, err
+
+
+@callback
+def async_start_profile(hass: HomeAssistant, seconds: float, top: int) -> ProfileSession:
+    """Iniciar uma sessão de perfil; só uma por vez."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if domain_data.get(DATA_PROFILER) is not None:
+        raise HomeAssistantError("Já existe um perfil do AC Filter Reminder em andamento")
+    session = ProfileSession(hass, seconds, top)
+    session.async_start()
+    domain_data[DATA_PROFILER] = session
+    return session
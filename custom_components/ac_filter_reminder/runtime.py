@@ -0,0 +1,204 @@
+"""Horas de uso do filtro a partir de uma entidade climate vinculada."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from homeassistant.const import STATE_OFF, STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from . import clock
+from .const import RUNTIME_FLUSH_SECONDS
+from .due import DueState
+from .fleet import FleetUnitState
+from .scheduler import async_get_scheduler
+from .store import UnitStateStore
+
+# hvac_action em que o ar passa pelo filtro
+_ACTIVE_ACTIONS = frozenset({"cooling", "heating", "drying", "fan", "preheating", "defrosting"})
+_INACTIVE_STATES = frozenset({STATE_OFF, STATE_UNAVAILABLE, STATE_UNKNOWN})
+
+
+def is_active(state: State | None) -> bool:
+    """Retornar se a entidade climate está movendo ar pelo filtro."""
+    if state is None:
+        return False
+    if (action := state.attributes.get("hvac_action")) is not None:
+        return action in _ACTIVE_ACTIONS
+    return state.state not in _INACTIVE_STATES
+
+
+class RuntimeTracker:
+    """Soma o tempo ativo das entidades climate vinculadas às unidades.
+
+    Cada mudança de estado só anota o instante em que a unidade ligou ou
+    soma o trecho que acabou de terminar; os segundos acumulados vão para
+    o estado da unidade, para o store e para os sensores só no flush, a cada
+    `RUNTIME_FLUSH_SECONDS`, e o timer só fica armado enquanto há o que somar.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        units: dict[str, tuple[str, DueState | FleetUnitState]],
+        state_store: UnitStateStore,
+        flush_interval: float = RUNTIME_FLUSH_SECONDS,
+    ) -> None:
+        """Initialize the tracker with {unit_key: (climate_entity_id, due)}."""
+        self.hass = hass
+        self._key = (entry_id, "runtime")
+        self._dues = {unit_key: due for unit_key, (_, due) in units.items()}
+        self._entity_of = {unit_key: entity_id for unit_key, (entity_id, _) in units.items()}
+        self._by_entity: dict[str, list[str]] = {}
+        for unit_key, (entity_id, _) in units.items():
+            self._by_entity.setdefault(entity_id, []).append(unit_key)
+        self._state_store = state_store
+        self._flush_interval = flush_interval
+        # Instante (monotônico) em que a unidade ligou; None se parada
+        self._active_since: dict[str, float | None] = dict.fromkeys(self._dues)
+        # Segundos já encerrados e ainda não aplicados ao estado da unidade
+        self._pending: dict[str, float] = dict.fromkeys(self._dues, 0.0)
+        # Unidades ligadas ou com segundos pendentes: só elas entram no flush
+        self._dirty: set[str] = set()
+        self._cleaned_at = {unit_key: due.last_cleaned for unit_key, due in self._dues.items()}
+        self._listeners: dict[str, list[Callable[[], None]]] = {}
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self._armed = False
+
+    @property
+    def entity_ids(self) -> list[str]:
+        """Return the linked climate entities."""
+        return list(self._by_entity)
+
+    def climate_entity(self, unit_key: str) -> str | None:
+        """Return the climate entity linked to a unit."""
+        return self._entity_of.get(unit_key)
+
+    def is_running(self, unit_key: str) -> bool:
+        """Return True if the unit's climate entity is active now."""
+        return self._active_since.get(unit_key) is not None
+
+    def runtime_seconds(self, unit_key: str) -> float:
+        """Retornar as horas de uso atuais (em segundos), incluindo o trecho em curso."""
+        seconds = self._dues[unit_key].runtime_seconds + self._pending[unit_key]
+        if (since := self._active_since[unit_key]) is not None:
+            seconds += clock.monotonic() - since
+        return seconds
+
+    @callback
+    def async_add_listener(self, unit_key: str, update_callback: Callable[[], None]) -> Callable[[], None]:
+        """Registrar um listener avisado a cada flush da unidade."""
+        listeners = self._listeners.setdefault(unit_key, [])
+        listeners.append(update_callback)
+
+        def remove_listener() -> None:
+            listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_start(self) -> None:
+        """Ler o estado atual e começar a acompanhar as mudanças."""
+        now = clock.monotonic()
+        for entity_id, unit_keys in self._by_entity.items():
+            if is_active(self.hass.states.get(entity_id)):
+                for unit_key in unit_keys:
+                    self._active_since[unit_key] = now
+                self._dirty.update(unit_keys)
+                self._async_arm()
+
+        self._unsubs.append(
+            async_track_state_change_event(
+                self.hass, list(self._by_entity), self._async_state_changed
+            )
+        )
+        for unit_key, due in self._dues.items():
+            self._unsubs.append(
+                due.async_add_listener(lambda unit_key=unit_key: self._async_due_changed(unit_key))
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Parar de acompanhar e aplicar o que estiver pendente."""
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs.clear()
+        async_get_scheduler(self.hass).async_cancel(self._key)
+        self._armed = False
+        self._async_flush(clock.utcnow(), rearm=False)
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Anotar a transição ligado/desligado de uma entidade climate."""
+        active = is_active(event.data["new_state"])
+        now = clock.monotonic()
+        for unit_key in self._by_entity.get(event.data["entity_id"], ()):
+            since = self._active_since[unit_key]
+            if active and since is None:
+                self._active_since[unit_key] = now
+            elif not active and since is not None:
+                self._pending[unit_key] += now - since
+                self._active_since[unit_key] = None
+            else:
+                continue
+            self._dirty.add(unit_key)
+            self._async_arm()
+
+    @callback
+    def _async_due_changed(self, unit_key: str) -> None:
+        """Descartar o tempo acumulado antes de uma limpeza."""
+        due = self._dues[unit_key]
+        if due.last_cleaned == self._cleaned_at[unit_key]:
+            return
+        self._cleaned_at[unit_key] = due.last_cleaned
+        self._pending[unit_key] = 0.0
+        if self._active_since[unit_key] is not None:
+            self._active_since[unit_key] = clock.monotonic()
+        self._async_update_listeners(unit_key)
+
+    @callback
+    def _async_arm(self) -> None:
+        """Agendar o próximo flush, se ainda não houver um."""
+        if self._armed:
+            return
+        self._armed = True
+        async_get_scheduler(self.hass).async_schedule(
+            self._key,
+            clock.utcnow() + timedelta(seconds=self._flush_interval),
+            self._async_flush,
+        )
+
+    @callback
+    def _async_flush(self, now: datetime, rearm: bool = True) -> None:
+        """Aplicar os segundos acumulados ao estado das unidades."""
+        self._armed = False
+        mono = clock.monotonic()
+        dirty, self._dirty = self._dirty, set()
+        changed = False
+
+        for unit_key in dirty:
+            seconds = self._pending[unit_key]
+            self._pending[unit_key] = 0.0
+            if (since := self._active_since[unit_key]) is not None:
+                seconds += mono - since
+                self._active_since[unit_key] = mono
+                self._dirty.add(unit_key)
+            if not seconds:
+                continue
+            due = self._dues[unit_key]
+            due.set_runtime(due.runtime_seconds + seconds)
+            self._async_update_listeners(unit_key)
+            changed = True
+
+        if changed:
+            self._state_store.async_schedule_save()
+        if self._dirty and rearm:
+            self._async_arm()
+
+    @callback
+    def _async_update_listeners(self, unit_key: str) -> None:
+        """Avisar os listeners de uma unidade."""
+        for update_callback in list(self._listeners.get(unit_key, ())):
+            update_callback()
@@ -0,0 +1,166 @@
+"""Agendador compartilhado de lembretes para AC Filter Reminder."""
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable
+from datetime import datetime, timedelta
+import heapq
+import itertools
+import logging
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from . import clock
+from .const import DOMAIN, DATA_SCHEDULER
+
+_LOGGER = logging.getLogger(__name__)
+
+# Recompacta o heap quando entradas canceladas passam deste fator
+_COMPACT_FACTOR = 2
+
+JobAction = Callable[[datetime], None]
+
+
+def next_reminder_time(hour: int, minute: int, now: datetime) -> datetime:
+    """Calcular o próximo instante (UTC) do lembrete diário no horário local."""
+    local_now = dt_util.as_local(now)
+    target = local_now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= local_now:
+        target = (local_now + timedelta(days=1)).replace(
+            hour=hour, minute=minute, second=0, microsecond=0
+        )
+    return dt_util.as_utc(target)
+
+
+class ReminderScheduler:
+    """Agendador único para todo o domínio.
+
+    Mantém um heap com o próximo instante de cada job (um por entrada) e
+    arma um único timer do Home Assistant para o mais próximo deles.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._heap: list[tuple[float, int, Hashable]] = []
+        self._jobs: dict[Hashable, tuple[float, int, JobAction]] = {}
+        self._seq = itertools.count()
+        self._unsub: CALLBACK_TYPE | None = None
+        self._armed_at: float | None = None
+        self._firing = False
+
+    def __len__(self) -> int:
+        """Return the number of scheduled jobs."""
+        return len(self._jobs)
+
+    @property
+    def next_fire(self) -> datetime | None:
+        """Return the instant the timer is armed for."""
+        if self._armed_at is None:
+            return None
+        return dt_util.utc_from_timestamp(self._armed_at)
+
+    @callback
+    def async_schedule(self, key: Hashable, when: datetime, action: JobAction) -> None:
+        """Agendar (ou reagendar) o job `key` para o instante `when`."""
+        ts = when.timestamp()
+        seq = next(self._seq)
+        self._jobs[key] = (ts, seq, action)
+        heapq.heappush(self._heap, (ts, seq, key))
+        self._async_compact()
+        self._async_arm()
+
+    @callback
+    def async_cancel(self, key: Hashable) -> None:
+        """Cancelar o job `key`, se existir."""
+        if self._jobs.pop(key, None) is None:
+            return
+        self._async_compact()
+        self._async_arm()
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancelar todos os jobs e o timer."""
+        self._jobs.clear()
+        self._heap.clear()
+        self._async_disarm()
+
+    def _is_live(self, item: tuple[float, int, Hashable]) -> bool:
+        """Verificar se a entrada do heap ainda corresponde a um job ativo."""
+        job = self._jobs.get(item[2])
+        return job is not None and job[1] == item[1]
+
+    @callback
+    def _async_compact(self) -> None:
+        """Descartar entradas obsoletas quando o heap cresce demais."""
+        if len(self._heap) <= _COMPACT_FACTOR * len(self._jobs) + 16:
+            return
+        self._heap = [item for item in self._heap if self._is_live(item)]
+        heapq.heapify(self._heap)
+
+    @callback
+    def _async_disarm(self) -> None:
+        """Cancelar o timer armado."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        self._armed_at = None
+
+    @callback
+    def _async_arm(self) -> None:
+        """Armar o timer para o job mais próximo."""
+        if self._firing:
+            return
+        heap = self._heap
+        while heap and not self._is_live(heap[0]):
+            heapq.heappop(heap)
+
+        if not heap:
+            self._async_disarm()
+            return
+
+        ts = heap[0][0]
+        if ts == self._armed_at:
+            return
+
+        self._async_disarm()
+        self._armed_at = ts
+        self._unsub = clock.async_track_point_in_utc_time(
+            self.hass, self._async_fire, dt_util.utc_from_timestamp(ts)
+        )
+
+    @callback
+    def _async_fire(self, now: datetime) -> None:
+        """Executar todos os jobs vencidos e rearmar o timer."""
+        self._unsub = None
+        self._armed_at = None
+
+        # Todos os jobs vencidos recebem o instante real do disparo, não o
+        # instante agendado do primeiro (um job atrasado veria o relógio antigo)
+        now_ts = max(now.timestamp(), clock.utcnow().timestamp())
+        now = dt_util.utc_from_timestamp(now_ts)
+        heap = self._heap
+        self._firing = True
+        try:
+            while heap and heap[0][0] <= now_ts:
+                item = heapq.heappop(heap)
+                if not self._is_live(item):
+                    continue
+                _, _, action = self._jobs.pop(item[2])
+                try:
+                    action(now)
+                except Exception:  # noqa: BLE001
+                    _LOGGER.exception("Erro ao executar lembrete agendado %s", item[2])
+        finally:
+            self._firing = False
+
+        self._async_arm()
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> ReminderScheduler:
+    """Obter (ou criar) o agendador compartilhado do domínio."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (scheduler := domain_data.get(DATA_SCHEDULER)) is None:
+        scheduler = domain_data[DATA_SCHEDULER] = ReminderScheduler(hass)
+    return scheduler
@@ -1,23 +1,33 @@
 """Sensores para AC Filter Reminder."""
 from __future__ import annotations
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorStateClass
 from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.const import UnitOfTime
+from homeassistant.const import EntityCategory, UnitOfTime
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from . import clock
 from .const import (
-    DOMAIN, ATTR_LAST_CLEANED, DEVICE_MANUFACTURER, DEVICE_MODEL
+    DOMAIN, ATTR_LAST_CLEANED, DATA_HISTORY, DATA_STATE, DEVICE_MANUFACTURER, DEVICE_MODEL
 )
+from .delivery import async_get_delivery_queue
+from .history import CleaningHistory
+from .metrics import EntryMetrics, StateWriteCounter
+from .models import EntryData, UnitData
+from .runtime import RuntimeTracker
+from .store import UnitStateStore
 
 _LOGGER = logging.getLogger(__name__)
 
+# Só os sensores de diagnóstico (desabilitados por padrão) são consultados
+SCAN_INTERVAL = timedelta(minutes=1)
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -25,163 +35,403 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Configurar sensores da entrada."""
-    dev_info = DeviceInfo(
-        identifiers={(DOMAIN, entry.entry_id)},
-        name=entry.data.get("name"),
-        manufacturer=DEVICE_MANUFACTURER,
-        model=DEVICE_MODEL,
-        configuration_url=None,
-    )
+    history: CleaningHistory = hass.data[DOMAIN][DATA_HISTORY]
+    data: EntryData = entry.runtime_data
+    state_store: UnitStateStore = hass.data[DOMAIN][DATA_STATE]
+    entities: list[SensorEntity] = []
 
-    last = LastCleanedSensor(hass, entry, dev_info)
-    days = DaysUntilDueSensor(hass, entry, dev_info)
+    # Modo enxuto: os mesmos sensores, sem os atributos derivados no recorder
+    if data.recorder_lean:
+        last_cls, days_cls = LeanLastCleanedSensor, LeanDaysUntilDueSensor
+    else:
+        last_cls, days_cls = LastCleanedSensor, DaysUntilDueSensor
 
-    async_add_entities([last, days])
+    for unit in data.units.values():
+        # Armazenar referências das entidades
+        unit.last_cleaned = last_cls(unit, data.metrics, history, state_store)
+        unit.days_until_due = days_cls(unit, data.metrics)
+        entities.extend((unit.last_cleaned, unit.days_until_due))
 
-    # Armazenar referências das entidades
-    hass.data[DOMAIN][entry.entry_id]["entities"]["last_cleaned"] = last
-    hass.data[DOMAIN][entry.entry_id]["entities"]["days_until_due"] = days
+        if unit.climate:
+            unit.runtime_hours = RuntimeHoursSensor(unit, data.metrics, data.runtime)
+            entities.append(unit.runtime_hours)
+
+    # Diagnóstico da própria integração, em um dispositivo por entrada (numa
+    # entrada comum é o próprio dispositivo da unidade)
+    if (own_unit := data.units.get(entry.entry_id)) is not None:
+        entry_info = own_unit.device_info
+    else:
+        entry_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=data.name or entry.title,
+            manufacturer=DEVICE_MANUFACTURER,
+            model=DEVICE_MODEL,
+        )
+    entities.extend(
+        sensor_cls(entry.entry_id, data, entry_info)
+        for sensor_cls in (
+            DailyCheckSensor, StateWritesSensor, DueComputeSensor, NotificationLatencySensor
+        )
+    )
 
+    async_add_entities(entities)
 
-class LastCleanedSensor(RestoreEntity, SensorEntity):
+
+class LastCleanedSensor(StateWriteCounter, RestoreEntity, SensorEntity):
     """Sensor da última limpeza do filtro."""
 
     _attr_has_entity_name = True
+    _attr_should_poll = False
     _attr_name = "Última limpeza"
     _attr_icon = "mdi:calendar-clock"
     _attr_device_class = SensorDeviceClass.TIMESTAMP
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, device_info: DeviceInfo) -> None:
+    def __init__(
+        self,
+        unit: UnitData,
+        metrics: EntryMetrics,
+        history: CleaningHistory,
+        state_store: UnitStateStore,
+    ) -> None:
         """Initialize the sensor."""
-        self.hass = hass
-        self._entry = entry
-        self._attr_unique_id = f"{entry.entry_id}_last_cleaned"
-        self._attr_device_info = device_info
-        self._last_value: datetime | None = None
+        self._metrics = metrics
+        self._unit_key = unit.key
+        self._due = unit.due
+        self._history = history
+        self._state_store = state_store
+        self._attr_unique_id = f"{unit.key}_last_cleaned"
+        self._attr_device_info = unit.device_info
 
     @property
     def native_value(self) -> datetime | None:
         """Return the state of the sensor."""
-        return self._last_value
+        return self._due.last_cleaned
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return extra state attributes."""
-        if self._last_value:
-            return {
-                "last_cleaned_formatted": self._last_value.strftime("%d/%m/%Y às %H:%M"),
-                "days_since_cleaned": self._calculate_days_since()
-            }
-        return {"last_cleaned_formatted": "Nunca", "days_since_cleaned": None}
+        last_value = self._due.last_cleaned
+        if not last_value:
+            return {"last_cleaned_formatted": "Nunca", "days_since_cleaned": None}
 
-    def _calculate_days_since(self) -> int | None:
-        """Calculate days since last cleaning."""
-        if not self._last_value:
-            return None
-        now = datetime.now(timezone.utc)
-        delta = now - self._last_value
-        return delta.days
+        stats = self._history.stats(self._unit_key, self._due.interval)
+        # O snapshot da unidade pode ser o de um filtro extra
+        snap = self._due.snapshot()
+        days_since = snap.days_since if snap.filter is None else (clock.utcnow() - last_value).days
+        return {
+            "last_cleaned_formatted": last_value.strftime("%d/%m/%Y às %H:%M"),
+            "days_since_cleaned": days_since,
+            "cleanings_recorded": stats.cleanings,
+            "mean_interval_days": stats.mean_interval_days,
+            "overdue_days_total": stats.overdue_days,
+        }
 
     async def async_added_to_hass(self) -> None:
         """Handle entity being added to hass with improved error handling."""
         await super().async_added_to_hass()
-        
+
+        # O valor já veio do store tipado; o estado restaurado só serve para
+        # migrar instalações que ainda não têm o arquivo
+        if not self._state_store.has_record(self._unit_key):
+            await self._async_migrate_last_state()
+
+        # Estado é reescrito pelo DueState ao limpar e na virada do dia
+        self.async_on_remove(self._due.async_add_listener(self.async_write_ha_state))
+
+    async def _async_migrate_last_state(self) -> None:
+        """Converter o último estado (texto) para o store tipado, uma única vez."""
         if (state := await self.async_get_last_state()) and state.state not in ("unknown", "unavailable"):
+            last_value: datetime | None = None
             try:
                 # Tentar diferentes formatos de data com melhor tratamento
                 state_value = state.state.strip()
                 
                 if state_value.endswith("Z"):
-                    self._last_value = datetime.fromisoformat(state_value.replace("Z", "+00:00"))
+                    last_value = datetime.fromisoformat(state_value.replace("Z", "+00:00"))
                 elif "+" in state_value or state_value.endswith("UTC"):
-                    self._last_value = datetime.fromisoformat(state_value.replace("UTC", "+00:00"))
+                    last_value = datetime.fromisoformat(state_value.replace("UTC", "+00:00"))
                 elif "T" in state_value:
-                    self._last_value = datetime.fromisoformat(state_value)
+                    last_value = datetime.fromisoformat(state_value)
                 else:
                     # Tentar formato brasileiro dd/mm/yyyy
                     try:
-                        self._last_value = datetime.strptime(state_value, "%d/%m/%Y às %H:%M")
+                        last_value = datetime.strptime(state_value, "%d/%m/%Y às %H:%M")
                     except ValueError:
-                        self._last_value = datetime.fromisoformat(state_value)
+                        last_value = datetime.fromisoformat(state_value)
                     
                 # Garantir que tenha timezone UTC
-                if self._last_value and self._last_value.tzinfo is None:
-                    self._last_value = self._last_value.replace(tzinfo=timezone.utc)
+                if last_value and last_value.tzinfo is None:
+                    last_value = last_value.replace(tzinfo=timezone.utc)
                     
             except Exception as err:
                 _LOGGER.warning(
                     "Erro ao restaurar estado do sensor %s: %s. Usando valor padrão.",
                     self.entity_id, err
                 )
-                self._last_value = None
+                last_value = None
+
+            self._due.set_last_cleaned(last_value)
+            if last_value is not None:
+                # Instalações antigas: a última limpeza inicia o histórico
+                self._history.async_seed(self._unit_key, last_value)
+
+        self._state_store.async_schedule_save()
 
     async def async_mark_cleaned_now(self) -> None:
         """Mark as cleaned now."""
-        self._last_value = datetime.now(timezone.utc)
-        self.async_write_ha_state()
+        now = clock.utcnow()
+        self._history.async_record(self._unit_key, now)
+        self._due.set_last_cleaned(now)
+        self._state_store.async_schedule_save()
 
 
-class DaysUntilDueSensor(SensorEntity):
+class DaysUntilDueSensor(StateWriteCounter, SensorEntity):
     """Sensor dos dias até vencer a limpeza."""
 
     _attr_has_entity_name = True
+    _attr_should_poll = False
     _attr_name = "Dias até vencer limpeza"
     _attr_icon = "mdi:calendar-range"
     _attr_native_unit_of_measurement = "d"
     _attr_state_class = SensorStateClass.MEASUREMENT
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, device_info: DeviceInfo) -> None:
+    def __init__(self, unit: UnitData, metrics: EntryMetrics) -> None:
         """Initialize the sensor."""
-        self.hass = hass
-        self._entry = entry
-        self._attr_unique_id = f"{entry.entry_id}_days_until_due"
-        self._attr_device_info = device_info
+        self._metrics = metrics
+        self._due = unit.due
+        self._attr_unique_id = f"{unit.key}_days_until_due"
+        self._attr_device_info = unit.device_info
+
+    async def async_added_to_hass(self) -> None:
+        """Handle entity being added to hass."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self._due.async_add_listener(self.async_write_ha_state))
 
     @property
     def native_value(self) -> int | None:
         """Return the state of the sensor."""
-        try:
-            data = self.hass.data[DOMAIN][self._entry.entry_id]["entities"]
-            last = data.get("last_cleaned")
-            interval_ent = data.get("interval_days")
-            
-            if not last or not last.native_value or not interval_ent or interval_ent.native_value is None:
-                return None
-                
-            days_since = self._days_since(last.native_value)
-            delta_days = int(interval_ent.native_value) - days_since
-            
-            return max(delta_days, 0)
-        except Exception:
-            return None
+        return self._due.snapshot().days_until
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return extra state attributes."""
-        try:
-            data = self.hass.data[DOMAIN][self._entry.entry_id]["entities"]
-            last = data.get("last_cleaned")
-            interval_ent = data.get("interval_days")
-            
-            if last and last.native_value and interval_ent and interval_ent.native_value is not None:
-                days_since = self._days_since(last.native_value)
-                interval = int(interval_ent.native_value)
-                is_overdue = days_since >= interval
-                
-                return {
-                    "days_since_cleaned": days_since,
-                    "interval_days": interval,
-                    "is_overdue": is_overdue,
-                    "overdue_days": max(0, days_since - interval) if is_overdue else 0
-                }
-        except Exception:
-            pass
-            
-        return {}
-
-    def _days_since(self, dt: datetime) -> int:
-        """Calculate days since given datetime."""
-        if not dt:
-            return 10**6  # força "vencido" quando não há histórico
-        now = datetime.now(timezone.utc)
-        return int((now - dt).total_seconds() // 86400)
\ No newline at end of file
+        snap = self._due.snapshot()
+        if snap.days_since is None:
+            return {}
+
+        attrs = {
+            "days_since_cleaned": snap.days_since,
+            "interval_days": self._due.interval,
+            "effective_interval_days": snap.interval,
+            "is_overdue": snap.is_overdue,
+            "overdue_days": snap.overdue_days,
+        }
+
+        if (air_quality := self._due.air_quality) is not None:
+            attrs["air_quality_average"] = round(air_quality, 1)
+            attrs["interval_factor"] = round(self._due.interval_factor, 2)
+
+        # Filtros extras: qual vence primeiro (None => o principal) e os dias de cada um
+        if (filters := self._due.filters) is not None:
+            now_ts = clock.utcnow().timestamp()
+            factor = self._due.interval_factor
+            attrs["filter"] = snap.filter
+            attrs["filters"] = {
+                filters.names[index]: filters.snapshot(index, now_ts, factor).days_until
+                for index in filters
+            }
+
+        return attrs
+
+
+class LeanLastCleanedSensor(LastCleanedSensor):
+    """Última limpeza sem os atributos derivados no recorder."""
+
+    _unrecorded_attributes = frozenset(
+        {
+            "last_cleaned_formatted", "days_since_cleaned", "cleanings_recorded",
+            "mean_interval_days", "overdue_days_total",
+        }
+    )
+
+
+class LeanDaysUntilDueSensor(DaysUntilDueSensor):
+    """Dias até vencer sem atributos no recorder nem estatísticas a cada 5 minutos.
+
+    O histórico de longo prazo vem da importação diária de `statistics.py`.
+    """
+
+    _attr_state_class = None
+    _unrecorded_attributes = frozenset(
+        {
+            "days_since_cleaned", "interval_days", "effective_interval_days", "is_overdue",
+            "overdue_days", "air_quality_average", "interval_factor", "filter", "filters",
+        }
+    )
+
+
+class RuntimeHoursSensor(StateWriteCounter, SensorEntity):
+    """Sensor das horas de uso do filtro desde a última limpeza."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_name = "Horas de uso do filtro"
+    _attr_icon = "mdi:timer-sand"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.HOURS
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_suggested_display_precision = 1
+
+    def __init__(self, unit: UnitData, metrics: EntryMetrics, tracker: RuntimeTracker) -> None:
+        """Initialize the sensor."""
+        self._metrics = metrics
+        self._unit_key = unit.key
+        self._due = unit.due
+        self._tracker = tracker
+        self._attr_unique_id = f"{unit.key}_runtime_hours"
+        self._attr_device_info = unit.device_info
+
+    async def async_added_to_hass(self) -> None:
+        """Handle entity being added to hass."""
+        await super().async_added_to_hass()
+        # Só é reescrito no flush do acumulador e ao marcar como limpo
+        self.async_on_remove(
+            self._tracker.async_add_listener(self._unit_key, self.async_write_ha_state)
+        )
+
+    @property
+    def native_value(self) -> float:
+        """Return the state of the sensor."""
+        return round(self._tracker.runtime_seconds(self._unit_key) / 3600, 2)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return extra state attributes."""
+        return {
+            "climate_entity": self._tracker.climate_entity(self._unit_key),
+            "limit_hours": self._due.runtime_limit / 3600,
+            "running": self._tracker.is_running(self._unit_key),
+            "runtime_due": self._due.runtime_due,
+        }
+
+
+def _ms(seconds: float | None) -> float | None:
+    """Converter segundos em milissegundos para exibição."""
+    return round(seconds * 1000, 3) if seconds is not None else None
+
+
+class IntegrationDiagnosticSensor(SensorEntity):
+    """Base dos sensores de diagnóstico, lidos a cada `SCAN_INTERVAL`."""
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _key: str
+
+    def __init__(self, entry_id: str, data: EntryData, device_info: DeviceInfo) -> None:
+        """Initialize the sensor."""
+        self._data = data
+        self._metrics = data.metrics
+        self._attr_unique_id = f"{entry_id}_{self._key}"
+        self._attr_device_info = device_info
+
+
+class DailyCheckSensor(IntegrationDiagnosticSensor):
+    """Execuções e duração do `_daily_check`."""
+
+    _key = "daily_checks"
+    _attr_name = "Verificações diárias"
+    _attr_icon = "mdi:timer-cog-outline"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    @property
+    def native_value(self) -> int:
+        """Return the state of the sensor."""
+        return self._metrics.daily_checks
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return extra state attributes."""
+        metrics = self._metrics
+        return {
+            "last_run": metrics.last_daily_check,
+            "last_duration_ms": _ms(metrics.daily_check_last),
+            "mean_duration_ms": _ms(metrics.daily_check_avg),
+            "max_duration_ms": _ms(metrics.daily_check_max),
+            "reminders": metrics.reminders,
+        }
+
+
+class StateWritesSensor(IntegrationDiagnosticSensor):
+    """Escritas de estado das entidades da entrada."""
+
+    _key = "state_writes"
+    _attr_name = "Escritas de estado"
+    _attr_icon = "mdi:database-edit-outline"
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    @property
+    def native_value(self) -> int:
+        """Return the state of the sensor."""
+        return self._metrics.state_writes
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return extra state attributes."""
+        return {"writes_per_minute": round(self._metrics.state_write_rate, 3)}
+
+
+class DueComputeSensor(IntegrationDiagnosticSensor):
+    """Tempo gasto calculando o vencimento das unidades."""
+
+    _key = "due_compute"
+    _attr_name = "Cálculo de vencimento"
+    _attr_icon = "mdi:calculator-variant-outline"
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    @property
+    def native_value(self) -> float:
+        """Return the state of the sensor."""
+        return _ms(self._data.engine.compute_seconds)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return extra state attributes."""
+        return {
+            "computations": self._data.engine.computations,
+            "units": len(self._data.units),
+            "restore_ms": _ms(self._data.restore_seconds),
+        }
+
+
+class NotificationLatencySensor(IntegrationDiagnosticSensor):
+    """Latência e falhas da fila de entrega (compartilhada pelo domínio)."""
+
+    _key = "notification_latency"
+    _attr_name = "Latência das notificações"
+    _attr_icon = "mdi:message-badge-outline"
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the state of the sensor."""
+        return _ms(async_get_delivery_queue(self.hass).stats.latency_avg)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return extra state attributes."""
+        queue = async_get_delivery_queue(self.hass)
+        stats = queue.stats
+        return {
+            "sent": stats.sent,
+            "failed": stats.failed,
+            "retries": stats.retries,
+            "timeouts": stats.timeouts,
+            "dropped": stats.dropped,
+            "pending": queue.pending,
+            "last_latency_ms": _ms(stats.latency_last),
+            "max_latency_ms": _ms(stats.latency_max),
+            "last_error": stats.last_error,
+        }
@@ -0,0 +1,267 @@
+"""Serviços do domínio AC Filter Reminder."""
+from __future__ import annotations
+
+from dataclasses import asdict
+import logging
+
+import voluptuous as vol
+
+from homeassistant.components import persistent_notification
+from homeassistant.core import (
+    HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback,
+)
+from homeassistant.exceptions import HomeAssistantError, Unauthorized, UnknownUser
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.service import async_extract_referenced_entity_ids
+from homeassistant.util import dt as dt_util
+
+from . import clock
+from .const import (
+    DOMAIN, ATTR_DAYS, ATTR_FILTER, ATTR_FORMAT, ATTR_PATH, ATTR_SECONDS, ATTR_TIMESTAMP,
+    ATTR_TOP, DATA_DIGEST, DATA_HISTORY, DATA_STATE, DEFAULT_PROFILE_SECONDS,
+    DEFAULT_PROFILE_TOP, FORMAT_CSV, FORMAT_JSONL, SERVICE_EXPORT, SERVICE_IMPORT,
+    SERVICE_MARK_CLEANED, SERVICE_PROFILE, SERVICE_SET_INTERVAL,
+)
+from .delivery import async_get_delivery_queue
+from .models import UnitData, async_loaded_entries
+from .profiler import async_start_profile
+from .transfer import async_export, async_import, resolve_path
+
+_LOGGER = logging.getLogger(__name__)
+
+MARK_CLEANED_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_TIMESTAMP): cv.datetime,
+        vol.Optional(ATTR_FILTER): cv.string,
+        **cv.ENTITY_SERVICE_FIELDS,
+    }
+)
+
+SET_INTERVAL_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_DAYS): vol.All(vol.Coerce(int), vol.Range(min=1, max=365)),
+        vol.Optional(ATTR_FILTER): cv.string,
+        **cv.ENTITY_SERVICE_FIELDS,
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_SECONDS, default=DEFAULT_PROFILE_SECONDS): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+        vol.Optional(ATTR_TOP, default=DEFAULT_PROFILE_TOP): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=200)
+        ),
+    }
+)
+
+TRANSFER_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_PATH): cv.string,
+        vol.Optional(ATTR_FORMAT): vol.In([FORMAT_CSV, FORMAT_JSONL]),
+    }
+)
+
+
+@callback
+def _async_resolve_units(hass: HomeAssistant, call: ServiceCall) -> dict[str, list[str]]:
+    """Converter o alvo (entidades, dispositivos, áreas) em {entry_id: [unit_key]}."""
+    entries = async_loaded_entries(hass)
+
+    by_entity: dict[str, tuple[str, str]] = {}
+    by_unit: dict[str, str] = {}
+    for entry_id, data in entries.items():
+        for unit_key, unit in data.units.items():
+            by_unit[unit_key] = entry_id
+            for entity in unit.entities:
+                if entity.entity_id:
+                    by_entity[entity.entity_id] = (entry_id, unit_key)
+
+    # dict como conjunto ordenado: cada unidade entra uma única vez
+    targets: dict[str, dict[str, None]] = {}
+    selected = async_extract_referenced_entity_ids(hass, call)
+    for entity_id in selected.referenced | selected.indirectly_referenced:
+        if (match := by_entity.get(entity_id)) is not None:
+            entry_id, unit_key = match
+            targets.setdefault(entry_id, {})[unit_key] = None
+
+    # Dispositivos (diretos ou das áreas do alvo): só os das unidades. O
+    # dispositivo de diagnóstico de uma frota não representa as unidades dela,
+    # para uma área não marcar a frota inteira por conter esse dispositivo
+    device_registry = dr.async_get(hass)
+    for device_id in selected.referenced_devices:
+        if (device := device_registry.async_get(device_id)) is None:
+            continue
+        for domain, identifier in device.identifiers:
+            if domain == DOMAIN and (entry_id := by_unit.get(identifier)) is not None:
+                targets.setdefault(entry_id, {})[identifier] = None
+
+    if not targets:
+        raise HomeAssistantError("Nenhuma unidade do AC Filter Reminder encontrada no alvo")
+    return {entry_id: list(unit_keys) for entry_id, unit_keys in targets.items()}
+
+
+def _filter_index(unit: UnitData, name: str) -> int | None:
+    """Posição do filtro extra `name` (nome ou id) na unidade, se ela tiver."""
+    if (filters := unit.filters) is None:
+        return None
+    try:
+        return filters.index(name)
+    except ValueError:
+        return None
+
+
+async def _async_require_admin(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Recusar a chamada de um usuário que não é administrador.
+
+    A mesma verificação do `async_register_admin_service`, que não devolve a
+    resposta do serviço; chamadas internas (sem usuário) passam.
+    """
+    if not call.context.user_id:
+        return
+    user = await hass.auth.async_get_user(call.context.user_id)
+    if user is None:
+        raise UnknownUser(context=call.context)
+    if not user.is_admin:
+        raise Unauthorized(context=call.context)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Registrar os serviços do domínio."""
+
+    @callback
+    def async_mark_cleaned(call: ServiceCall) -> None:
+        """Marcar como limpas todas as unidades do alvo, em uma única passada."""
+        now = clock.utcnow()
+        when = dt_util.as_utc(call.data[ATTR_TIMESTAMP]) if ATTR_TIMESTAMP in call.data else now
+        if when > now:
+            raise HomeAssistantError("A data da limpeza não pode estar no futuro")
+
+        targets = _async_resolve_units(hass, call)
+        entries = async_loaded_entries(hass)
+        domain_data = hass.data[DOMAIN]
+        history = domain_data[DATA_HISTORY]
+        filter_name = call.data.get(ATTR_FILTER)
+        cleaned: list[str] = []
+        names: list[str] = []
+
+        for entry_id, unit_keys in targets.items():
+            units = entries[entry_id].units
+            for unit_key in unit_keys:
+                unit = units[unit_key]
+                if filter_name is not None:
+                    # Só um filtro extra: fora do histórico, que é do filtro principal
+                    if (index := _filter_index(unit, filter_name)) is None:
+                        continue
+                    filters = unit.filters
+                    last = filters.last_cleaned(index)
+                    if last is None or when > last:
+                        filters.set_last_cleaned(index, when)
+                    cleaned.append(unit_key)
+                    names.append(f"{unit.name} ({filters.names[index]})")
+                    continue
+                due = unit.due
+                history.async_record(unit_key, when)
+                # Uma limpeza retroativa só entra no histórico se já houver uma mais nova
+                if due.last_cleaned is None or when > due.last_cleaned:
+                    due.set_last_cleaned(when)
+                cleaned.append(unit_key)
+                names.append(unit.name)
+
+        if not cleaned:
+            raise HomeAssistantError(f"Nenhuma unidade do alvo tem o filtro {filter_name}")
+        domain_data[DATA_STATE].async_schedule_save()
+
+        # Notificações em lote: sem uma chamada de serviço por unidade
+        for unit_key in cleaned:
+            persistent_notification.async_dismiss(hass, f"ac_filter_{unit_key}")
+        if (digest := domain_data.get(DATA_DIGEST)) is not None:
+            digest.async_discard_many(cleaned)
+
+        async_get_delivery_queue(hass).async_enqueue(
+            "system_log", "write",
+            {
+                "message": (
+                    f"Filtro marcado como limpo via serviço ({len(names)}): "
+                    + ", ".join(names)
+                ),
+                "level": "info",
+                "logger": f"{DOMAIN}.services",
+            },
+        )
+
+    @callback
+    def async_set_interval(call: ServiceCall) -> None:
+        """Alterar o intervalo de todas as unidades do alvo."""
+        days = call.data[ATTR_DAYS]
+        targets = _async_resolve_units(hass, call)
+        entries = async_loaded_entries(hass)
+        domain_data = hass.data[DOMAIN]
+        filter_name = call.data.get(ATTR_FILTER)
+
+        count = 0
+        for entry_id, unit_keys in targets.items():
+            units = entries[entry_id].units
+            for unit_key in unit_keys:
+                unit = units[unit_key]
+                if filter_name is not None:
+                    index = _filter_index(unit, filter_name)
+                    if index is not None and unit.filters.interval(index) != days:
+                        unit.filters.set_interval(index, days)
+                        count += 1
+                    continue
+                due = unit.due
+                if due.interval != days:
+                    due.set_interval(days)
+                    count += 1
+
+        domain_data[DATA_STATE].async_schedule_save()
+        _LOGGER.debug("Intervalo de %s unidade(s) alterado para %s dias", count, days)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_MARK_CLEANED, async_mark_cleaned, schema=MARK_CLEANED_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_INTERVAL, async_set_interval, schema=SET_INTERVAL_SCHEMA
+    )
+
+    @callback
+    def async_profile(call: ServiceCall) -> None:
+        """Medir os caminhos quentes por alguns segundos, com cProfile."""
+        async_start_profile(hass, call.data[ATTR_SECONDS], call.data[ATTR_TOP])
+
+    hass.services.async_register(DOMAIN, SERVICE_PROFILE, async_profile, schema=PROFILE_SCHEMA)
+
+    async def async_export_units(call: ServiceCall) -> ServiceResponse:
+        """Exportar as unidades e o histórico para um arquivo."""
+        await _async_require_admin(hass, call)
+        path, fmt = await hass.async_add_executor_job(
+            resolve_path, hass, call.data[ATTR_PATH], call.data.get(ATTR_FORMAT)
+        )
+        result = await async_export(hass, path, fmt)
+        _LOGGER.info("%s unidade(s) exportadas para %s", result.rows, path)
+        return asdict(result)
+
+    async def async_import_units(call: ServiceCall) -> ServiceResponse:
+        """Importar unidades e histórico de um arquivo, em lotes."""
+        await _async_require_admin(hass, call)
+        path, fmt = await hass.async_add_executor_job(
+            resolve_path, hass, call.data[ATTR_PATH], call.data.get(ATTR_FORMAT)
+        )
+        result = await async_import(hass, path, fmt)
+        _LOGGER.info(
+            "Importação de %s: %s linha(s), %s ignorada(s), %s entrada(s) criada(s), "
+            "%s atualizada(s)",
+            path, result.rows, result.skipped, result.entries_created, result.entries_updated,
+        )
+        return asdict(result)
+
+    for service, handler in (
+        (SERVICE_EXPORT, async_export_units), (SERVICE_IMPORT, async_import_units)
+    ):
+        hass.services.async_register(
+            DOMAIN, service, handler, schema=TRANSFER_SCHEMA,
+            supports_response=SupportsResponse.OPTIONAL,
+        )
@@ -0,0 +1,75 @@
+"""Estatísticas de longo prazo das unidades, importadas uma vez por dia."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+import logging
+
+from homeassistant.const import UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN
+from .due import DueSnapshot
+from .models import UnitData
+
+_LOGGER = logging.getLogger(__name__)
+
+# Séries de cada unidade: (sufixo do statistic_id, nome, valor no snapshot)
+SERIES: tuple[tuple[str, str, Callable[[DueSnapshot], int]], ...] = (
+    ("days_since_cleaned", "dias desde a limpeza", lambda snap: snap.days_since),
+    ("overdue_days", "dias de atraso", lambda snap: snap.overdue_days),
+)
+
+
+def statistic_id(unit_key: str, series: str) -> str:
+    """Retornar o statistic_id externo de uma série da unidade."""
+    # O entry_id tem maiúsculas; o statistic_id segue as regras de um entity_id
+    return f"{DOMAIN}:{slugify(f'{unit_key}_{series}')}"
+
+
+@callback
+def async_import_daily_statistics(
+    hass: HomeAssistant, units: dict[str, UnitData], now: datetime
+) -> int:
+    """Importar um ponto do dia em cada série das unidades.
+
+    No modo enxuto do recorder os atributos derivados (dias desde a limpeza,
+    dias de atraso) não são gravados a cada escrita de estado; em troca, a
+    verificação diária grava um único ponto por série, na hora cheia, pela
+    API pública do recorder (que valida o statistic_id e a origem). É um job
+    do recorder por série, uma vez por dia. Retorna quantas séries foram
+    enviadas (0 sem o recorder).
+    """
+    if "recorder" not in hass.config.components:
+        return 0
+    # O recorder é opcional: só é importado quando está carregado
+    # pylint: disable-next=import-outside-toplevel
+    from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+    start = dt_util.as_utc(now).replace(minute=0, second=0, microsecond=0)
+    imported = 0
+    for unit_key, unit in units.items():
+        snap = unit.due.snapshot(now)
+        # Nunca limpa: não há o que medir
+        if snap.days_since is None:
+            continue
+        for series, label, value_of in SERIES:
+            value = float(value_of(snap))
+            metadata = {
+                "has_mean": True,
+                "has_sum": False,
+                "name": f"{unit.name}: {label}",
+                "source": DOMAIN,
+                "statistic_id": statistic_id(unit_key, series),
+                "unit_of_measurement": UnitOfTime.DAYS,
+            }
+            async_add_external_statistics(
+                hass,
+                metadata,
+                [{"start": start, "state": value, "mean": value, "min": value, "max": value}],
+            )
+            imported += 1
+
+    _LOGGER.debug("%s série(s) de estatísticas importadas", imported)
+    return imported
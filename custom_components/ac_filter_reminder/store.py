@@ -0,0 +1,168 @@
+"""Estado autoritativo das unidades, salvo com tipos em um único Store."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN, DATA_STATE, DEFAULT_INTERVAL_DAYS,
+    STATE_SAVE_DELAY, STATE_STORAGE_KEY, STATE_STORAGE_VERSION,
+)
+from .due import DueState
+from .filters import FiltersRecord
+from .fleet import FleetUnitState
+
+# Registro por unidade: [epoch da última limpeza (int) ou None, intervalo (int),
+# segundos de uso desde a limpeza (int), média da qualidade do ar (float) ou
+# None, e só nas unidades com filtros extras {filter_id: [epoch, intervalo]}];
+# registros antigos não têm os últimos
+UnitRecord = list[int | float | FiltersRecord | None]
+
+
+class UnitStateStore:
+    """Última limpeza e intervalo de todas as unidades em um arquivo só.
+
+    O arquivo é lido uma vez; na gravação os valores vêm direto dos objetos
+    de estado vivos, então marcar como limpo só agenda um `async_delay_save`.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STATE_STORAGE_VERSION, STATE_STORAGE_KEY
+        )
+        self._records: dict[str, UnitRecord] = {}
+        self._live: dict[str, DueState | FleetUnitState] = {}
+        self._lock = asyncio.Lock()
+        self._loaded = False
+        self.load_seconds: float | None = None
+
+    async def async_load(self) -> None:
+        """Ler o arquivo uma única vez."""
+        async with self._lock:
+            if self._loaded:
+                return
+            start = time.perf_counter()
+            data = await self._store.async_load() or {}
+            self._records = data.get("units", {})
+            self._loaded = True
+            self.load_seconds = time.perf_counter() - start
+
+    def has_record(self, unit_key: str) -> bool:
+        """Return True if the unit was found in the stored file."""
+        return unit_key in self._records
+
+    @callback
+    def async_attach(self, unit_key: str, due: DueState | FleetUnitState) -> bool:
+        """Aplicar o registro salvo à unidade e acompanhá-la.
+
+        Retorna False quando não há registro (a entidade cai na migração a
+        partir do estado restaurado).
+        """
+        self._live[unit_key] = due
+        if (record := self._records.get(unit_key)) is None:
+            return False
+        last_ts, interval, *rest = record
+        due.set_interval(interval)
+        due.set_last_cleaned(
+            dt_util.utc_from_timestamp(last_ts) if last_ts is not None else None
+        )
+        if rest and rest[0]:
+            due.set_runtime(rest[0])
+        # O fator volta quando o sensor vinculado começa a ser acompanhado
+        if len(rest) > 1 and rest[1] is not None:
+            due.set_air_quality(rest[1], 1.0)
+        if due.filters is not None:
+            due.filters.restore(rest[2] if len(rest) > 2 else None, due.last_cleaned)
+        return True
+
+    @callback
+    def async_import(
+        self, unit_key: str, last_cleaned: datetime | None, interval: int | None
+    ) -> None:
+        """Aplicar a última limpeza e o intervalo importados (None => manter).
+
+        Numa unidade carregada vai pelos setters, que avisam as entidades; sem
+        ela, vai para o registro que o próximo setup aplica. Uma limpeza mais
+        antiga que a atual é ignorada, então importar de novo não muda nada.
+        Não agenda a gravação: quem importa em lote chama `async_schedule_save`.
+        """
+        if (due := self._live.get(unit_key)) is not None:
+            if interval is not None and interval != due.interval:
+                due.set_interval(interval)
+            if last_cleaned is not None and (
+                due.last_cleaned is None or last_cleaned > due.last_cleaned
+            ):
+                due.set_last_cleaned(last_cleaned)
+            return
+
+        if last_cleaned is None and interval is None:
+            return
+        record = self._records.setdefault(unit_key, [None, DEFAULT_INTERVAL_DAYS])
+        if interval is not None:
+            record[1] = interval
+        if last_cleaned is not None:
+            last_ts = int(last_cleaned.timestamp())
+            if record[0] is None or last_ts > record[0]:
+                record[0] = last_ts
+                # Limpeza nova zera as horas de uso, como em `set_last_cleaned`
+                if len(record) > 2:
+                    record[2] = 0
+
+    @callback
+    def async_detach(self, unit_key: str) -> None:
+        """Parar de acompanhar a unidade, guardando os últimos valores."""
+        if (due := self._live.pop(unit_key, None)) is not None:
+            self._records[unit_key] = self._record(due)
+
+    @callback
+    def async_remove_entry(self, entry_id: str) -> None:
+        """Apagar os registros das unidades de uma entrada removida."""
+        removed = [key for key in self._records if key.startswith(entry_id)]
+        for unit_key in removed:
+            del self._records[unit_key]
+        if removed:
+            self.async_schedule_save()
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Agendar a gravação em lote."""
+        self._store.async_delay_save(self._data_to_save, STATE_SAVE_DELAY)
+
+    @staticmethod
+    def _record(due: DueState | FleetUnitState) -> UnitRecord:
+        """Converter o estado de uma unidade no registro tipado."""
+        last = due.last_cleaned
+        air_quality = due.air_quality
+        record: UnitRecord = [
+            int(last.timestamp()) if last else None,
+            int(due.interval),
+            int(due.runtime_seconds),
+            round(air_quality, 2) if air_quality is not None else None,
+        ]
+        if due.filters is not None:
+            record.append(due.filters.record())
+        return record
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Serializar os registros, com os valores atuais das unidades vivas."""
+        units = dict(self._records)
+        for unit_key, due in self._live.items():
+            units[unit_key] = self._record(due)
+        return {"units": units}
+
+
+async def async_get_state_store(hass: HomeAssistant) -> UnitStateStore:
+    """Obter (ou criar e carregar) o store de estado do domínio."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (store := domain_data.get(DATA_STATE)) is None:
+        store = domain_data[DATA_STATE] = UnitStateStore(hass)
+    await store.async_load()
+    return store
@@ -0,0 +1,503 @@
+"""Importação e exportação em lote das unidades e do histórico (CSV ou JSON Lines).
+
+Uma linha por unidade, com a entrada (nome da entrada; a unidade vazia numa
+entrada comum ou o id da unidade numa frota), o horário e o destino dos
+lembretes, os vínculos, os filtros extras, o intervalo e as limpezas. O
+arquivo é lido e gravado no executor em lotes de `TRANSFER_BATCH_ROWS`
+linhas, então a memória não cresce com o tamanho do arquivo. Cada lote vira
+no máximo uma criação ou uma atualização por entrada e uma gravação do store
+e do histórico.
+
+A importação é idempotente: a entrada é achada pelo mesmo unique_id do
+config flow e a unidade pelo id; limpezas já registradas não se repetem e
+uma última limpeza mais antiga que a atual é ignorada.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator
+import csv
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+import json
+import logging
+import os
+from typing import Any, NamedTuple, TextIO
+
+from homeassistant import config_entries
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util, slugify
+
+from . import clock
+from .const import (
+    DOMAIN, CONF_NAME, CONF_REMINDER_HOUR, CONF_REMINDER_MINUTE, CONF_NOTIFY_SERVICE,
+    CONF_ENTRY_TYPE, CONF_UNITS, CONF_DIGEST, CONF_CLIMATE_ENTITY, CONF_AIR_QUALITY_ENTITY,
+    CONF_FILTERS, ENTRY_TYPE_FLEET, DEFAULT_HOUR, DEFAULT_MINUTE, FORMAT_CSV, FORMAT_JSONL,
+    TRANSFER_BATCH_ROWS, TRANSFER_DIR, TRANSFER_EXTENSIONS,
+)
+from .filters import format_filter, parse_filter
+from .history import async_get_history
+from .models import EntryData, UnitData, async_loaded_entries
+from .store import async_get_state_store
+
+_LOGGER = logging.getLogger(__name__)
+
+# Colunas, na ordem do CSV
+FIELDS = (
+    "entry", "unit", "name", "reminder_hour", "reminder_minute", "notify_service",
+    "climate_entity", "air_quality_entity", "filters", "interval_days", "last_cleaned",
+    "cleanings",
+)
+# Colunas com listas: no CSV, itens separados por " | "
+_LIST_FIELDS = ("filters", "cleanings")
+_LIST_SEPARATOR = " | "
+# Datas de planilha aceitas além de ISO 8601 e epoch
+_DATE_FORMATS = ("%d/%m/%Y %H:%M", "%d/%m/%Y")
+
+
+@dataclass
+class TransferResult:
+    """Contagens de uma importação ou exportação."""
+
+    rows: int = 0
+    skipped: int = 0
+    entries_created: int = 0
+    entries_updated: int = 0
+
+
+class ImportRow(NamedTuple):
+    """Uma linha validada; None => coluna ausente, manter o valor atual."""
+
+    entry: str
+    unit: str
+    name: str
+    reminder_hour: int | None
+    reminder_minute: int | None
+    notify_service: str | None
+    climate_entity: str | None
+    air_quality_entity: str | None
+    filters: list[dict[str, str | int]] | None
+    interval: int | None
+    last_cleaned: datetime | None
+    cleanings: list[int]
+
+    @property
+    def unique_id(self) -> str:
+        """Return the config entry unique id, as the config flow sets it."""
+        return f"fleet_{self.entry}" if self.unit else self.entry
+
+
+def resolve_path(hass: HomeAssistant, path: str, fmt: str | None) -> tuple[str, str]:
+    """Resolver o caminho (relativo a `<config>/ac_filter_reminder/`) e o formato.
+
+    Só aceita arquivos `.csv`, `.jsonl` ou `.ndjson` dentro dessa pasta, com
+    os links simbólicos já resolvidos: os serviços nunca leem nem gravam a
+    configuração do Home Assistant. Sem formato, `.csv` é CSV e o resto é
+    JSON Lines. Faz I/O (resolve links): chamar no executor.
+    """
+    base = os.path.realpath(hass.config.path(TRANSFER_DIR))
+    resolved = os.path.realpath(os.path.join(base, path))
+    if resolved == base or os.path.commonpath([resolved, base]) != base:
+        raise HomeAssistantError(f"O arquivo precisa estar em {base}: {path}")
+    extension = os.path.splitext(resolved)[1].lower()
+    if extension not in TRANSFER_EXTENSIONS:
+        raise HomeAssistantError(
+            f"Extensão não suportada ({', '.join(TRANSFER_EXTENSIONS)}): {path}"
+        )
+    if fmt is None:
+        fmt = FORMAT_CSV if extension == ".csv" else FORMAT_JSONL
+    return resolved, fmt
+
+
+def _is_export(path: str) -> bool:
+    """Verificar se o arquivo existente é uma exportação (CSV ou JSON Lines) nossa.
+
+    Vale o cabeçalho do CSV ou as chaves da primeira linha JSON; um arquivo
+    vazio (exportação JSON Lines sem unidades) também conta.
+    """
+    try:
+        with open(path, encoding="utf-8-sig", newline="") as file:
+            first = file.readline()
+    except UnicodeDecodeError:
+        return False
+    if not first.strip():
+        return True
+    if next(csv.reader([first]), None) == list(FIELDS):
+        return True
+    try:
+        raw = json.loads(first)
+    except ValueError:
+        return False
+    return isinstance(raw, dict) and raw.keys() == set(FIELDS)
+
+
+class _RowReader:
+    """Leitor de linhas para o executor: cada `read` lê só um lote."""
+
+    def __init__(self, path: str, fmt: str) -> None:
+        """Open the file."""
+        self._file: TextIO = open(path, encoding="utf-8-sig", newline="")  # noqa: SIM115
+        self._rows: Iterator[tuple[int, dict[str, Any] | None]] = (
+            self._csv_rows() if fmt == FORMAT_CSV else self._json_rows()
+        )
+
+    def _csv_rows(self) -> Iterator[tuple[int, dict[str, Any] | None]]:
+        reader = csv.DictReader(self._file)
+        for raw in reader:
+            yield reader.line_num, {
+                key: value for key, value in raw.items() if key is not None and value is not None
+            }
+
+    def _json_rows(self) -> Iterator[tuple[int, dict[str, Any] | None]]:
+        for line_num, line in enumerate(self._file, start=1):
+            if not line.strip():
+                continue
+            try:
+                raw = json.loads(line)
+            except ValueError:
+                raw = None
+            yield line_num, raw if isinstance(raw, dict) else None
+
+    def read(self, count: int) -> list[tuple[int, dict[str, Any] | None]]:
+        """Ler até `count` linhas."""
+        return list(islice(self._rows, count))
+
+    def close(self) -> None:
+        """Close the file."""
+        self._file.close()
+
+
+class _RowWriter:
+    """Gravador de linhas para o executor, num arquivo temporário trocado no fim."""
+
+    def __init__(self, path: str, fmt: str) -> None:
+        """Open the temporary file."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Sobrescrever só uma exportação anterior, nunca outro arquivo
+        if os.path.exists(path) and not _is_export(path):
+            raise HomeAssistantError(
+                f"{path} já existe e não é uma exportação do AC Filter Reminder"
+            )
+        self._path = path
+        self._tmp_path = f"{path}.tmp"
+        self._file: TextIO = open(self._tmp_path, "w", encoding="utf-8", newline="")  # noqa: SIM115
+        self._csv: csv.DictWriter | None = None
+        if fmt == FORMAT_CSV:
+            self._csv = csv.DictWriter(self._file, fieldnames=FIELDS)
+            self._csv.writeheader()
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        """Gravar um lote de linhas."""
+        if self._csv is not None:
+            self._csv.writerows(
+                {
+                    **row,
+                    **{key: _LIST_SEPARATOR.join(row[key]) for key in _LIST_FIELDS},
+                }
+                for row in rows
+            )
+        else:
+            self._file.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+
+    def close(self, commit: bool) -> None:
+        """Fechar e, se tudo foi gravado, trocar o arquivo de destino."""
+        self._file.close()
+        if commit:
+            os.replace(self._tmp_path, self._path)
+        else:
+            os.unlink(self._tmp_path)
+
+
+def _export_row(
+    entry: ConfigEntry, data: EntryData, unit_key: str, unit: UnitData, stamps: list[int]
+) -> dict[str, Any]:
+    """Montar a linha exportada de uma unidade."""
+    last = unit.due.last_cleaned
+    filters = unit.filters
+    return {
+        "entry": entry.data.get(CONF_NAME) or entry.title,
+        "unit": unit_key[len(entry.entry_id) + 1:] if unit_key != entry.entry_id else "",
+        "name": unit.name,
+        "reminder_hour": data.hour,
+        "reminder_minute": data.minute,
+        "notify_service": data.notify_service or "",
+        "climate_entity": unit.climate or "",
+        "air_quality_entity": unit.air_quality or "",
+        # Intervalos atuais dos filtros extras, não os da configuração
+        "filters": [
+            format_filter({"name": filters.names[index], "interval": filters.interval(index)})
+            for index in filters
+        ] if filters is not None else [],
+        "interval_days": unit.due.interval,
+        "last_cleaned": last.isoformat() if last else "",
+        "cleanings": [dt_util.utc_from_timestamp(stamp).isoformat() for stamp in stamps],
+    }
+
+
+async def async_export(hass: HomeAssistant, path: str, fmt: str) -> TransferResult:
+    """Exportar todas as unidades carregadas, em lotes."""
+    history = await async_get_history(hass)
+    result = TransferResult()
+    writer = await hass.async_add_executor_job(_RowWriter, path, fmt)
+    committed = False
+    try:
+        batch: list[dict[str, Any]] = []
+        for entry_id, data in async_loaded_entries(hass).items():
+            if (entry := hass.config_entries.async_get_entry(entry_id)) is None:
+                continue
+            for unit_key, unit in data.units.items():
+                batch.append(_export_row(entry, data, unit_key, unit, history.timestamps(unit_key)))
+                if len(batch) >= TRANSFER_BATCH_ROWS:
+                    result.rows += len(batch)
+                    await hass.async_add_executor_job(writer.write, batch)
+                    batch = []
+        if batch:
+            result.rows += len(batch)
+            await hass.async_add_executor_job(writer.write, batch)
+        committed = True
+    finally:
+        await hass.async_add_executor_job(writer.close, committed)
+    return result
+
+
+def _text(raw: dict[str, Any], key: str) -> str | None:
+    """Texto da coluna, ou None se ela não existir."""
+    if (value := raw.get(key)) is None:
+        return None
+    return str(value).strip()
+
+
+def _int(raw: dict[str, Any], key: str, low: int, high: int) -> int | None:
+    """Inteiro da coluna dentro de [low, high]; vazio => None."""
+    if not (value := _text(raw, key)):
+        return None
+    number = int(float(value))
+    if not low <= number <= high:
+        raise ValueError(f"{key} fora de [{low}, {high}]: {number}")
+    return number
+
+
+def _list(raw: dict[str, Any], key: str) -> list[str] | None:
+    """Lista da coluna (lista no JSON, itens separados por `|` no CSV)."""
+    if (value := raw.get(key)) is None:
+        return None
+    items = value if isinstance(value, list) else str(value).split("|")
+    return [text for item in items if (text := str(item).strip())]
+
+
+def _datetime(value: str) -> datetime:
+    """Converter ISO 8601, epoch ou `dd/mm/aaaa [hh:mm]` (hora local sem fuso)."""
+    try:
+        return dt_util.utc_from_timestamp(float(value))
+    except ValueError:
+        pass
+    if (parsed := dt_util.parse_datetime(value)) is None:
+        for date_format in _DATE_FORMATS:
+            try:
+                parsed = datetime.strptime(value, date_format)
+                break
+            except ValueError:
+                continue
+        else:
+            raise ValueError(f"data inválida: {value}")
+    return dt_util.as_utc(parsed)
+
+
+def parse_row(raw: dict[str, Any]) -> ImportRow:
+    """Validar uma linha lida (ValueError se for inválida)."""
+    entry = _text(raw, "entry") or _text(raw, "name")
+    if not entry:
+        raise ValueError("sem entry nem name")
+    unit = slugify(_text(raw, "unit") or "")
+    if _text(raw, "unit") and not unit:
+        raise ValueError(f"unit inválida: {raw['unit']}")
+
+    filters = None
+    if (items := _list(raw, "filters")) is not None:
+        filters = []
+        for item in items:
+            if (parsed := parse_filter(item)) is not None and all(
+                parsed["id"] != other["id"] for other in filters
+            ):
+                filters.append(parsed)
+
+    now = clock.utcnow()
+    last_cleaned = _datetime(text) if (text := _text(raw, "last_cleaned")) else None
+    cleanings = sorted({int(_datetime(item).timestamp()) for item in _list(raw, "cleanings") or ()})
+    if (last_cleaned is not None and last_cleaned > now) or (
+        cleanings and cleanings[-1] > now.timestamp()
+    ):
+        raise ValueError("limpeza no futuro")
+
+    return ImportRow(
+        entry=entry,
+        unit=unit,
+        name=_text(raw, "name") or (_text(raw, "unit") if unit else entry),
+        reminder_hour=_int(raw, "reminder_hour", 0, 23),
+        reminder_minute=_int(raw, "reminder_minute", 0, 59),
+        notify_service=_text(raw, "notify_service"),
+        climate_entity=_text(raw, "climate_entity"),
+        air_quality_entity=_text(raw, "air_quality_entity"),
+        filters=filters,
+        interval=_int(raw, "interval_days", 1, 365),
+        last_cleaned=last_cleaned,
+        cleanings=cleanings,
+    )
+
+
+def _entry_options(group: list[ImportRow]) -> dict[str, Any]:
+    """Opções da entrada que as linhas definem (a última linha com valor vence)."""
+    options: dict[str, Any] = {}
+    for row in group:
+        for key, value in (
+            (CONF_REMINDER_HOUR, row.reminder_hour),
+            (CONF_REMINDER_MINUTE, row.reminder_minute),
+            (CONF_NOTIFY_SERVICE, row.notify_service),
+        ):
+            if value is not None:
+                options[key] = value
+        if not row.unit:
+            # Entrada comum: os vínculos e os filtros são opções da entrada
+            for key, value in (
+                (CONF_CLIMATE_ENTITY, row.climate_entity),
+                (CONF_AIR_QUALITY_ENTITY, row.air_quality_entity),
+                (CONF_FILTERS, row.filters),
+            ):
+                if value is not None:
+                    options[key] = value
+    return options
+
+
+def _merge_units(current: list[dict[str, Any]], group: list[ImportRow]) -> list[dict[str, Any]]:
+    """Aplicar as linhas de uma frota à lista de unidades (novas vão para o fim)."""
+    units = {unit["id"]: dict(unit) for unit in current}
+    for row in group:
+        unit = units.setdefault(row.unit, {"id": row.unit, "name": row.name})
+        unit["name"] = row.name
+        for key, value in (
+            (CONF_CLIMATE_ENTITY, row.climate_entity),
+            (CONF_AIR_QUALITY_ENTITY, row.air_quality_entity),
+            (CONF_FILTERS, row.filters),
+        ):
+            if value:
+                unit[key] = value
+            elif value is not None:
+                # Coluna vazia => desvincular
+                unit.pop(key, None)
+    return list(units.values())
+
+
+async def _async_create_entry(hass: HomeAssistant, group: list[ImportRow]) -> ConfigEntry | None:
+    """Criar a entrada das linhas pelo config flow (fonte `import`)."""
+    first = group[0]
+    data: dict[str, Any] = {
+        CONF_NAME: first.entry,
+        CONF_REMINDER_HOUR: DEFAULT_HOUR,
+        CONF_REMINDER_MINUTE: DEFAULT_MINUTE,
+        CONF_NOTIFY_SERVICE: "",
+        CONF_DIGEST: bool(first.unit),
+        **_entry_options(group),
+    }
+    if first.unit:
+        data[CONF_ENTRY_TYPE] = ENTRY_TYPE_FLEET
+        data[CONF_UNITS] = _merge_units([], group)
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_IMPORT}, data=data
+    )
+    if result["type"] == FlowResultType.CREATE_ENTRY:
+        return result["result"]
+    # Criada por outra chamada enquanto esta esperava
+    return next(
+        (
+            entry for entry in hass.config_entries.async_entries(DOMAIN)
+            if entry.unique_id == first.unique_id
+        ),
+        None,
+    )
+
+
+def _async_update_entry(hass: HomeAssistant, entry: ConfigEntry, group: list[ImportRow]) -> bool:
+    """Atualizar as opções da entrada, se as linhas mudarem alguma coisa."""
+    current = {**entry.data, **entry.options}
+    options = _entry_options(group)
+    if group[0].unit:
+        options[CONF_UNITS] = _merge_units(current.get(CONF_UNITS, []), group)
+    # Vínculo ausente e vínculo vazio ("") são a mesma coisa
+    changed = {
+        key: value for key, value in options.items()
+        if current.get(key) != value and (value or current.get(key))
+    }
+    if not changed:
+        return False
+    # O listener de opções aplica no lugar ou recarrega, como no formulário
+    hass.config_entries.async_update_entry(entry, options={**entry.options, **changed})
+    return True
+
+
+async def _async_import_batch(
+    hass: HomeAssistant, rows: list[ImportRow], result: TransferResult
+) -> None:
+    """Importar um lote: entradas primeiro, depois o estado e o histórico."""
+    entries = {entry.unique_id: entry for entry in hass.config_entries.async_entries(DOMAIN)}
+    groups: dict[str, list[ImportRow]] = {}
+    for row in rows:
+        groups.setdefault(row.unique_id, []).append(row)
+
+    targets: list[tuple[str, ImportRow]] = []
+    for unique_id, group in groups.items():
+        if (entry := entries.get(unique_id)) is None:
+            if (entry := await _async_create_entry(hass, group)) is None:
+                result.skipped += len(group)
+                continue
+            result.entries_created += 1
+        elif _async_update_entry(hass, entry, group):
+            result.entries_updated += 1
+        targets.extend(
+            (f"{entry.entry_id}_{row.unit}" if row.unit else entry.entry_id, row) for row in group
+        )
+
+    # Unidades carregadas mudam pelos setters; as que vão ser criadas (ou
+    # recarregadas) pegam o registro no setup
+    state_store = await async_get_state_store(hass)
+    history = await async_get_history(hass)
+    for unit_key, row in targets:
+        state_store.async_import(unit_key, row.last_cleaned, row.interval)
+        history.async_merge(unit_key, row.cleanings)
+    state_store.async_schedule_save()
+    history.async_schedule_save()
+
+
+async def async_import(hass: HomeAssistant, path: str, fmt: str) -> TransferResult:
+    """Importar o arquivo lote a lote."""
+    result = TransferResult()
+    try:
+        reader = await hass.async_add_executor_job(_RowReader, path, fmt)
+    except OSError as err:
+        raise HomeAssistantError(f"Não foi possível abrir {path}: {err}") from err
+    try:
+        while True:
+            try:
+                lines = await hass.async_add_executor_job(reader.read, TRANSFER_BATCH_ROWS)
+            except (csv.Error, UnicodeDecodeError) as err:
+                raise HomeAssistantError(f"Erro ao ler {path}: {err}") from err
+            if not lines:
+                break
+            rows: list[ImportRow] = []
+            for line_num, raw in lines:
+                try:
+                    if raw is None:
+                        raise ValueError("linha não é um objeto JSON")
+                    rows.append(parse_row(raw))
+                except ValueError as err:
+                    _LOGGER.warning("%s, linha %s ignorada: %s", path, line_num, err)
+                    result.skipped += 1
+            result.rows += len(lines)
+            if rows:
+                await _async_import_batch(hass, rows, result)
+    finally:
+        await hass.async_add_executor_job(reader.close)
+    return result
@@ -0,0 +1,115 @@
+"""API websocket do AC Filter Reminder para painéis com muitas unidades."""
+from __future__ import annotations
+
+from asyncio import Handle
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+from .due import DueState
+from .due_index import async_get_due_index
+from .fleet import FleetUnitState
+
+
+def unit_payload(name: str, due: DueState | FleetUnitState) -> dict[str, Any]:
+    """Resumo compacto de uma unidade: só o que um painel precisa."""
+    snap = due.snapshot()
+    last = due.last_cleaned
+    return {
+        "name": name,
+        "last_cleaned": int(last.timestamp()) if last else None,
+        "interval": snap.interval,
+        "days_until": snap.days_until,
+        "due": snap.is_overdue,
+        # Filtro extra que vence primeiro (None => o principal)
+        "filter": snap.filter,
+    }
+
+
+@callback
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    """Registrar os comandos websocket do domínio."""
+    websocket_api.async_register_command(hass, websocket_subscribe)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/subscribe",
+        vol.Optional("entry_id"): str,
+    }
+)
+@callback
+def websocket_subscribe(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Enviar um snapshot de todas as unidades e, depois, só o que mudar.
+
+    O primeiro evento traz `units` ({unit_key: resumo}); os seguintes trazem
+    `changed` (mesmo formato) e/ou `removed` (lista de unit_key). Mudanças
+    do mesmo ciclo do loop, como a virada do dia de uma frota, vão juntas em
+    um único evento, e uma unidade só entra nele se o resumo dela mudou desde
+    o último enviado nesta assinatura.
+    """
+    index = async_get_due_index(hass)
+    # unit_key começa com o entry_id (também no modo frota)
+    prefix = msg.get("entry_id", "")
+    pending: set[str] = set()
+    # Último resumo enviado de cada unidade
+    sent: dict[str, dict[str, Any]] = {}
+    flush_handle: Handle | None = None
+
+    @callback
+    def _async_flush() -> None:
+        nonlocal flush_handle
+        flush_handle = None
+        changed: dict[str, dict[str, Any]] = {}
+        removed: list[str] = []
+        for unit_key in pending:
+            if unit_key in index:
+                payload = unit_payload(*index.unit(unit_key))
+                if sent.get(unit_key) != payload:
+                    changed[unit_key] = sent[unit_key] = payload
+            elif sent.pop(unit_key, None) is not None:
+                removed.append(unit_key)
+        pending.clear()
+
+        event: dict[str, Any] = {}
+        if changed:
+            event["changed"] = changed
+        if removed:
+            event["removed"] = removed
+        if not event:
+            return
+        connection.send_message(websocket_api.event_message(msg["id"], event))
+
+    @callback
+    def _async_unit_changed(unit_key: str) -> None:
+        nonlocal flush_handle
+        if not unit_key.startswith(prefix):
+            return
+        pending.add(unit_key)
+        if flush_handle is None:
+            flush_handle = hass.loop.call_soon(_async_flush)
+
+    remove_listener = index.async_add_unit_listener(_async_unit_changed)
+
+    @callback
+    def _async_unsubscribe() -> None:
+        remove_listener()
+        if flush_handle is not None:
+            flush_handle.cancel()
+
+    connection.subscriptions[msg["id"]] = _async_unsubscribe
+    connection.send_result(msg["id"])
+    sent.update(
+        (unit_key, unit_payload(name, due))
+        for unit_key, (name, due) in index.items()
+        if unit_key.startswith(prefix)
+    )
+    connection.send_message(websocket_api.event_message(msg["id"], {"units": dict(sent)}))
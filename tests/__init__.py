@@ -0,0 +1 @@
+"""Testes do AC Filter Reminder."""
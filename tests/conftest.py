@@ -0,0 +1,10 @@
+"""Fixtures compartilhadas dos testes."""
+import pytest
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Carregar a integração de custom_components nos testes."""
+    yield
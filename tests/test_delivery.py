@@ -0,0 +1,98 @@
+"""Testes da fila de entrega das chamadas de serviço."""
+import asyncio
+import logging
+
+import pytest
+from pytest_homeassistant_custom_component.common import async_mock_service
+
+from homeassistant.core import HomeAssistant, ServiceCall
+
+from custom_components.ac_filter_reminder.delivery import DeliveryQueue
+
+
+async def _drain(queue: DeliveryQueue) -> None:
+    """Esperar os workers (tarefas de fundo) esvaziarem a fila."""
+    async with asyncio.timeout(5):
+        while queue._workers:
+            await asyncio.sleep(0)
+
+
+def _reminder(queue: DeliveryQueue, number: int) -> None:
+    queue.async_enqueue("notify", "phone", {"title": "Lembrete", "message": str(number)})
+
+
+def _log(queue: DeliveryQueue, number: int) -> None:
+    queue.async_enqueue("system_log", "write", {"message": str(number)})
+
+
+async def test_delivers_in_order(hass: HomeAssistant) -> None:
+    """As chamadas saem na ordem de chegada e contam latência."""
+    calls = async_mock_service(hass, "notify", "phone")
+    queue = DeliveryQueue(hass, concurrency=1)
+    for number in range(3):
+        _reminder(queue, number)
+    await _drain(queue)
+    assert [call.data["message"] for call in calls] == ["0", "1", "2"]
+    assert queue.stats.sent == 3
+    assert queue.stats.latency_avg is not None
+
+
+async def test_full_queue_sheds_low_priority_calls_first(
+    hass: HomeAssistant, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Cheia, a fila descarta log/remoção e nunca um lembrete."""
+    gate = asyncio.Event()
+
+    async def slow(call: ServiceCall) -> None:
+        await gate.wait()
+
+    hass.services.async_register("notify", "phone", slow)
+    logs = async_mock_service(hass, "system_log", "write")
+    queue = DeliveryQueue(hass, concurrency=1, max_pending=4)
+
+    # O primeiro lembrete ocupa o único worker; os seguintes ficam na fila
+    _reminder(queue, 0)
+    await asyncio.sleep(0)
+    _log(queue, 1)
+    _log(queue, 2)
+    _reminder(queue, 3)
+    _reminder(queue, 4)
+    assert queue.pending == 4
+
+    # Novos lembretes tiram os logs mais antigos
+    with caplog.at_level(logging.WARNING):
+        _reminder(queue, 5)
+        _reminder(queue, 6)
+    assert queue.pending == 4
+    assert queue.stats.dropped == 2
+    # Um único aviso no minuto, com a contagem
+    assert len([r for r in caplog.records if "descartadas" in r.getMessage()]) == 1
+
+    # Sem nada de baixa prioridade na fila: log novo é descartado, lembrete passa do limite
+    _log(queue, 7)
+    _reminder(queue, 8)
+    assert queue.pending == 5
+    assert queue.stats.dropped == 3
+
+    gate.set()
+    await _drain(queue)
+    assert queue.stats.sent == 6
+    assert logs == []
+
+
+async def test_retries_then_counts_failure(hass: HomeAssistant) -> None:
+    """Uma chamada que sempre falha é repetida e depois contada como falha."""
+    attempts: list[ServiceCall] = []
+
+    async def broken(call: ServiceCall) -> None:
+        attempts.append(call)
+        raise RuntimeError("fora do ar")
+
+    hass.services.async_register("notify", "phone", broken)
+    queue = DeliveryQueue(hass, retries=2, backoff=0)
+    _reminder(queue, 0)
+    await _drain(queue)
+    assert len(attempts) == 3
+    assert queue.stats.retries == 2
+    assert queue.stats.failed == 1
+    assert queue.stats.last_error == "notify.phone: fora do ar"
@@ -0,0 +1,112 @@
+"""Testes do cálculo de vencimento e da virada do dia."""
+from datetime import datetime, timedelta, timezone
+import math
+
+from custom_components.ac_filter_reminder.due import (
+    SECONDS_PER_DAY,
+    DueState,
+    compute_due,
+    most_urgent,
+    scale_interval,
+)
+
+LAST = datetime(2024, 3, 1, 15, 30, tzinfo=timezone.utc)
+
+
+def test_never_cleaned_is_due_forever() -> None:
+    """Sem limpeza registrada: vencida, sem instante de expiração."""
+    snap = compute_due(None, 60, LAST.timestamp())
+    assert snap.is_overdue
+    assert snap.days_since is None
+    assert snap.valid_until == math.inf
+
+
+def test_days_count_full_periods_and_valid_until() -> None:
+    """Os dias contam períodos de 24h; o snapshot vale até o próximo aniversário."""
+    now = LAST + timedelta(days=2, hours=23, minutes=59)
+    snap = compute_due(LAST, 3, now.timestamp())
+    assert (snap.days_since, snap.days_until, snap.is_overdue) == (2, 1, False)
+    assert snap.valid_until == (LAST + timedelta(days=3)).timestamp()
+
+    snap = compute_due(LAST, 3, snap.valid_until)
+    assert (snap.days_since, snap.days_until, snap.is_overdue, snap.overdue_days) == (3, 0, True, 0)
+
+    snap = compute_due(LAST, 3, (LAST + timedelta(days=5)).timestamp())
+    assert snap.overdue_days == 2
+
+
+def test_runtime_due_overrides_days() -> None:
+    """Horas de uso acima do limite vencem a unidade antes dos dias."""
+    snap = compute_due(LAST, 60, (LAST + timedelta(days=1)).timestamp(), runtime_due=True)
+    assert snap.is_overdue
+    assert snap.days_until == 59
+
+
+def test_scale_interval() -> None:
+    """O fator da qualidade do ar arredonda e nunca passa de 1 dia para baixo."""
+    assert scale_interval(60, 1.0) == 60
+    assert scale_interval(60, 0.5) == 30
+    assert scale_interval(1, 0.5) == 1
+
+
+def test_most_urgent_prefers_overdue_and_earliest_expiry() -> None:
+    """Vencido ganha de em dia; o resultado vale até o primeiro valid_until."""
+    now_ts = (LAST + timedelta(days=10, hours=1)).timestamp()
+    in_time = compute_due(LAST + timedelta(hours=12), 30, now_ts)
+    overdue = compute_due(LAST, 7, now_ts)._replace(filter="Pré-filtro")
+    merged = most_urgent([in_time, overdue])
+    assert merged.filter == "Pré-filtro"
+    assert merged.valid_until == min(in_time.valid_until, overdue.valid_until)
+
+
+def test_snapshot_is_memoized_until_rollover() -> None:
+    """O snapshot só é recalculado quando passa do `valid_until`."""
+    due = DueState(interval=2)
+    due.set_last_cleaned(LAST)
+    now = LAST + timedelta(hours=1)
+    first = due.snapshot(now)
+    assert due.snapshot(now + timedelta(hours=22)) is first
+    assert due.computations == 1
+
+    rollover = datetime.fromtimestamp(first.valid_until, timezone.utc)
+    assert due.next_change(now) == first.valid_until
+    after = due.snapshot(rollover)
+    assert after is not first
+    assert after.days_since == 1
+    assert due.computations == 2
+
+    # Na virada seguinte a unidade vence
+    due_snap = due.snapshot(rollover + timedelta(days=1))
+    assert due_snap.is_overdue
+    assert due_snap.valid_until == after.valid_until + SECONDS_PER_DAY
+
+
+def test_changes_invalidate_and_notify() -> None:
+    """Limpeza e intervalo invalidam o snapshot e avisam os listeners."""
+    due = DueState(interval=10)
+    calls: list[None] = []
+    remove = due.async_add_listener(lambda: calls.append(None))
+    due.set_last_cleaned(LAST)
+    now = LAST + timedelta(days=5)
+    assert due.snapshot(now).days_until == 5
+
+    due.set_interval(7)
+    assert due.snapshot(now).days_until == 2
+    due.async_refresh(now)
+    assert len(calls) == 3
+
+    remove()
+    due.set_interval(8)
+    assert len(calls) == 3
+
+
+def test_air_quality_only_notifies_when_effective_interval_changes() -> None:
+    """Um fator que não muda o intervalo efetivo não reescreve as entidades."""
+    due = DueState(interval=60)
+    calls: list[None] = []
+    due.async_add_listener(lambda: calls.append(None))
+    due.set_air_quality(12.0, 1.004)
+    assert calls == []
+    due.set_air_quality(30.0, 0.5)
+    assert len(calls) == 1
+    assert due.effective_interval == 30
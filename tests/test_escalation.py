@@ -0,0 +1,172 @@
+"""Testes dos reenvios e do descarte de lembretes repetidos."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    async_mock_service,
+)
+
+from homeassistant.core import HomeAssistant, ServiceCall
+
+from custom_components.ac_filter_reminder import clock
+from custom_components.ac_filter_reminder.const import DOMAIN, DIGEST_WINDOW_SECONDS
+from custom_components.ac_filter_reminder.delivery import async_get_delivery_queue
+from custom_components.ac_filter_reminder.escalation import async_get_escalation
+from custom_components.ac_filter_reminder.models import UnitData
+from custom_components.ac_filter_reminder.scheduler import next_reminder_time
+
+# Limpo às 04:00 locais (US/Pacific); vence na verificação das 09:00 de 30/04
+START = datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc)
+OVERDUE = START + timedelta(days=59)
+
+
+class Harness:
+    """Uma entrada com uma unidade vencida e os serviços de notificação simulados."""
+
+    def __init__(self, hass: HomeAssistant, freezer: FrozenDateTimeFactory) -> None:
+        self.hass = hass
+        self.freezer = freezer
+        self.phone: list[ServiceCall] = async_mock_service(hass, "notify", "phone")
+        self.manager: list[ServiceCall] = async_mock_service(hass, "notify", "manager")
+        self.persistent: list[ServiceCall] = async_mock_service(
+            hass, "persistent_notification", "create"
+        )
+        async_mock_service(hass, "persistent_notification", "dismiss")
+        async_mock_service(hass, "system_log", "write")
+        self.entry: MockConfigEntry | None = None
+
+    async def async_setup(self, **options: Any) -> UnitData:
+        """Criar a entrada, limpar em START e ir até a véspera do vencimento."""
+        self.entry = MockConfigEntry(
+            domain=DOMAIN,
+            title="Sala",
+            data={"name": "Sala", "reminder_hour": 9, "reminder_minute": 0,
+                  "notify_service": "notify.phone"},
+            options=options,
+        )
+        self.entry.add_to_hass(self.hass)
+        assert await self.hass.config_entries.async_setup(self.entry.entry_id)
+        await self.hass.async_block_till_done()
+        unit = self.entry.runtime_data.units[self.entry.entry_id]
+        await unit.mark_cleaned.async_press()
+        # O salto dispara a verificação atrasada; a das 09:00 de 29/04 ainda não vence
+        await self.advance(OVERDUE - START)
+        await self.daily_check()
+        assert not self.phone
+        return unit
+
+    async def advance(self, delta: timedelta) -> None:
+        """Avançar o relógio, disparar os timers e esperar as entregas."""
+        self.freezer.tick(delta)
+        async_fire_time_changed(self.hass)
+        await self.hass.async_block_till_done()
+        # O relógio do loop está congelado: contar voltas em vez de segundos
+        queue = async_get_delivery_queue(self.hass)
+        for _ in range(1000):
+            if not queue._workers:
+                return
+            await asyncio.sleep(0)
+        raise AssertionError(f"fila de entrega parada: {queue.stats}")
+
+    async def daily_check(self) -> None:
+        """Avançar até a próxima verificação diária."""
+        now = clock.utcnow()
+        await self.advance(next_reminder_time(9, 0, now) - now)
+
+    async def async_unload(self) -> None:
+        assert await self.hass.config_entries.async_unload(self.entry.entry_id)
+
+
+@pytest.fixture
+async def harness(hass: HomeAssistant, freezer: FrozenDateTimeFactory):
+    freezer.move_to(START)
+    harness = Harness(hass, freezer)
+    yield harness
+    await harness.async_unload()
+
+
+@pytest.mark.parametrize(("policy", "pushes", "persistent"), [
+    ("off", 2, 2),
+    ("quiet", 1, 2),
+    ("skip", 1, 1),
+])
+async def test_daily_repeat_follows_dedupe(
+    harness: Harness, policy: str, pushes: int, persistent: int
+) -> None:
+    """Sem reenvios, o lembrete igual do dia seguinte segue `notify_dedupe`."""
+    await harness.async_setup(notify_dedupe=policy)
+    await harness.daily_check()
+    await harness.daily_check()
+    # A mensagem não muda: dias restantes fica em 0 enquanto vencida
+    assert len(harness.phone) == pushes
+    assert len(harness.persistent) == persistent
+
+
+@pytest.mark.parametrize("digest", [False, True])
+async def test_escalation_ignores_dedupe(harness: Harness, digest: bool) -> None:
+    """Um reenvio sai sempre, mesmo repetindo a mensagem com `quiet`."""
+    await harness.async_setup(notify_dedupe="quiet", escalation_hours=4, digest=digest)
+    await harness.daily_check()
+    await harness.advance(timedelta(seconds=DIGEST_WINDOW_SECONDS))
+    assert len(harness.phone) == 1
+
+    await harness.advance(timedelta(hours=4, minutes=1))
+    await harness.advance(timedelta(seconds=DIGEST_WINDOW_SECONDS))
+    assert len(harness.phone) == 2
+    assert harness.phone[0].data == harness.phone[1].data
+
+
+async def test_escalation_rearms_and_stops_on_clean(harness: Harness) -> None:
+    """A unidade volta a cada N horas e sai da roda no instante da limpeza."""
+    unit = await harness.async_setup(escalation_hours=4)
+    wheel = async_get_escalation(harness.hass)
+    await harness.daily_check()
+    assert unit.key in wheel
+    assert wheel.slots == 1
+
+    for sent in (2, 3):
+        await harness.advance(timedelta(hours=4, minutes=1))
+        assert len(harness.phone) == sent
+        assert unit.key in wheel
+
+    await unit.mark_cleaned.async_press()
+    assert unit.key not in wheel
+    assert wheel.slots == 0
+    await harness.advance(timedelta(hours=8))
+    assert len(harness.phone) == 3
+    assert wheel.fired == 2
+
+
+async def test_escalation_switches_service_after_days(harness: Harness) -> None:
+    """Com M dias de atraso, os lembretes vão para `escalation_notify_service`."""
+    await harness.async_setup(
+        escalation_hours=12, escalation_days=2, escalation_notify_service="notify.manager"
+    )
+    # Dia 60 (0 de atraso) e reenvio; dia 61 (1 de atraso) e reenvio
+    for _ in range(2):
+        await harness.daily_check()
+        await harness.advance(timedelta(hours=12, minutes=1))
+    assert (len(harness.phone), len(harness.manager)) == (4, 0)
+
+    # Dia 62: 2 dias de atraso
+    await harness.daily_check()
+    await harness.advance(timedelta(hours=12, minutes=1))
+    assert (len(harness.phone), len(harness.manager)) == (4, 2)
+
+
+async def test_escalation_disabled_by_options(harness: Harness) -> None:
+    """Zerar `escalation_hours` nas opções cancela os reenvios pendentes."""
+    unit = await harness.async_setup(escalation_hours=4)
+    await harness.daily_check()
+    assert unit.key in async_get_escalation(harness.hass)
+
+    harness.hass.config_entries.async_update_entry(harness.entry, options={"escalation_hours": 0})
+    await harness.hass.async_block_till_done()
+    assert unit.key not in async_get_escalation(harness.hass)
+    await harness.advance(timedelta(hours=5))
+    assert len(harness.phone) == 1
@@ -0,0 +1,87 @@
+"""Testes dos filtros extras de uma unidade."""
+from datetime import datetime, timedelta, timezone
+import math
+
+from custom_components.ac_filter_reminder.due import compute_due
+from custom_components.ac_filter_reminder.filters import (
+    FilterSet,
+    format_filter,
+    parse_filter,
+    parse_filters,
+)
+
+LAST = datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def test_parse_filters() -> None:
+    """`Nome: dias` por linha; intervalo limitado a 1-365; ids repetidos entram uma vez."""
+    assert parse_filter("Pré-filtro: 30") == {"id": "pre_filtro", "name": "Pré-filtro", "interval": 30}
+    assert parse_filter("Serpentina")["interval"] == 60
+    assert parse_filter("Fino: 999")["interval"] == 365
+    assert parse_filter("Fino: abc")["interval"] == 60
+    assert parse_filter(" : 10") is None
+    assert [item["id"] for item in parse_filters("Fino: 10\n\nfino: 20\nSerpentina")] == [
+        "fino", "serpentina",
+    ]
+    assert format_filter(parse_filter("Fino: 10")) == "Fino: 10"
+
+
+def test_merge_follows_the_filter_due_first() -> None:
+    """O snapshot da unidade é o do filtro que vence primeiro."""
+    filters = FilterSet(parse_filters("Pré-filtro: 7\nSerpentina: 180"))
+    filters.restore(None, LAST)
+    now_ts = (LAST + timedelta(days=10)).timestamp()
+    main = compute_due(LAST, 60, now_ts)
+
+    merged = filters.merge(main, now_ts)
+    assert merged.filter == "Pré-filtro"
+    assert merged.is_overdue and merged.overdue_days == 3
+
+    filters.set_last_cleaned(filters.index("pre_filtro"), LAST + timedelta(days=9))
+    merged = filters.merge(main, now_ts)
+    assert merged.filter == "Pré-filtro"
+    assert merged.days_until == 6
+    # Vale até a próxima virada de qualquer filtro
+    assert merged.valid_until == min(main.valid_until, filters.next_change(now_ts))
+
+    filters.set_interval(0, 90)
+    assert filters.merge(main, now_ts).filter is None
+
+
+def test_air_quality_factor_scales_extra_filters() -> None:
+    """O fator da qualidade do ar vale também para os filtros extras."""
+    filters = FilterSet(parse_filters("Pré-filtro: 20"))
+    filters.restore(None, LAST)
+    now_ts = (LAST + timedelta(days=12)).timestamp()
+    assert not filters.snapshot(0, now_ts).is_overdue
+    assert filters.snapshot(0, now_ts, factor=0.5).is_overdue
+    assert filters.due_at(0.5) == (LAST + timedelta(days=10)).timestamp()
+
+
+def test_record_and_restore() -> None:
+    """O registro guarda epoch e intervalo; filtros novos começam na limpeza principal."""
+    changes: list[None] = []
+    filters = FilterSet(parse_filters("Pré-filtro: 30\nSerpentina: 180"))
+    filters.on_change = lambda: changes.append(None)
+    filters.restore({"pre_filtro": [int(LAST.timestamp()), 15]}, LAST + timedelta(days=2))
+    assert changes == [None]
+    assert filters.last_cleaned(0) == LAST
+    assert filters.interval(0) == 15
+    assert filters.last_cleaned(1) == LAST + timedelta(days=2)
+    assert filters.interval(1) == 180
+
+    record = filters.record()
+    assert record == {
+        "pre_filtro": [int(LAST.timestamp()), 15],
+        "serpentina": [int((LAST + timedelta(days=2)).timestamp()), 180],
+    }
+
+    # Restaurar o próprio registro não muda nada; nunca limpo volta como None
+    copy = FilterSet(filters.config())
+    copy.restore(record, None)
+    assert copy.record() == record
+    never = FilterSet(parse_filters("Fino: 10"))
+    never.restore(None, None)
+    assert never.record() == {"fino": [None, 10]}
+    assert never.due_at() == -math.inf
+    assert never.next_change(LAST.timestamp()) == math.inf
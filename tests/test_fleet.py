@@ -0,0 +1,81 @@
+"""Testes do motor de vencimento do modo frota."""
+from datetime import datetime, timedelta, timezone
+import random
+
+from freezegun.api import FrozenDateTimeFactory
+
+from custom_components.ac_filter_reminder.due import compute_due
+from custom_components.ac_filter_reminder.fleet import FleetDueEngine, format_units, parse_units
+
+START = datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def test_parse_and_format_units() -> None:
+    """Vínculos e filtros extras em qualquer ordem; nomes repetidos entram uma vez."""
+    units = parse_units(
+        "AC Sala | climate.sala | sensor.pm25 | Serpentina: 180\nAC Sala\nQuarto"
+    )
+    assert units == [
+        {
+            "id": "ac_sala",
+            "name": "AC Sala",
+            "climate_entity": "climate.sala",
+            "air_quality_entity": "sensor.pm25",
+            "filters": [{"id": "serpentina", "name": "Serpentina", "interval": 180}],
+        },
+        {"id": "quarto", "name": "Quarto"},
+    ]
+    assert parse_units(format_units(units)) == units
+
+
+def test_rollover_only_touches_units_whose_day_changed(freezer: FrozenDateTimeFactory) -> None:
+    """Cada recálculo depois do primeiro só marca as unidades que viraram o dia."""
+    freezer.move_to(START)
+    engine = FleetDueEngine(3, interval=2)
+    for index, hours in enumerate((1, 8, 16)):
+        engine.set_last_cleaned(index, START - timedelta(hours=hours))
+    assert [engine.snapshot(index).days_since for index in range(3)] == [0, 0, 0]
+    # A próxima virada é a da unidade limpa há mais tempo
+    assert engine.next_change() == (START + timedelta(hours=8)).timestamp()
+
+    changed: list[int] = []
+    for index, unit in enumerate(engine.units):
+        unit.async_add_listener(lambda index=index: changed.append(index))
+    freezer.move_to(START + timedelta(hours=9))
+    engine.async_refresh()
+    assert changed == [2]
+    assert [engine.snapshot(index).days_since for index in range(3)] == [0, 0, 1]
+
+
+def test_matches_compute_due_under_random_changes(freezer: FrozenDateTimeFactory) -> None:
+    """O heap de viradas dá o mesmo resultado que o cálculo direto."""
+    rng = random.Random(7)
+    now = START
+    freezer.move_to(now)
+    engine = FleetDueEngine(40)
+    for index in range(40):
+        if rng.random() < 0.9:
+            engine.set_last_cleaned(index, now - timedelta(seconds=rng.randrange(40 * 86400)))
+
+    for _ in range(2000):
+        now += timedelta(seconds=rng.randrange(20000))
+        freezer.move_to(now)
+        index = rng.randrange(40)
+        action = rng.random()
+        if action < 0.05:
+            engine.set_last_cleaned(index, now - timedelta(seconds=rng.randrange(86400)))
+        elif action < 0.08:
+            engine.set_interval(index, rng.randint(1, 30))
+        elif action < 0.3:
+            engine.async_refresh(now)
+
+        index = rng.randrange(40)
+        snap = engine.snapshot(index, now)
+        if (last := engine.last_cleaned(index)) is None:
+            assert snap.is_overdue and snap.days_since is None
+            continue
+        expected = compute_due(last, engine.interval(index), now.timestamp())
+        assert snap[:5] == expected[:5]
+
+    # Entradas obsoletas do heap são descartadas de tempos em tempos
+    assert len(engine._heap) <= 2 * len(engine) + 16
@@ -0,0 +1,100 @@
+"""Testes do resumo de lembretes (modo digest)."""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from freezegun.api import FrozenDateTimeFactory
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    async_mock_service,
+)
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.ac_filter_reminder import clock
+from custom_components.ac_filter_reminder.const import (
+    DOMAIN, DIGEST_NOTIFICATION_ID, DIGEST_WINDOW_SECONDS,
+)
+from custom_components.ac_filter_reminder.delivery import async_get_delivery_queue
+from custom_components.ac_filter_reminder.fleet import parse_units
+from custom_components.ac_filter_reminder.scheduler import next_reminder_time
+
+START = datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+async def _advance(hass: HomeAssistant, freezer: FrozenDateTimeFactory, delta: timedelta) -> None:
+    freezer.tick(delta)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    # O relógio do loop está congelado: contar voltas em vez de segundos
+    queue = async_get_delivery_queue(hass)
+    for _ in range(1000):
+        if not queue._workers:
+            return
+        await asyncio.sleep(0)
+    raise AssertionError(f"fila de entrega parada: {queue.stats}")
+
+
+async def _daily_check(hass: HomeAssistant, freezer: FrozenDateTimeFactory) -> None:
+    now = clock.utcnow()
+    await _advance(hass, freezer, next_reminder_time(9, 0, now) - now)
+    await _advance(hass, freezer, timedelta(seconds=DIGEST_WINDOW_SECONDS))
+
+
+async def test_digest_drops_units_no_longer_overdue(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Um intervalo maior tira a unidade do resumo persistente, sem limpeza."""
+    freezer.move_to(START)
+    persistent = async_mock_service(hass, "persistent_notification", "create")
+    dismissed = async_mock_service(hass, "persistent_notification", "dismiss")
+    async_mock_service(hass, "system_log", "write")
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="F",
+        unique_id="fleet_F",
+        data={
+            "name": "F", "reminder_hour": 9, "reminder_minute": 0, "notify_service": "",
+            "entry_type": "fleet", "digest": True, "units": parse_units("Sala\nQuarto"),
+        },
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    sala, quarto = entry.runtime_data.units.values()
+    for unit in (sala, quarto):
+        await unit.mark_cleaned.async_press()
+
+    # 09:00 de 30/04: 60 dias, as duas vencidas no mesmo resumo
+    await _advance(hass, freezer, timedelta(days=59))
+    await _daily_check(hass, freezer)
+    assert not persistent
+    await _daily_check(hass, freezer)
+    assert persistent[-1].data["notification_id"] == DIGEST_NOTIFICATION_ID
+    assert "Sala" in persistent[-1].data["message"]
+    assert "Quarto" in persistent[-1].data["message"]
+
+    # Intervalo maior: a Sala sai na hora, uma única atualização
+    created = len(persistent)
+    await hass.services.async_call(
+        DOMAIN, "set_interval", {"days": 90, "entity_id": sala.interval_days.entity_id},
+        blocking=True,
+    )
+    await _advance(hass, freezer, timedelta(0))
+    assert len(persistent) == created + 1
+    assert "Sala" not in persistent[-1].data["message"]
+    assert "Quarto" in persistent[-1].data["message"]
+
+    # A verificação seguinte não traz a Sala de volta
+    await _daily_check(hass, freezer)
+    assert "Sala" not in persistent[-1].data["message"]
+
+    # A última deixa de vencer: a notificação some
+    await hass.services.async_call(
+        DOMAIN, "set_interval", {"days": 90, "entity_id": quarto.interval_days.entity_id},
+        blocking=True,
+    )
+    await _advance(hass, freezer, timedelta(0))
+    assert dismissed[-1].data["notification_id"] == DIGEST_NOTIFICATION_ID
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
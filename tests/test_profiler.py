@@ -0,0 +1,113 @@
+"""Testes do perfil sob demanda."""
+import asyncio
+import cProfile
+import pstats
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+import custom_components.ac_filter_reminder as integration
+from custom_components.ac_filter_reminder.const import DATA_PROFILER, DOMAIN
+from custom_components.ac_filter_reminder.profiler import ProfileSession, async_start_profile
+
+
+class _Profile(cProfile.Profile):
+    """cProfile que recusa ligar enquanto `busy`, como com outro profiler ativo."""
+
+    busy = False
+
+    def enable(self, *args, **kwargs) -> None:
+        if _Profile.busy:
+            raise ValueError("Another profiling tool is already active")
+        super().enable(*args, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def _profile(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(cProfile, "Profile", _Profile)
+    monkeypatch.setattr(_Profile, "busy", False)
+
+
+def _functions(session: ProfileSession) -> set[str]:
+    return {name for _, _, name in pstats.Stats(session._profiler).stats}
+
+
+async def test_start_fails_when_other_profiler_active(hass: HomeAssistant) -> None:
+    """Com outro profiler ativo, o serviço falha e nada é trocado."""
+    original = integration._async_daily_check
+    _Profile.busy = True
+    with pytest.raises(HomeAssistantError):
+        async_start_profile(hass, 60, 10)
+    assert integration._async_daily_check is original
+    assert DATA_PROFILER not in hass.data.get(DOMAIN, {})
+
+
+async def test_measured_function_runs_when_profiler_busy(hass: HomeAssistant) -> None:
+    """Outro profiler ligado no meio da sessão: a função roda sem medir."""
+    session = ProfileSession(hass, 60, 10)
+    wrapped = session._wrap(lambda value: value * 2)
+    _Profile.busy = True
+    assert wrapped(21) == 42
+
+    async def coroutine() -> int:
+        await asyncio.sleep(0)
+        return 7
+
+    assert await session._wrap(coroutine)() == 7
+    assert (session.calls, session.unmeasured) == (2, 2)
+    _Profile.busy = False
+    assert wrapped(1) == 2
+    assert (session.calls, session.unmeasured) == (3, 2)
+
+
+async def test_coroutine_measured_only_while_running(hass: HomeAssistant) -> None:
+    """O que o loop roda durante um `await` não entra na conta da corrotina."""
+    session = ProfileSession(hass, 60, 10)
+    suspended = asyncio.Event()
+    resume = asyncio.Event()
+
+    def measured_step() -> None:
+        pass
+
+    def elsewhere() -> None:
+        pass
+
+    async def target() -> str:
+        measured_step()
+        suspended.set()
+        await resume.wait()
+        measured_step()
+        return "ok"
+
+    task = asyncio.create_task(session._wrap(target)())
+    await suspended.wait()
+    elsewhere()
+    resume.set()
+    assert await task == "ok"
+    assert session._depth == 0
+
+    functions = _functions(session)
+    assert "measured_step" in functions
+    assert "elsewhere" not in functions
+
+
+async def test_coroutine_cancellation_propagates(hass: HomeAssistant) -> None:
+    """Cancelar quem espera a corrotina medida cancela a corrotina."""
+    session = ProfileSession(hass, 60, 10)
+    cleaned_up = asyncio.Event()
+
+    async def target() -> None:
+        try:
+            await asyncio.Event().wait()
+        finally:
+            cleaned_up.set()
+
+    task = asyncio.create_task(session._wrap(target)())
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert cleaned_up.is_set()
+    assert session._depth == 0
@@ -0,0 +1,128 @@
+"""Testes do agendador compartilhado de lembretes."""
+from collections.abc import Generator
+from datetime import datetime, timedelta, timezone
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.ac_filter_reminder.scheduler import (
+    ReminderScheduler,
+    async_get_scheduler,
+    next_reminder_time,
+)
+
+START = datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def scheduler(hass: HomeAssistant, freezer: FrozenDateTimeFactory) -> Generator[ReminderScheduler, None, None]:
+    """Agendador do domínio, desarmado ao fim do teste."""
+    freezer.move_to(START)
+    scheduler = async_get_scheduler(hass)
+    yield scheduler
+    scheduler.async_shutdown()
+
+
+async def _advance(hass: HomeAssistant, freezer: FrozenDateTimeFactory, delta: timedelta) -> None:
+    freezer.tick(delta)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+
+
+async def test_next_reminder_time(hass: HomeAssistant) -> None:
+    """O lembrete de hoje já passou => amanhã, no horário local."""
+    local = dt_util.as_local(START).tzinfo
+    now = dt_util.as_utc(datetime(2024, 3, 1, 10, 0, tzinfo=local))
+    assert next_reminder_time(9, 0, now) == dt_util.as_utc(datetime(2024, 3, 2, 9, 0, tzinfo=local))
+    assert next_reminder_time(11, 30, now) == dt_util.as_utc(datetime(2024, 3, 1, 11, 30, tzinfo=local))
+
+
+async def test_fires_in_order_and_rearms(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, scheduler: ReminderScheduler
+) -> None:
+    """Jobs disparam na ordem do instante, com um único timer armado."""
+    fired: list[str] = []
+    scheduler.async_schedule("b", START + timedelta(hours=2), lambda now: fired.append("b"))
+    scheduler.async_schedule("a", START + timedelta(hours=1), lambda now: fired.append("a"))
+    assert scheduler.next_fire == START + timedelta(hours=1)
+
+    await _advance(hass, freezer, timedelta(hours=1))
+    assert fired == ["a"]
+    assert scheduler.next_fire == START + timedelta(hours=2)
+
+    await _advance(hass, freezer, timedelta(hours=1))
+    assert fired == ["a", "b"]
+    assert len(scheduler) == 0
+    assert scheduler.next_fire is None
+
+
+async def test_reschedule_and_cancel(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, scheduler: ReminderScheduler
+) -> None:
+    """Reagendar substitui o instante anterior; cancelar não dispara."""
+    fired: list[str] = []
+    scheduler.async_schedule("a", START + timedelta(hours=1), lambda now: fired.append("a1"))
+    scheduler.async_schedule("a", START + timedelta(hours=3), lambda now: fired.append("a3"))
+    scheduler.async_schedule("b", START + timedelta(hours=2), lambda now: fired.append("b"))
+    scheduler.async_cancel("b")
+    assert scheduler.next_fire == START + timedelta(hours=3)
+
+    await _advance(hass, freezer, timedelta(hours=3))
+    assert fired == ["a3"]
+
+
+async def test_heap_compaction(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, scheduler: ReminderScheduler
+) -> None:
+    """Reagendar muitas vezes não deixa o heap crescer sem limite."""
+    fired: list[datetime] = []
+    for minutes in range(1, 1001):
+        scheduler.async_schedule("daily", START + timedelta(minutes=minutes), fired.append)
+    scheduler.async_schedule("other", START + timedelta(days=1), fired.append)
+
+    assert len(scheduler) == 2
+    assert len(scheduler._heap) <= 2 * len(scheduler) + 16
+
+    await _advance(hass, freezer, timedelta(minutes=1000))
+    assert len(fired) == 1
+
+
+async def test_batch_receives_actual_fire_time(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, scheduler: ReminderScheduler
+) -> None:
+    """Jobs vencidos juntos recebem o instante real, não o do primeiro job."""
+    received: dict[str, datetime] = {}
+    scheduler.async_schedule("a", START + timedelta(minutes=1), lambda now: received.setdefault("a", now))
+    scheduler.async_schedule("b", START + timedelta(minutes=2), lambda now: received.setdefault("b", now))
+
+    # O loop acorda atrasado: os dois jobs vencem no mesmo disparo
+    await _advance(hass, freezer, timedelta(minutes=5))
+    assert received["a"] == received["b"] == START + timedelta(minutes=5)
+
+
+async def test_action_reschedules_itself(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory, scheduler: ReminderScheduler
+) -> None:
+    """Um job que se reagenda durante o disparo continua ativo; erros não param os outros."""
+    fired: list[str] = []
+
+    def daily(now: datetime) -> None:
+        fired.append("daily")
+        scheduler.async_schedule("daily", now + timedelta(days=1), daily)
+
+    def broken(now: datetime) -> None:
+        raise RuntimeError("falhou")
+
+    scheduler.async_schedule("broken", START + timedelta(hours=1), broken)
+    scheduler.async_schedule("daily", START + timedelta(hours=1), daily)
+
+    await _advance(hass, freezer, timedelta(hours=1))
+    assert fired == ["daily"]
+    assert scheduler.next_fire == START + timedelta(days=1, hours=1)
+
+    await _advance(hass, freezer, timedelta(days=1))
+    assert fired == ["daily", "daily"]
@@ -0,0 +1,210 @@
+"""Testes da importação/exportação de unidades."""
+import csv
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from freezegun.api import FrozenDateTimeFactory
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.exceptions import HomeAssistantError, Unauthorized
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+
+from custom_components.ac_filter_reminder.const import DOMAIN
+from custom_components.ac_filter_reminder.fleet import parse_units
+from custom_components.ac_filter_reminder.transfer import FIELDS, parse_row, resolve_path
+
+NOW = datetime(2024, 3, 10, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture(autouse=True)
+def _frozen(freezer: FrozenDateTimeFactory) -> None:
+    freezer.move_to(NOW)
+
+
+def test_parse_row_csv_columns() -> None:
+    """Texto de planilha: listas com `|`, datas ISO/epoch/dd-mm, unidade slugificada."""
+    row = parse_row(
+        {
+            "entry": "Escritório",
+            "unit": "Sala 101",
+            "name": "AC Sala 101",
+            "reminder_hour": "8",
+            "reminder_minute": "30.0",
+            "notify_service": " notify.celular ",
+            "climate_entity": "",
+            "filters": "Pré-filtro: 30 | Serpentina: 180 | pré-filtro: 10",
+            "interval_days": "45",
+            "last_cleaned": "2024-03-01T10:00:00+00:00",
+            "cleanings": f"{int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp())} | 2024-03-01T10:00:00Z",
+        }
+    )
+    assert row.entry == "Escritório"
+    assert row.unit == "sala_101"
+    assert row.unique_id == "fleet_Escritório"
+    assert (row.reminder_hour, row.reminder_minute) == (8, 30)
+    assert row.notify_service == "notify.celular"
+    # Coluna presente e vazia => desvincular; ausente => manter
+    assert row.climate_entity == ""
+    assert row.air_quality_entity is None
+    assert [item["name"] for item in row.filters] == ["Pré-filtro", "Serpentina"]
+    assert row.interval == 45
+    assert row.last_cleaned == datetime(2024, 3, 1, 10, 0, tzinfo=timezone.utc)
+    assert row.cleanings == [
+        int(datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()),
+        int(datetime(2024, 3, 1, 10, 0, tzinfo=timezone.utc).timestamp()),
+    ]
+
+
+def test_parse_row_json_and_local_dates() -> None:
+    """JSON Lines traz listas prontas; `dd/mm/aaaa` sem fuso é hora local."""
+    row = parse_row({"name": "Sala", "cleanings": ["05/03/2024 14:00", "05/03/2024 14:00"], "last_cleaned": "05/03/2024"})
+    assert row.entry == row.name == "Sala"
+    assert row.unit == ""
+    assert row.unique_id == "Sala"
+    assert row.filters is None
+    local = dt_util.as_local(NOW).tzinfo
+    assert row.last_cleaned == dt_util.as_utc(datetime(2024, 3, 5, tzinfo=local))
+    assert row.cleanings == [int(datetime(2024, 3, 5, 14, 0, tzinfo=local).timestamp())]
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        {},
+        {"entry": "F", "reminder_hour": "24"},
+        {"entry": "F", "interval_days": "0"},
+        {"entry": "F", "last_cleaned": "ontem"},
+        {"entry": "F", "last_cleaned": (NOW + timedelta(days=1)).isoformat()},
+        {"entry": "F", "cleanings": [(NOW + timedelta(hours=1)).isoformat()]},
+    ],
+)
+def test_parse_row_rejects_invalid(raw: dict) -> None:
+    """Linhas inválidas levantam ValueError (a importação pula e conta)."""
+    with pytest.raises(ValueError):
+        parse_row(raw)
+
+
+async def test_export_import_round_trip(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Exportar e importar o mesmo arquivo não muda nada; nomes novos criam entradas."""
+    hass.config.config_dir = str(tmp_path)
+    folder = tmp_path / DOMAIN
+    fleet = MockConfigEntry(
+        domain=DOMAIN,
+        title="F",
+        unique_id="fleet_F",
+        data={
+            "name": "F", "reminder_hour": 8, "reminder_minute": 15, "notify_service": "",
+            "entry_type": "fleet", "digest": True, "units": parse_units("A | climate.a\nB"),
+        },
+    )
+    fleet.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(fleet.entry_id)
+    await hass.async_block_till_done()
+    for unit in fleet.runtime_data.units.values():
+        await unit.mark_cleaned.async_press()
+
+    result = await hass.services.async_call(
+        DOMAIN, "export", {"path": "units.csv"}, blocking=True, return_response=True
+    )
+    assert result["rows"] == 2
+    with open(folder / "units.csv", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+    assert [(row["entry"], row["unit"], row["climate_entity"]) for row in rows] == [
+        ("F", "a", "climate.a"), ("F", "b", ""),
+    ]
+
+    result = await hass.services.async_call(
+        DOMAIN, "import", {"path": "units.csv"}, blocking=True, return_response=True
+    )
+    await hass.async_block_till_done()
+    assert result == {"rows": 2, "skipped": 0, "entries_created": 0, "entries_updated": 0}
+
+    (folder / "new.csv").write_text(
+        (folder / "units.csv").read_text(encoding="utf-8").replace("\nF,", "\nG,"),
+        encoding="utf-8",
+    )
+    result = await hass.services.async_call(
+        DOMAIN, "import", {"path": "new.csv"}, blocking=True, return_response=True
+    )
+    await hass.async_block_till_done()
+    assert result["entries_created"] == 1
+    created = next(e for e in hass.config_entries.async_entries(DOMAIN) if e.title == "G")
+    unit = created.runtime_data.units[f"{created.entry_id}_a"]
+    assert unit.climate == "climate.a"
+    assert unit.due.last_cleaned == NOW
+
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "../configuration.yaml",
+        "../secrets.csv",
+        "/etc/passwd.csv",
+        "filtros.yaml",
+        "backup",
+        ".",
+    ],
+)
+def test_resolve_path_confined(hass: HomeAssistant, tmp_path: Path, path: str) -> None:
+    """Só arquivos .csv/.jsonl/.ndjson dentro de `<config>/ac_filter_reminder/`."""
+    hass.config.config_dir = str(tmp_path)
+    with pytest.raises(HomeAssistantError):
+        resolve_path(hass, path, None)
+
+
+def test_resolve_path_format(hass: HomeAssistant, tmp_path: Path) -> None:
+    """O formato vem da extensão quando omitido."""
+    hass.config.config_dir = str(tmp_path)
+    folder = (tmp_path / DOMAIN).resolve()
+    assert resolve_path(hass, "backup/f.csv", None) == (str(folder / "backup" / "f.csv"), "csv")
+    assert resolve_path(hass, "f.NDJSON", None) == (str(folder / "f.NDJSON"), "jsonl")
+    assert resolve_path(hass, str(folder / "f.jsonl"), "csv") == (str(folder / "f.jsonl"), "csv")
+
+
+def test_resolve_path_symlink_escape(hass: HomeAssistant, tmp_path: Path) -> None:
+    """Um link simbólico na pasta não leva para fora dela."""
+    hass.config.config_dir = str(tmp_path)
+    (tmp_path / DOMAIN).mkdir()
+    (tmp_path / DOMAIN / "out.csv").symlink_to(tmp_path / "configuration.csv")
+    with pytest.raises(HomeAssistantError):
+        resolve_path(hass, "out.csv", None)
+
+
+async def test_export_refuses_foreign_file(hass: HomeAssistant, tmp_path: Path) -> None:
+    """A exportação só substitui uma exportação anterior."""
+    hass.config.config_dir = str(tmp_path)
+    folder = tmp_path / DOMAIN
+    folder.mkdir()
+    (folder / "notas.csv").write_text("data,texto\n2024-01-01,oi\n", encoding="utf-8")
+    (folder / "old.jsonl").write_text(json.dumps(dict.fromkeys(FIELDS, "")) + "\n", encoding="utf-8")
+    assert await async_setup_component(hass, DOMAIN, {})
+
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(DOMAIN, "export", {"path": "notas.csv"}, blocking=True)
+    assert (folder / "notas.csv").read_text(encoding="utf-8") == "data,texto\n2024-01-01,oi\n"
+    assert not (folder / "notas.csv.tmp").exists()
+
+    await hass.services.async_call(DOMAIN, "export", {"path": "old.jsonl"}, blocking=True)
+    assert (folder / "old.jsonl").read_text(encoding="utf-8") == ""
+
+
+async def test_transfer_requires_admin(
+    hass: HomeAssistant, tmp_path: Path, hass_read_only_user
+) -> None:
+    """Usuários sem administração não importam nem exportam."""
+    hass.config.config_dir = str(tmp_path)
+    assert await async_setup_component(hass, DOMAIN, {})
+    for service in ("export", "import"):
+        with pytest.raises(Unauthorized):
+            await hass.services.async_call(
+                DOMAIN, service, {"path": "f.csv"}, blocking=True,
+                context=Context(user_id=hass_read_only_user.id),
+            )
+    assert not (tmp_path / DOMAIN).exists()